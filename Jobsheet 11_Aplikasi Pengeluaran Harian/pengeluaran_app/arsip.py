@@ -0,0 +1,195 @@
+# arsip.py
+
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+import database
+
+# Arsip tahunan: transaksi satu tahun yang sudah tutup dipindah dari tabel transaksi ke file
+# arsip/<nama db>/transaksi_YYYY.db di sebelah file database. Baris rekap_harian/rekap_bulanan
+# tahun itu TIDAK ikut dipindah, jadi ringkasan & cek anggaran tetap benar tanpa membuka arsip.
+# Query yang membaca baris (riwayat, filter tanggal, ekspor, pencarian) meng-ATTACH arsip hanya
+# jika rentang tanggalnya menyentuh tahun arsip, lewat CTE bernama transaksi_aktif (lihat cte_transaksi_aktif).
+# Tahun arsip hanya-baca: trigger v7 menolak transaksi baru/pindahan ke tahun itu (kembalikan dulu jika perlu).
+# CLI: python arsip.py --daftar | python arsip.py 2023 [--vacuum] | python arsip.py --kembalikan 2023
+
+KOLOM = "id, deskripsi, jumlah, kategori, tanggal, id_impor"
+
+SKEMA_ARSIP = [
+    """
+    CREATE TABLE IF NOT EXISTS transaksi (
+        id INTEGER PRIMARY KEY,
+        deskripsi TEXT NOT NULL,
+        jumlah REAL NOT NULL,
+        kategori TEXT,
+        tanggal DATE NOT NULL,
+        id_impor INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_arsip_tanggal_id ON transaksi (tanggal DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_arsip_tanggal_kategori_jumlah ON transaksi (tanggal, kategori, jumlah)",
+]
+# Sama dengan indeks cari di database utama (migrasi v5), tapi tanpa trigger: isi arsip tidak pernah berubah
+SQL_FTS_ARSIP = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaksi_fts USING fts5(
+        deskripsi, content='transaksi', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+
+def folder_arsip(db_path: str | None = None) -> str:
+    """Folder arsip milik satu file database (tiap tenant punya subfolder sendiri)."""
+    path = db_path or database.DB_PATH  # Dibaca saat dipanggil: benchmark mengganti database.DB_PATH
+    return os.path.join(os.path.dirname(os.path.abspath(path)), "arsip", os.path.splitext(os.path.basename(path))[0])
+
+
+def nama_file(tahun: int) -> str:
+    return f"transaksi_{int(tahun)}.db"
+
+
+def alias(tahun: int) -> str:
+    """Nama skema ATTACH untuk arsip satu tahun."""
+    return f"arsip_{int(tahun)}"
+
+
+def cte_transaksi_aktif(daftar_tahun) -> str:
+    """
+    Definisi CTE `transaksi_aktif AS (...)`: view transaksi_aktif database utama UNION ALL tabel arsip
+    yang sudah di-ATTACH. Nama CTE menutupi view aslinya, jadi query yang ada cukup diberi awalan WITH.
+    Filter tanggal dari query luar diteruskan SQLite ke tiap cabang (masing-masing memakai indeksnya).
+    """
+    cabang = [f"SELECT {KOLOM} FROM main.transaksi_aktif"]
+    cabang += [f"SELECT {KOLOM} FROM {alias(tahun)}.transaksi" for tahun in sorted(daftar_tahun, reverse=True)]
+    return "transaksi_aktif AS (" + " UNION ALL ".join(cabang) + ")"
+
+
+def daftar_arsip(conn: sqlite3.Connection, db_path: str | None = None) -> dict[int, str]:
+    """{tahun: path file arsip} dari tabel arsip_tahun; file yang hilang dilewati dengan peringatan."""
+    hasil = {}
+    for row in conn.execute("SELECT tahun, file FROM arsip_tahun ORDER BY tahun").fetchall():
+        path = os.path.join(folder_arsip(db_path), row[1])
+        if os.path.exists(path):
+            hasil[row[0]] = path
+        else:
+            print(f"Peringatan: File arsip tahun {row[0]} tidak ditemukan ({path}); tahun itu dilewati.")
+    return hasil
+
+
+@contextmanager
+def semua_arsip(conn: sqlite3.Connection, db_path: str | None = None):
+    """
+    ATTACH semua arsip ke `conn` selama blok berjalan (untuk alat bantu seperti rekap.py) dan
+    menghasilkan definisi CTE transaksi_aktif lengkap, atau None jika belum ada arsip.
+    """
+    arsip = daftar_arsip(conn, db_path)
+    with database.lampirkan(conn, {alias(tahun): path for tahun, path in arsip.items()}):
+        yield cte_transaksi_aktif(arsip) if arsip else None
+
+
+def salin_tahun(db_path: str | None, tahun: int) -> tuple[str, list[int]]:
+    """
+    Tahap 1 pengarsipan (di luar thread penulis): membuat file arsip baru lalu menyalin transaksi aktif
+    tahun itu ke sana lewat koneksinya sendiri (database utama di-ATTACH, WAL: tidak memblokir penulis).
+    Mengembalikan (path file arsip, daftar id yang disalin).
+    """
+    path = os.path.join(folder_arsip(db_path), nama_file(tahun))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)  # Sisa percobaan yang gagal (tahun yang sudah terdaftar ditolak sebelum sampai sini)
+
+    conn = sqlite3.connect(path)
+    try:
+        for langkah in SKEMA_ARSIP:
+            conn.execute(langkah)
+        conn.execute("ATTACH DATABASE ? AS utama", (db_path or database.DB_PATH,))
+        with conn:
+            rows = conn.execute(
+                f"INSERT INTO main.transaksi ({KOLOM}) SELECT {KOLOM} FROM utama.transaksi"
+                " WHERE dihapus_pada IS NULL AND tanggal BETWEEN ? AND ? RETURNING id",
+                (f"{tahun}-01-01", f"{tahun}-12-31"),
+            ).fetchall()
+        fts = conn.execute("SELECT 1 FROM utama.sqlite_master WHERE name = 'transaksi_fts'").fetchone() is not None
+        conn.execute("DETACH DATABASE utama")
+        if fts:
+            # Indeks dibangun sekali dalam bentuk paling ringkas; arsip tidak pernah ditulis lagi
+            conn.execute(SQL_FTS_ARSIP)
+            conn.execute("INSERT INTO transaksi_fts (transaksi_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO transaksi_fts (transaksi_fts) VALUES ('optimize')")
+            conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+        return path, [row[0] for row in rows]
+    except sqlite3.Error:
+        conn.close()
+        hapus_file(path)
+        raise
+    finally:
+        conn.close()
+
+
+def baca_arsip(path: str) -> list[tuple]:
+    """Semua baris file arsip sebagai tuple (id, deskripsi, jumlah, kategori, tanggal, id_impor)."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT {KOLOM} FROM transaksi ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def hapus_file(path: str):
+    """Menghapus file arsip (dan sisa -journal jika ada); gagal hapus hanya dilaporkan."""
+    for nama in (path, path + "-journal"):
+        try:
+            if os.path.exists(nama):
+                os.remove(nama)
+        except OSError as e:
+            print(f"Peringatan: File arsip {nama} gagal dihapus: {e}")
+
+
+if __name__ == "__main__":
+    from manager_anggaran import AnggaranHarian
+
+    parser = argparse.ArgumentParser(description="Memindah transaksi tahun yang sudah tutup ke file arsip per tahun.")
+    parser.add_argument("tahun", type=int, nargs="?", help="Tahun yang diarsipkan (harus sebelum tahun berjalan)")
+    parser.add_argument("--kembalikan", type=int, metavar="TAHUN", help="Pindahkan arsip satu tahun kembali ke tabel transaksi")
+    parser.add_argument("--daftar", action="store_true", help="Tampilkan tahun yang sudah diarsipkan")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM database utama setelah mengarsipkan (mengecilkan file)")
+    parser.add_argument("--db", default=None, help="File database (default: konfigurasi.DB_PATH)")
+    args = parser.parse_args()
+
+    anggaran = AnggaranHarian(args.db)
+    gagal = False
+    try:
+        if args.tahun is not None:
+            mulai = datetime.datetime.now()
+            hasil = anggaran.arsipkan_tahun(args.tahun)
+            if hasil is None:  # Penyebabnya sudah dicetak oleh arsipkan_tahun
+                raise ValueError(f"Pengarsipan tahun {args.tahun} gagal; database tidak diubah.")
+            print(f"Tahun {args.tahun}: {hasil['dipindah']:,} transaksi dipindah ke {hasil['file']}"
+                  f" ({hasil['tombstone_dibuang']:,} tombstone dibuang) dalam {datetime.datetime.now() - mulai}.")
+            if args.vacuum:
+                anggaran.vacuum()
+                print("VACUUM selesai.")
+        if args.kembalikan is not None:
+            jumlah = anggaran.kembalikan_arsip(args.kembalikan)
+            if jumlah is None:
+                raise ValueError(f"Mengembalikan arsip tahun {args.kembalikan} gagal; database tidak diubah.")
+            print(f"Tahun {args.kembalikan}: {jumlah:,} transaksi dikembalikan ke tabel transaksi.")
+        if args.daftar or (args.tahun is None and args.kembalikan is None):
+            daftar = anggaran.get_daftar_arsip()
+            if not daftar:
+                print("Belum ada tahun yang diarsipkan.")
+            for arsip_tahun in daftar:
+                print(f"{arsip_tahun['tahun']}: {arsip_tahun['jumlah']:,} transaksi, total {arsip_tahun['total']:,.0f}"
+                      f" -> {arsip_tahun['file']} (diarsipkan {arsip_tahun['diarsipkan_pada']})")
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        gagal = True
+    finally:
+        anggaran.tutup()
+    sys.exit(1 if gagal else 0)
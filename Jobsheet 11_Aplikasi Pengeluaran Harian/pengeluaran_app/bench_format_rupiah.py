@@ -0,0 +1,60 @@
+import argparse
+import locale
+import time
+import numpy as np
+import pandas as pd
+from format_rupiah import format_rp, format_rp_kolom
+
+# Micro-benchmark format Rupiah: implementasi lama (locale + lambda per baris / .apply)
+# dibandingkan dengan format_rupiah (kolom sekaligus + cache skalar).
+# Jalankan: python bench_format_rupiah.py --baris 200000
+
+
+def format_lama_kolom(series: pd.Series) -> pd.Series:
+    """Salinan perilaku lama manager_anggaran.get_dataframe_transaksi."""
+    try:
+        locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
+        return series.map(lambda x: locale.currency(x or 0, grouping=True, symbol='Rp ')[:-3])
+    except Exception:
+        return series.map(lambda x: f"Rp {x or 0:,.0f}".replace(",", "."))
+
+
+def format_lama_skalar(angka):
+    """Salinan perilaku lama main_app.format_rp."""
+    try:
+        return locale.currency(angka or 0, grouping=True, symbol='Rp ')[:-3]
+    except Exception:
+        return f"Rp {angka or 0:,.0f}".replace(",", ".")
+
+
+def ukur(nama: str, fungsi, ulang: int) -> float:
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    print(f"{nama:<40} {terbaik * 1000:10.2f} ms")
+    return terbaik
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark format Rupiah lama vs baru.")
+    parser.add_argument("--baris", type=int, default=200_000)
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # Nominal realistis: kelipatan 500 antara 1.000 dan 2.000.000
+    jumlah = pd.Series(rng.integers(2, 4000, size=args.baris) * 500.0, name="jumlah")
+
+    print(f"--- Benchmark format Rupiah ({args.baris:,} baris, terbaik dari {args.ulang}x) ---")
+    t_lama = ukur("lama: Series.map(lambda)", lambda: format_lama_kolom(jumlah), args.ulang)
+    t_baru = ukur("baru: format_rp_kolom", lambda: format_rp_kolom(jumlah), args.ulang)
+    t_lama_s = ukur("lama: Series.apply(format_rp)", lambda: jumlah.apply(format_lama_skalar), args.ulang)
+    t_baru_s = ukur("baru: Series.map(format_rp) (cache)", lambda: jumlah.map(format_rp), args.ulang)
+    print(f"Percepatan kolom : {t_lama / t_baru:,.1f}x")
+    print(f"Percepatan skalar: {t_lama_s / t_baru_s:,.1f}x")
+
+    # Hasil jalur kolom dan jalur skalar harus identik
+    identik = (format_rp_kolom(jumlah) == jumlah.map(format_rp)).all()
+    print(f"Output kolom == skalar: {identik}")
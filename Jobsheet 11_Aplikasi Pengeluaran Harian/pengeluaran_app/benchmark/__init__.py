@@ -0,0 +1,8 @@
+# benchmark/__init__.py
+
+# Paket benchmark untuk lapisan data pengeluaran_app (AnggaranHarian + database.py).
+# Jalankan dari folder pengeluaran_app, contoh:
+#   python -m benchmark.jalankan --ukuran 100000 --output hasil_100k.json
+#   python -m benchmark.bandingkan baseline.json hasil_100k.json
+#   python -m benchmark.beban_tulis --sesi 1 8 32
+#   python -m benchmark.beban_tenant --pengguna 8 --impor 200000
@@ -0,0 +1,65 @@
+# benchmark/bandingkan.py
+
+import argparse
+import json
+import sys
+
+# Membandingkan dua file hasil benchmark (JSON dari benchmark.jalankan).
+# Keluar dengan kode 1 jika ada regresi, supaya bisa dipakai di CI.
+
+TOLERANSI_DEFAULT = 0.20  # 20% lebih lambat dianggap regresi
+LANTAI_MS = 0.5           # Selisih di bawah ini dianggap noise
+
+
+def bandingkan(lama: dict, baru: dict, toleransi: float = TOLERANSI_DEFAULT, lantai_ms: float = LANTAI_MS) -> list[dict]:
+    """Mengembalikan daftar baris perbandingan per kasus; baris regresi punya 'regresi': True."""
+    hasil = []
+    for nama, data_baru in baru["hasil"].items():
+        data_lama = lama["hasil"].get(nama)
+        if data_lama is None:
+            hasil.append({"kasus": nama, "status": "baru", "regresi": False})
+            continue
+        baris = {"kasus": nama, "regresi": False}
+        for metrik in ("p50_ms", "p95_ms"):
+            a, b = data_lama[metrik], data_baru[metrik]
+            rasio = (b / a) if a > 0 else float("inf")
+            baris[metrik] = (a, b, rasio)
+            if b - a > lantai_ms and rasio > 1 + toleransi:
+                baris["regresi"] = True
+        baris["status"] = "REGRESI" if baris["regresi"] else "ok"
+        hasil.append(baris)
+    return hasil
+
+
+def cetak_laporan(perbandingan: list[dict]):
+    print(f"{'Kasus':<52} {'p50 lama':>10} {'p50 baru':>10} {'rasio':>7} {'p95 rasio':>9}  status")
+    for baris in perbandingan:
+        if "p50_ms" not in baris:
+            print(f"{baris['kasus']:<52} {'-':>10} {'-':>10} {'-':>7} {'-':>9}  {baris['status']}")
+            continue
+        a, b, rasio = baris["p50_ms"]
+        print(f"{baris['kasus']:<52} {a:>10.3f} {b:>10.3f} {rasio:>6.2f}x {baris['p95_ms'][2]:>8.2f}x  {baris['status']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark dan gagal jika ada regresi.")
+    parser.add_argument("lama", help="File JSON baseline")
+    parser.add_argument("baru", help="File JSON hasil terbaru")
+    parser.add_argument("--toleransi", type=float, default=TOLERANSI_DEFAULT)
+    args = parser.parse_args()
+
+    with open(args.lama, encoding="utf-8") as f:
+        lama = json.load(f)
+    with open(args.baru, encoding="utf-8") as f:
+        baru = json.load(f)
+
+    if lama["meta"]["ukuran"] != baru["meta"]["ukuran"]:
+        print(f"Peringatan: ukuran data berbeda ({lama['meta']['ukuran']} vs {baru['meta']['ukuran']}).")
+
+    perbandingan = bandingkan(lama, baru, args.toleransi)
+    cetak_laporan(perbandingan)
+    jumlah_regresi = sum(1 for baris in perbandingan if baris["regresi"])
+    if jumlah_regresi:
+        print(f"\nGAGAL: {jumlah_regresi} kasus lebih lambat dari toleransi {args.toleransi:.0%}.")
+        sys.exit(1)
+    print("\nTidak ada regresi.")
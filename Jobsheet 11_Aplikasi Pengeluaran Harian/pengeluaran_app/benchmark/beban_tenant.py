@@ -0,0 +1,94 @@
+# benchmark/beban_tenant.py
+
+import argparse
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import database
+from benchmark.data_sintetis import generate_baris
+from benchmark.jalankan import persentil
+from manager_anggaran import AnggaranHarian
+from manager_tenant import ManagerTenant
+from model import Transaksi
+
+# Uji isolasi antar pengguna: satu pengguna mengimpor banyak baris sementara N pengguna lain
+# menyimpan transaksi satu per satu. Membandingkan satu file bersama dengan satu file per
+# pengguna (ManagerTenant). Yang diukur terutama latensi tulis pengguna lain selama impor.
+# Contoh: python -m benchmark.beban_tenant --pengguna 8 --tulis 200 --impor 200000
+
+
+def ukur(mode: str, jumlah_pengguna: int, jumlah_tulis: int, baris_impor: int) -> dict:
+    folder = tempfile.mkdtemp(prefix="beban_tenant_")
+    database.tutup_semua_penulis()
+    database.tutup_semua_pool()
+    manager = None
+    if mode == "per_tenant":
+        manager = ManagerTenant(folder, maks_aktif=jumlah_pengguna + 1)
+        ambil = manager.ambil
+    else:
+        bersama = AnggaranHarian(os.path.join(folder, "bersama.db"))
+        ambil = lambda nama: bersama
+
+    latensi = []
+    tanggal = datetime.date(2025, 1, 15)
+
+    def pengguna(nama: str):
+        anggaran = ambil(nama)
+        for i in range(jumlah_tulis):
+            mulai = time.perf_counter()
+            anggaran.tambah_transaksi(Transaksi(f"{nama} #{i}", 15000.0, "Makanan", tanggal))
+            latensi.append((time.perf_counter() - mulai) * 1000)
+
+    def pengimpor():
+        ambil("pengimpor").tambah_transaksi_batch(generate_baris(baris_impor, seed=1))
+
+    nama_pengguna = [f"pengguna{n}" for n in range(jumlah_pengguna)]
+    for nama in nama_pengguna + ["pengimpor"]:
+        ambil(nama)  # File & skema disiapkan di luar pengukuran
+    threads = [threading.Thread(target=pengguna, args=(nama,)) for nama in nama_pengguna]
+    impor = threading.Thread(target=pengimpor)
+    try:
+        mulai = time.perf_counter()
+        impor.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi_tulis = time.perf_counter() - mulai
+        impor.join()
+        durasi_impor = time.perf_counter() - mulai
+    finally:
+        if manager is not None:
+            manager.tutup_semua()
+        database.tutup_semua_penulis()
+        database.tutup_semua_pool()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    latensi.sort()
+    return {
+        "mode": mode,
+        "tulis_per_detik": len(latensi) / durasi_tulis,
+        "p50_ms": persentil(latensi, 50),
+        "p99_ms": persentil(latensi, 99),
+        "maks_ms": latensi[-1] if latensi else 0.0,
+        "impor_detik": durasi_impor,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji isolasi tulis: satu file bersama vs satu file per pengguna.")
+    parser.add_argument("--pengguna", type=int, default=8, help="Jumlah pengguna yang menyimpan satu per satu")
+    parser.add_argument("--tulis", type=int, default=200, help="Transaksi per pengguna")
+    parser.add_argument("--impor", type=int, default=200_000, help="Baris yang diimpor pengguna lain bersamaan")
+    args = parser.parse_args()
+
+    print(f"--- Beban tenant: {args.pengguna} pengguna x {args.tulis} tulis, 1 pengguna impor {args.impor:,} baris ---")
+    print(f"{'Mode':<11} {'tulis/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'maks ms':>9} {'impor s':>9}")
+    for mode in ("bersama", "per_tenant"):
+        h = ukur(mode, args.pengguna, args.tulis, args.impor)
+        print(f"{h['mode']:<11} {h['tulis_per_detik']:>9,.0f} {h['p50_ms']:>9.2f} {h['p99_ms']:>9.2f} "
+              f"{h['maks_ms']:>9.1f} {h['impor_detik']:>9.1f}")
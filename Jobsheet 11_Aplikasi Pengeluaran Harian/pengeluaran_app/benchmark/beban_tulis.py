@@ -0,0 +1,112 @@
+# benchmark/beban_tulis.py
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import database
+from benchmark.data_sintetis import buat_database
+from benchmark.jalankan import persentil
+
+# Uji beban tulis: N sesi (thread) menyimpan & menghapus transaksi bersamaan, seperti beberapa
+# tab Streamlit yang aktif sekaligus. Membandingkan jalur lama (tiap sesi commit sendiri lewat
+# koneksi pool, berebut kunci tulis) dengan jalur baru (database.execute_query -> thread penulis).
+# Contoh: python -m benchmark.beban_tulis --sesi 1 8 32 --tulis 200
+
+SQL_TAMBAH = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+SQL_HAPUS = "DELETE FROM transaksi WHERE id = ?"
+
+
+def tulis_lama(query: str, params: tuple):
+    """Salinan perilaku lama database.execute_query: koneksi sendiri, commit sendiri, timeout=DB_TIMEOUT."""
+    with database.get_pool().koneksi() as conn:
+        try:
+            cursor = conn.execute(query, params)
+            conn.commit()
+            if query.startswith("DELETE"):
+                return cursor.rowcount > 0
+            return cursor.lastrowid
+        except sqlite3.Error:
+            conn.rollback()
+            return None
+
+
+def sesi(nomor: int, jumlah_tulis: int, fungsi_tulis, latensi: list, gagal: list, rasio_hapus: float):
+    """Satu sesi: kebanyakan simpan, sesekali hapus transaksi miliknya sendiri."""
+    rng = random.Random(nomor)
+    milik = []
+    for i in range(jumlah_tulis):
+        if milik and rng.random() < rasio_hapus:
+            query, params = SQL_HAPUS, (milik.pop(),)
+        else:
+            query, params = SQL_TAMBAH, (f"Sesi {nomor} #{i}", float(rng.randrange(5, 500) * 1000), "Makanan", "2025-01-15")
+        mulai = time.perf_counter()
+        hasil = fungsi_tulis(query, params)
+        latensi.append((time.perf_counter() - mulai) * 1000)
+        if hasil is None or hasil is False:
+            gagal.append(1)
+        elif query is SQL_TAMBAH:
+            milik.append(hasil)
+
+
+def ukur(mode: str, jumlah_sesi: int, jumlah_tulis: int, sumber_db: str, rasio_hapus: float) -> dict:
+    folder = tempfile.mkdtemp(prefix="beban_tulis_")
+    path = os.path.join(folder, "beban.db")
+    shutil.copy(sumber_db, path)
+    database.tutup_semua_penulis()
+    database.tutup_semua_pool()
+    database.DB_PATH = path
+
+    fungsi_tulis = tulis_lama if mode == "lama" else database.execute_query
+    latensi, gagal = [], []
+    threads = [threading.Thread(target=sesi, args=(n, jumlah_tulis, fungsi_tulis, latensi, gagal, rasio_hapus))
+               for n in range(jumlah_sesi)]
+    try:
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi = time.perf_counter() - mulai
+        statistik_penulis = database.get_penulis_stats()
+    finally:
+        database.tutup_semua_penulis()
+        database.tutup_semua_pool()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    latensi.sort()
+    return {
+        "mode": mode,
+        "sesi": jumlah_sesi,
+        "tulis_per_detik": len(latensi) / durasi,
+        "p50_ms": persentil(latensi, 50),
+        "p95_ms": persentil(latensi, 95),
+        "p99_ms": persentil(latensi, 99),
+        "maks_ms": latensi[-1] if latensi else 0.0,
+        "gagal": len(gagal),
+        "rata_grup": statistik_penulis[0]["rata_grup"] if statistik_penulis else 1.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji beban tulis bersamaan: commit per sesi vs thread penulis tunggal.")
+    parser.add_argument("--sesi", type=int, nargs="+", default=[1, 4, 16, 32], help="Jumlah sesi bersamaan yang diuji")
+    parser.add_argument("--tulis", type=int, default=200, help="Operasi tulis per sesi")
+    parser.add_argument("--ukuran", type=int, default=100_000, help="Ukuran database sintetis awal")
+    parser.add_argument("--rasio-hapus", type=float, default=0.2)
+    args = parser.parse_args()
+
+    sumber = buat_database(args.ukuran)
+    print(f"--- Beban tulis: {args.tulis} operasi/sesi, database {args.ukuran:,} transaksi ---")
+    print(f"{'Mode':<6} {'Sesi':>5} {'tulis/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'maks ms':>9} "
+          f"{'gagal':>6} {'grup':>6}")
+    for jumlah_sesi in args.sesi:
+        for mode in ("lama", "baru"):
+            h = ukur(mode, jumlah_sesi, args.tulis, sumber, args.rasio_hapus)
+            print(f"{h['mode']:<6} {h['sesi']:>5} {h['tulis_per_detik']:>9,.0f} {h['p50_ms']:>9.2f} {h['p95_ms']:>9.2f} "
+                  f"{h['p99_ms']:>9.2f} {h['maks_ms']:>9.1f} {h['gagal']:>6} {h['rata_grup']:>6.1f}")
@@ -0,0 +1,83 @@
+# benchmark/data_sintetis.py
+
+import datetime
+import os
+import random
+import sqlite3
+import migrasi
+from konfigurasi import KATEGORI_PENGELUARAN
+
+# Pembuat database pengeluaran_harian sintetis yang deterministik (seed yang sama -> isi file yang sama).
+
+FOLDER_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Bobot kategori & rentang nominal (Rupiah) agar distribusinya mirip pemakaian nyata
+PROFIL_KATEGORI = {
+    "Makanan": (40, 10_000, 150_000),
+    "Transportasi": (20, 5_000, 100_000),
+    "Belanja": (10, 20_000, 1_000_000),
+    "Hiburan": (8, 25_000, 500_000),
+    "Tagihan": (6, 50_000, 2_000_000),
+    "Kesehatan": (5, 15_000, 750_000),
+    "Pendidikan": (4, 50_000, 5_000_000),
+    "Lainnya": (7, 5_000, 300_000),
+}
+DESKRIPSI = {
+    "Makanan": ["Makan siang", "Sarapan", "Kopi", "Makan malam", "Jajan"],
+    "Transportasi": ["Grab", "Gojek", "Bensin", "Parkir", "KRL"],
+    "Belanja": ["Belanja bulanan", "Tokopedia", "Shopee", "Pakaian"],
+    "Hiburan": ["Bioskop", "Netflix", "Konser", "Game"],
+    "Tagihan": ["Listrik", "Internet", "Air PDAM", "Pulsa"],
+    "Kesehatan": ["Obat", "Dokter", "Vitamin"],
+    "Pendidikan": ["Buku", "Kursus", "UKT"],
+    "Lainnya": ["Donasi", "Hadiah", "Lain-lain"],
+}
+
+
+def generate_baris(jumlah: int, seed: int = 42, tahun_awal: int = 2015, tahun_akhir: int = 2025):
+    """Generator baris (deskripsi, jumlah, kategori, tanggal) yang deterministik."""
+    rng = random.Random(seed)
+    kategori_list = [k for k in KATEGORI_PENGELUARAN if k in PROFIL_KATEGORI]
+    bobot = [PROFIL_KATEGORI[k][0] for k in kategori_list]
+    ordinal_awal = datetime.date(tahun_awal, 1, 1).toordinal()
+    ordinal_akhir = datetime.date(tahun_akhir, 12, 31).toordinal()
+
+    for _ in range(jumlah):
+        kategori = rng.choices(kategori_list, weights=bobot)[0]
+        _, minimum, maksimum = PROFIL_KATEGORI[kategori]
+        nominal = round(rng.uniform(minimum, maksimum) / 500) * 500 or 500
+        tanggal = datetime.date.fromordinal(rng.randint(ordinal_awal, ordinal_akhir))
+        yield (rng.choice(DESKRIPSI[kategori]), float(nominal), kategori, tanggal.isoformat())
+
+
+def buat_database(jumlah: int, seed: int = 42, path: str | None = None, paksa: bool = False) -> str:
+    """
+    Membuat (atau memakai ulang) file database sintetis berisi `jumlah` transaksi.
+    Skema dibuat lewat migrasi yang sama dengan aplikasi. Mengembalikan path file.
+    """
+    os.makedirs(FOLDER_DATA, exist_ok=True)
+    path = path or os.path.join(FOLDER_DATA, f"sintetis_{jumlah}_{seed}.db")
+    if os.path.exists(path) and not paksa:
+        return path
+    for akhiran in ("", "-wal", "-shm"):
+        if os.path.exists(path + akhiran):
+            os.remove(path + akhiran)
+
+    print(f"Membuat database sintetis {jumlah:,} transaksi: {path}")
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        migrasi.jalankan_migrasi(conn)
+        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+        baris = generate_baris(jumlah, seed)
+        ditulis = 0
+        while ditulis < jumlah:
+            potongan = [row for _, row in zip(range(100_000), baris)]
+            conn.execute("BEGIN")
+            conn.executemany(sql, potongan)
+            conn.commit()
+            ditulis += len(potongan)
+            print(f"   ... {ditulis:,} / {jumlah:,}")
+    finally:
+        conn.close()
+    return path
@@ -0,0 +1,273 @@
+# benchmark/jalankan.py
+
+import argparse
+import datetime
+import inspect
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import database
+from manager_anggaran import AnggaranHarian
+from model import Transaksi
+from benchmark.data_sintetis import buat_database, generate_baris
+from benchmark.bandingkan import bandingkan, cetak_laporan, TOLERANSI_DEFAULT
+
+# Mengukur latensi (p50/p95) setiap method publik AnggaranHarian pada database sintetis.
+# Contoh: python -m benchmark.jalankan --ukuran 1000000 --output hasil_1m.json --banding baseline_1m.json
+
+# Tanggal acuan di tengah rentang data sintetis (2015-2025)
+TANGGAL_ACUAN = datetime.date(2020, 6, 15)
+
+
+def rss_puncak_mb() -> float:
+    """Peak RSS proses sejauh ini (ru_maxrss: KiB di Linux, byte di macOS)."""
+    puncak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return puncak / (1024 * 1024) if sys.platform == "darwin" else puncak / 1024
+
+
+def persentil(data: list[float], p: float) -> float:
+    """Persentil nearest-rank dari data yang sudah diurutkan."""
+    if not data:
+        return 0.0
+    indeks = max(0, min(len(data) - 1, math.ceil(p / 100 * len(data)) - 1))
+    return data[indeks]
+
+
+def siapkan_manager(path: str) -> AnggaranHarian:
+    """Mengarahkan database.py ke file benchmark lalu membuat AnggaranHarian baru."""
+    database.tutup_semua_penulis()
+    database.tutup_semua_pool()
+    database.DB_PATH = path  # Pool default & setup_database_initial membaca DB_PATH saat dipanggil
+    AnggaranHarian._db_siap.discard(path)  # File bisa saja baru dibuat ulang: cek skema lagi
+    return AnggaranHarian()
+
+
+def daftar_kasus(anggaran: AnggaranHarian, konteks: dict) -> list[tuple]:
+    """
+    Daftar (nama_kasus, nama_method, fungsi, berat, bersihkan). Kasus 'berat' membaca seluruh tabel
+    sehingga diulang lebih sedikit; `bersihkan` (opsional) dijalankan di luar pengukuran.
+    """
+    tgl = TANGGAL_ACUAN
+    mulai_30 = tgl - datetime.timedelta(days=29)
+    tahun, minggu, _ = tgl.isocalendar()
+    nomor = iter(range(10**9))
+
+    def tambah_satu():
+        tx = Transaksi(f"Benchmark {next(nomor)}", 25000.0, "Makanan", tgl)
+        id_baru = anggaran.tambah_transaksi(tx)
+        konteks["id_untuk_dihapus"].append(id_baru)
+
+    def tambah_dalam_anggaran():
+        tx = Transaksi(f"Benchmark {next(nomor)}", 25000.0, "Makanan", tgl)
+        id_baru = anggaran.tambah_transaksi(tx, dalam_anggaran=True)
+        if id_baru:
+            konteks["id_untuk_dihapus"].append(id_baru)
+
+    def tambah_batch():
+        hasil = anggaran.tambah_transaksi_batch(generate_baris(1000, seed=next(nomor)))
+        konteks["id_batch"].extend(hasil["id_baru"])
+
+    def bersihkan_batch():
+        # Baris batch dihapus lagi agar ukuran tabel untuk kasus berikutnya tidak bergantung pada --ulang
+        with database.get_pool().koneksi() as conn:
+            conn.executemany("DELETE FROM transaksi WHERE id = ?", [(i,) for i in konteks["id_batch"]])
+            conn.commit()
+        konteks["id_batch"].clear()
+
+    def hapus_satu():
+        if konteks["id_untuk_dihapus"]:
+            anggaran.hapus_transaksi(konteks["id_untuk_dihapus"].pop())
+
+    def hapus_rentang():
+        # Tiap ulangan menghapus jendela 30 hari yang berbeda (jendela yang sudah dihapus tidak berisi baris aktif)
+        geser = datetime.timedelta(days=30 * len(konteks["token_hapus"]))
+        hasil = anggaran.hapus_transaksi_batch(tanggal_mulai=mulai_30 - geser, tanggal_akhir=tgl - geser)
+        konteks["token_hapus"].append(hasil["token"])
+
+    def pulihkan_rentang():
+        # Undo di luar pengukuran, agar ukuran tabel untuk kasus berikutnya tetap sama
+        for token in konteks["token_hapus"]:
+            if token:
+                anggaran.batalkan_hapus(token)
+        konteks["token_hapus"].clear()
+
+    def hapus_lalu_batalkan():
+        anggaran.batalkan_hapus(anggaran.hapus_transaksi_batch(tanggal_mulai=mulai_30, tanggal_akhir=tgl)["token"])
+
+    def halaman_dalam():
+        anggaran.get_halaman_transaksi(50, (tgl.isoformat(), 10**12))
+
+    def arsip_lalu_kembalikan():
+        # Tahun di luar TANGGAL_ACUAN; dikembalikan lagi supaya isi tabel untuk kasus lain tetap sama
+        anggaran.arsipkan_tahun(2016)
+        anggaran.kembalikan_arsip(2016)
+
+    return [
+        ("tambah_transaksi", "tambah_transaksi", tambah_satu, False, None),
+        ("set_batas_anggaran", "set_batas_anggaran",
+         lambda: anggaran.set_batas_anggaran("Makanan", 10**12, 10**13), False, None),  # Batas tinggi: tidak pernah menolak
+        ("get_batas_anggaran", "get_batas_anggaran", anggaran.get_batas_anggaran, False, None),
+        ("tambah_transaksi (dalam_anggaran)", "tambah_transaksi", tambah_dalam_anggaran, False, None),
+        ("cek_anggaran", "cek_anggaran", lambda: anggaran.cek_anggaran("Makanan", tgl, 25000.0), False, None),
+        ("get_status_anggaran (semua kategori)", "get_status_anggaran", lambda: anggaran.get_status_anggaran(tgl), False, None),
+        ("tambah_transaksi_batch (1000 baris)", "tambah_transaksi_batch", tambah_batch, False, bersihkan_batch),
+        ("get_halaman_transaksi (halaman 1)", "get_halaman_transaksi", lambda: anggaran.get_halaman_transaksi(50), False, None),
+        ("get_halaman_transaksi (tengah riwayat)", "get_halaman_transaksi", halaman_dalam, False, None),
+        ("hitung_jumlah_transaksi", "hitung_jumlah_transaksi", anggaran.hitung_jumlah_transaksi, False, None),
+        ("hitung_total_pengeluaran (semua)", "hitung_total_pengeluaran", anggaran.hitung_total_pengeluaran, False, None),
+        ("hitung_total_pengeluaran (1 hari)", "hitung_total_pengeluaran", lambda: anggaran.hitung_total_pengeluaran(tgl), False, None),
+        ("hitung_total_pengeluaran (30 hari)", "hitung_total_pengeluaran",
+         lambda: anggaran.hitung_total_pengeluaran(tanggal_mulai=mulai_30, tanggal_akhir=tgl), False, None),
+        ("hitung_total_pengeluaran_minggu", "hitung_total_pengeluaran_minggu",
+         lambda: anggaran.hitung_total_pengeluaran_minggu(tahun, minggu), False, None),
+        ("hitung_total_pengeluaran_bulan", "hitung_total_pengeluaran_bulan",
+         lambda: anggaran.hitung_total_pengeluaran_bulan(tgl.year, tgl.month), False, None),
+        ("hitung_total_pengeluaran_tahun", "hitung_total_pengeluaran_tahun",
+         lambda: anggaran.hitung_total_pengeluaran_tahun(tgl.year), False, None),
+        ("get_pengeluaran_per_kategori (semua)", "get_pengeluaran_per_kategori", anggaran.get_pengeluaran_per_kategori, False, None),
+        ("get_pengeluaran_per_kategori (1 hari)", "get_pengeluaran_per_kategori",
+         lambda: anggaran.get_pengeluaran_per_kategori(tgl), False, None),
+        ("get_pengeluaran_per_kategori (30 hari)", "get_pengeluaran_per_kategori",
+         lambda: anggaran.get_pengeluaran_per_kategori(tanggal_mulai=mulai_30, tanggal_akhir=tgl), False, None),
+        ("get_pengeluaran_per_kategori_minggu", "get_pengeluaran_per_kategori_minggu",
+         lambda: anggaran.get_pengeluaran_per_kategori_minggu(tahun, minggu), False, None),
+        ("get_pengeluaran_per_kategori_bulan", "get_pengeluaran_per_kategori_bulan",
+         lambda: anggaran.get_pengeluaran_per_kategori_bulan(tgl.year, tgl.month), False, None),
+        ("get_pengeluaran_per_kategori_tahun", "get_pengeluaran_per_kategori_tahun",
+         lambda: anggaran.get_pengeluaran_per_kategori_tahun(tgl.year), False, None),
+        ("siapkan_database (sudah siap)", "siapkan_database", lambda: anggaran.siapkan_database(anggaran.db_path), False, None),
+        ("cached (hit)", "cached", lambda: anggaran.cached("hitung_total_pengeluaran"), False, None),
+        ("versi_data", "versi_data", lambda: anggaran.versi_data, False, None),
+        ("get_dataframe_transaksi (1 hari)", "get_dataframe_transaksi", lambda: anggaran.get_dataframe_transaksi(tgl), False, None),
+        ("get_dataframe_transaksi (semua)", "get_dataframe_transaksi", anggaran.get_dataframe_transaksi, True, None),
+        ("get_semua_transaksi_obj", "get_semua_transaksi_obj", anggaran.get_semua_transaksi_obj, True, None),
+        ("get_semua_transaksi_batch", "get_semua_transaksi_batch", anggaran.get_semua_transaksi_batch, True, None),
+        ("iter_transaksi (semua)", "iter_transaksi", lambda: sum(len(rows) for rows in anggaran.iter_transaksi()), True, None),
+        ("cari_transaksi (1 kata)", "cari_transaksi", lambda: anggaran.cari_transaksi("grab"), False, None),
+        ("cari_transaksi (2 kata, awalan)", "cari_transaksi", lambda: anggaran.cari_transaksi("makan si"), False, None),
+        ("cari_transaksi (tidak ada)", "cari_transaksi", lambda: anggaran.cari_transaksi("zzzz"), False, None),
+        ("optimasi_indeks_cari", "optimasi_indeks_cari", anggaran.optimasi_indeks_cari, False, None),
+        ("hitung_calon_hapus (30 hari)", "hitung_calon_hapus",
+         lambda: anggaran.hitung_calon_hapus(tanggal_mulai=mulai_30, tanggal_akhir=tgl), False, None),
+        ("hapus_transaksi_batch (30 hari)", "hapus_transaksi_batch", hapus_rentang, False, pulihkan_rentang),
+        ("hapus + batalkan_hapus (30 hari)", "batalkan_hapus", hapus_lalu_batalkan, False, None),
+        ("mulai_batch_impor", "mulai_batch_impor", lambda: anggaran.mulai_batch_impor("benchmark"), False, None),
+        ("get_batch_impor", "get_batch_impor", anggaran.get_batch_impor, False, None),
+        ("hapus_transaksi", "hapus_transaksi", hapus_satu, False, None),
+        ("bersihkan_tombstone", "bersihkan_tombstone",
+         lambda: anggaran.bersihkan_tombstone(simpan=datetime.timedelta(0)), False, None),
+        ("get_daftar_arsip", "get_daftar_arsip", anggaran.get_daftar_arsip, False, None),
+        ("arsipkan_tahun + kembalikan_arsip (1 tahun)", "arsipkan_tahun", arsip_lalu_kembalikan, True, None),
+        ("vacuum", "vacuum", anggaran.vacuum, True, None),
+    ]
+
+
+def cek_cakupan(kasus: list[tuple]):
+    """Memperingatkan jika ada method publik AnggaranHarian yang belum punya kasus benchmark."""
+    publik = {nama for nama, _ in inspect.getmembers(AnggaranHarian) if not nama.startswith("_")}
+    tercakup = {nama_method for _, nama_method, *_ in kasus}
+    for nama in sorted(publik - tercakup):
+        print(f"Peringatan: method publik '{nama}' belum punya kasus benchmark.")
+
+
+def ukur_kasus(fungsi, ulang: int, pemanasan: int = 1, bersihkan=None) -> dict:
+    for _ in range(pemanasan):
+        fungsi()
+    rss_awal = rss_puncak_mb()
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    durasi.sort()
+    rss_akhir = rss_puncak_mb()
+    if bersihkan:
+        bersihkan()
+    return {
+        "n": ulang,
+        "p50_ms": persentil(durasi, 50),
+        "p95_ms": persentil(durasi, 95),
+        "maks_ms": durasi[-1],
+        "rss_puncak_mb": rss_akhir,
+        "rss_naik_mb": rss_akhir - rss_awal,
+    }
+
+
+def jalankan(ukuran: int, seed: int, ulang: int, ulang_berat: int, saring: str | None = None) -> dict:
+    sumber = buat_database(ukuran, seed)
+    # Benchmark menulis data, jadi selalu bekerja pada salinan agar setiap run mulai dari isi yang sama
+    folder_kerja = tempfile.mkdtemp(prefix="bench_pengeluaran_")
+    path_kerja = os.path.join(folder_kerja, "kerja.db")
+    shutil.copy(sumber, path_kerja)
+
+    try:
+        anggaran = siapkan_manager(path_kerja)
+        konteks = {"id_untuk_dihapus": [], "id_batch": [], "token_hapus": []}
+        kasus = daftar_kasus(anggaran, konteks)
+        cek_cakupan(kasus)
+
+        hasil = {}
+        for nama, _, fungsi, berat, bersihkan in kasus:
+            if saring and saring not in nama:
+                continue
+            hasil[nama] = ukur_kasus(fungsi, ulang_berat if berat else ulang, bersihkan=bersihkan)
+            print(f"{nama:<52} p50 {hasil[nama]['p50_ms']:>10.3f} ms   p95 {hasil[nama]['p95_ms']:>10.3f} ms   "
+                  f"RSS puncak {hasil[nama]['rss_puncak_mb']:>7.1f} MB")
+    finally:
+        database.tutup_semua_penulis()
+        database.tutup_semua_pool()
+        shutil.rmtree(folder_kerja, ignore_errors=True)
+
+    return {
+        "meta": {
+            "ukuran": ukuran,
+            "seed": seed,
+            "ulang": ulang,
+            "ulang_berat": ulang_berat,
+            "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "hasil": hasil,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark lapisan data pengeluaran_app pada data sintetis.")
+    parser.add_argument("--ukuran", type=int, default=100_000, help="Jumlah transaksi sintetis (mis. 100000, 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ulang", type=int, default=50, help="Pengulangan per kasus ringan")
+    parser.add_argument("--ulang-berat", type=int, default=3, help="Pengulangan per kasus baca-seluruh-tabel")
+    parser.add_argument("--saring", default=None, help="Hanya jalankan kasus yang namanya memuat teks ini")
+    parser.add_argument("--output", default=None, help="File JSON hasil (default: benchmark/data/hasil_<ukuran>.json)")
+    parser.add_argument("--banding", default=None, help="File JSON baseline; keluar dengan kode 1 jika ada regresi")
+    parser.add_argument("--toleransi", type=float, default=TOLERANSI_DEFAULT)
+    args = parser.parse_args()
+
+    print(f"--- Benchmark AnggaranHarian: {args.ukuran:,} transaksi ---")
+    laporan = jalankan(args.ukuran, args.seed, args.ulang, args.ulang_berat, args.saring)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", f"hasil_{args.ukuran}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2)
+    print(f"Hasil disimpan ke {output}")
+
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            baseline = json.load(f)
+        perbandingan = bandingkan(baseline, laporan, args.toleransi)
+        print()
+        cetak_laporan(perbandingan)
+        if any(baris["regresi"] for baris in perbandingan):
+            print(f"\nGAGAL: ada kasus yang lebih lambat dari toleransi {args.toleransi:.0%}.")
+            sys.exit(1)
+        print("\nTidak ada regresi.")
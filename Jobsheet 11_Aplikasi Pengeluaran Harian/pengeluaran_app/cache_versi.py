@@ -0,0 +1,56 @@
+# cache_versi.py
+
+import threading
+from collections import OrderedDict
+
+
+class CacheVersi:
+    """
+    Cache hasil query yang ditandai dengan versi data.
+    Entri hanya dianggap basi jika versi data berubah (ada penulisan), bukan karena
+    filter berubah atau karena waktu berlalu. Ukuran dibatasi dengan LRU.
+    """
+
+    def __init__(self, maks_entri: int = 512):
+        self.maks_entri = maks_entri
+        self._data = OrderedDict()  # kunci -> (versi, nilai)
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.basi = 0  # Bagian dari miss: entri ada tapi versinya sudah lama
+
+    def ambil(self, kunci, versi, hitung):
+        """Mengembalikan nilai untuk `kunci` pada `versi`; jika belum ada/basi, panggil `hitung()` lalu simpan."""
+        with self._lock:
+            entri = self._data.get(kunci)
+            if entri is not None and entri[0] == versi:
+                self.hit += 1
+                self._data.move_to_end(kunci)
+                return entri[1]
+            self.miss += 1
+            if entri is not None:
+                self.basi += 1
+
+        nilai = hitung()  # Di luar lock: query lain tidak perlu menunggu
+
+        with self._lock:
+            self._data[kunci] = (versi, nilai)
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False)
+        return nilai
+
+    def kosongkan(self):
+        with self._lock:
+            self._data.clear()
+
+    def statistik(self) -> dict:
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "hit": self.hit,
+                "miss": self.miss,
+                "basi": self.basi,
+                "entri": len(self._data),
+                "rasio_hit": (self.hit / total) if total else 0.0,
+            }
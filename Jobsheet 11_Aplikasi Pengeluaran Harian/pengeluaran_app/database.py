@@ -1,116 +1,595 @@
 # database.py
 
+import atexit
+import itertools
+import queue
 import sqlite3
-import pandas as pd
-from konfigurasi import DB_PATH  # Gunakan path dari konfigurasi
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
 
+import migrasi
+from diagnostik_query import pencatat, pemanggil
+from konfigurasi import (DB_PATH, DB_TIMEOUT, DB_POOL_MAKS, DB_PRAGMA,  # Gunakan path & pengaturan dari konfigurasi
+                         PENULIS_MAKS_GRUP, PENULIS_TIMEOUT)
 
-def get_db_connection() -> sqlite3.Connection | None:
-    """Membuka dan mengembalikan koneksi baru ke database SQLite."""
+if TYPE_CHECKING:
+    import pandas as pd  # Diimpor saat get_dataframe pertama dipanggil (pandas mahal untuk cold start)
+
+
+def get_db_connection(db_path: str | None = None) -> sqlite3.Connection | None:
+    """
+    Membuka dan mengembalikan koneksi baru ke database SQLite.
+    PRAGMA dari konfigurasi langsung diterapkan, jadi cukup sekali per koneksi.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES)
+        mulai = time.perf_counter()
+        conn = sqlite3.connect(
+            db_path or DB_PATH,
+            timeout=DB_TIMEOUT,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # Koneksi bisa dipinjam thread lain lewat pool
+        )
         conn.row_factory = sqlite3.Row  # Akses kolom by name
+        for nama, nilai in DB_PRAGMA.items():
+            conn.execute(f"PRAGMA {nama} = {nilai}")
+        pencatat.catat_koneksi((time.perf_counter() - mulai) * 1000)
         return conn
     except sqlite3.Error as e:
         print(f"ERROR [database.py] Koneksi DB gagal: {e}")
         return None
 
 
-def execute_query(query: str, params: tuple = None):
+class PoolKoneksi:
     """
-    Menjalankan query non-SELECT (seperti INSERT, UPDATE, DELETE).
-    Mengembalikan lastrowid jika berhasil.
+    Pool koneksi SQLite berumur panjang untuk satu file database.
+    Koneksi idle disimpan (maksimal `ukuran_maks`) dan dipakai ulang antar pemanggilan,
+    sehingga biaya connect + PRAGMA hanya dibayar saat pool kosong.
     """
-    conn = get_db_connection()
-    if not conn:
-        return None
 
-    last_id = None
-    try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
+    def __init__(self, db_path: str, ukuran_maks: int = DB_POOL_MAKS):
+        self.db_path = db_path
+        self.ukuran_maks = ukuran_maks
+        self._idle = queue.LifoQueue()  # LIFO: koneksi yang baru dipakai (cache-nya hangat) dipakai lagi duluan
+        self._lock = threading.Lock()
+        self._ditutup = False
+        self.hit = 0
+        self.miss = 0
+        self.dibuang = 0
+
+    def ambil(self) -> sqlite3.Connection | None:
+        """Meminjam koneksi dari pool, atau membuat koneksi baru jika pool kosong."""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.hit += 1
+            return conn
+        except queue.Empty:
+            with self._lock:
+                self.miss += 1
+            return get_db_connection(self.db_path)
+
+    def kembalikan(self, conn: sqlite3.Connection):
+        """Mengembalikan koneksi ke pool. Koneksi berlebih (atau setelah pool ditutup) langsung ditutup."""
+        if conn is None:
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()  # Jangan sampai transaksi setengah jalan ikut ke peminjam berikutnya
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        if self._ditutup or self._idle.qsize() >= self.ukuran_maks:
+            with self._lock:
+                self.dibuang += 1
+            conn.close()
         else:
-            cursor.execute(query)
-        conn.commit()
-        last_id = cursor.lastrowid
-        return last_id
-    except sqlite3.Error as e:
+            self._idle.put(conn)
+
+    @contextmanager
+    def koneksi(self):
+        """Context manager: `with pool.koneksi() as conn: ...` lalu koneksi otomatis dikembalikan."""
+        conn = self.ambil()
+        try:
+            yield conn
+        finally:
+            self.kembalikan(conn)
+
+    def tutup(self):
+        """Menutup semua koneksi idle. Koneksi yang sedang dipinjam ditutup saat dikembalikan."""
+        self._ditutup = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def statistik(self) -> dict:
+        """Mengembalikan counter hit/miss pool."""
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "db_path": self.db_path,
+                "hit": self.hit,
+                "miss": self.miss,
+                "dibuang": self.dibuang,
+                "idle": self._idle.qsize(),
+                "rasio_hit": (self.hit / total) if total else 0.0,
+            }
+
+
+_pools: dict[str, PoolKoneksi] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str | None = None) -> PoolKoneksi:
+    """Mengembalikan pool untuk file database tertentu (default: DB_PATH), dibuat sekali saja."""
+    path = db_path or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None or pool._ditutup:
+            pool = PoolKoneksi(path)
+            _pools[path] = pool
+        return pool
+
+
+def get_pool_stats() -> list[dict]:
+    """Statistik hit/miss semua pool yang aktif."""
+    with _pools_lock:
+        return [pool.statistik() for pool in _pools.values()]
+
+
+def tutup_semua_pool():
+    """Menutup semua koneksi di semua pool (dipanggil otomatis saat proses berhenti)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.tutup()
+        _pools.clear()
+
+
+_generasi_penulis = itertools.count(1)
+_versi_tulis = threading.local()  # (versi sebelum, versi sesudah) pekerjaan tulis terakhir milik thread pemanggil
+
+
+def versi_tulis_terakhir() -> tuple | None:
+    """
+    (versi sebelum, versi sesudah) grup commit yang memuat pekerjaan tulis terakhir thread ini
+    (lihat PenulisTunggal.versi_data), atau None jika pekerjaan itu gagal.
+    """
+    return getattr(_versi_tulis, "nilai", None)
+
+
+class PenulisTunggal:
+    """
+    Satu thread penulis per file database. Thread lain tidak lagi berebut kunci tulis SQLite:
+    mereka mengirim pekerjaan (fungsi yang menerima koneksi) ke antrian lalu menunggu Future.
+
+    Group commit: pekerjaan yang menumpuk selama COMMIT sebelumnya diambil sekaligus
+    (maksimal `maks_grup`) dan dijalankan dalam SATU transaksi. Tiap pekerjaan punya
+    SAVEPOINT sendiri, jadi satu pekerjaan yang gagal tidak membatalkan yang lain.
+    Hasil baru dikirim ke pemanggil setelah COMMIT berhasil.
+
+    Versi data file = (generasi, PRAGMA data_version koneksi penulis, jumlah commit). data_version
+    koneksi ini tidak berubah oleh commit-nya sendiri, jadi hanya berubah jika koneksi LAIN (proses lain,
+    CLI, VACUUM) meng-commit; tulisan dalam proses ini dihitung oleh jumlah commit. Di dalam grup
+    (kunci tulis dipegang) tidak ada commit lain yang bisa menyela, jadi versi sebelum & sesudah grup pasti.
+    """
+
+    def __init__(self, db_path: str, maks_grup: int = PENULIS_MAKS_GRUP):
+        self.db_path = db_path
+        self.maks_grup = maks_grup
+        self.generasi = next(_generasi_penulis)  # Penulis baru = penomoran data_version baru
+        self._antrian = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None  # Dipakai thread penulis; thread lain hanya untuk PRAGMA data_version (di bawah _conn_lock)
+        self._conn_lock = threading.RLock()  # Dipegang selama satu grup berjalan
+        self._berhenti = False
+        self.pekerjaan = 0
+        self.commit = 0
+        self.grup_terbesar = 0
+
+    def kirim(self, fungsi, timeout: float | None = PENULIS_TIMEOUT):
+        """Menjalankan `fungsi(conn)` di thread penulis dan mengembalikan hasilnya (atau melempar error-nya)."""
+        if threading.current_thread() is self._thread:
+            _versi_tulis.nilai = None  # Versi grup belum diketahui sebelum COMMIT
+            return fungsi(self._conn)  # Dipanggil dari dalam pekerjaan lain: sudah di dalam transaksi
+        future = Future()
+        with self._lock:
+            if self._berhenti:
+                raise sqlite3.OperationalError("Penulis database sudah ditutup")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=f"penulis-db:{self.db_path}", daemon=True)
+                self._thread.start()
+            self._antrian.put((fungsi, future))
+        _versi_tulis.nilai = None
+        nilai, _versi_tulis.nilai = future.result(timeout)
+        return nilai
+
+    def _koneksi(self) -> sqlite3.Connection | None:
+        with self._conn_lock:
+            if self._conn is None and not self._berhenti:
+                self._conn = get_db_connection(self.db_path)
+            return self._conn
+
+    def versi_data(self) -> tuple | None:
+        """Versi data file saat ini (menunggu grup commit yang sedang berjalan), atau None jika gagal dibaca."""
+        with self._conn_lock:
+            conn = self._koneksi()
+            if conn is None:
+                return None
+            try:
+                return self.generasi, conn.execute("PRAGMA data_version").fetchone()[0], self.commit
+            except sqlite3.Error as e:
+                print(f"Peringatan: Gagal membaca data_version: {e}")
+                return None
+
+    def _ambil_grup(self) -> list | None:
+        """Menunggu satu pekerjaan, lalu ikut mengambil pekerjaan lain yang sudah menunggu."""
+        pertama = self._antrian.get()
+        if pertama is None:
+            return None
+        grup = [pertama]
+        while len(grup) < self.maks_grup:
+            try:
+                berikut = self._antrian.get_nowait()
+            except queue.Empty:
+                break
+            if berikut is None:
+                self._antrian.put(None)  # Proses grup ini dulu, berhenti di putaran berikutnya
+                break
+            grup.append(berikut)
+        return grup
+
+    def _loop(self):
+        self._koneksi()
+        while True:
+            grup = self._ambil_grup()
+            if grup is None:
+                break
+            if self._koneksi() is None:
+                for _, future in grup:
+                    future.set_exception(sqlite3.OperationalError("Koneksi penulis gagal dibuka"))
+                continue
+            with self._conn_lock:
+                self._jalankan_grup(grup)
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _jalankan_grup(self, grup: list):
+        conn = self._conn
+        hasil = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Kunci tulis sudah dipegang: tidak ada commit lain sampai COMMIT grup ini
+            sebelum = (self.generasi, conn.execute("PRAGMA data_version").fetchone()[0], self.commit)
+            for fungsi, future in grup:
+                conn.execute("SAVEPOINT pekerjaan")
+                try:
+                    hasil.append((future, fungsi(conn), None))
+                    conn.execute("RELEASE pekerjaan")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO pekerjaan")
+                    conn.execute("RELEASE pekerjaan")
+                    hasil.append((future, None, e))
+            conn.commit()
+        except sqlite3.Error as e:
+            # BEGIN/COMMIT gagal (mis. database dikunci proses lain terlalu lama): seluruh grup gagal
+            if conn.in_transaction:
+                conn.rollback()
+            for _, future in grup:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.pekerjaan += len(grup)
+            self.commit += 1
+            self.grup_terbesar = max(self.grup_terbesar, len(grup))
+        versi = (sebelum, (sebelum[0], sebelum[1], sebelum[2] + 1))
+        for future, nilai, error in hasil:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((nilai, versi))
+
+    def tutup(self):
+        """Menyelesaikan pekerjaan yang sudah antre lalu menghentikan thread penulis."""
+        with self._lock:
+            self._berhenti = True
+            thread = self._thread
+        if thread is not None:
+            self._antrian.put(None)
+            thread.join(PENULIS_TIMEOUT)
+        else:
+            with self._conn_lock:  # Koneksi mungkin sudah dibuka oleh versi_data walau belum ada tulisan
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    def statistik(self) -> dict:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "pekerjaan": self.pekerjaan,
+                "commit": self.commit,
+                "rata_grup": (self.pekerjaan / self.commit) if self.commit else 0.0,
+                "grup_terbesar": self.grup_terbesar,
+                "antri": self._antrian.qsize(),
+            }
+
+
+_penulis: dict[str, PenulisTunggal] = {}
+
+
+def get_penulis(db_path: str | None = None) -> PenulisTunggal:
+    """Mengembalikan thread penulis untuk file database tertentu (default: DB_PATH)."""
+    path = db_path or DB_PATH
+    with _pools_lock:
+        penulis = _penulis.get(path)
+        if penulis is None or penulis._berhenti:
+            penulis = PenulisTunggal(path)
+            _penulis[path] = penulis
+        return penulis
+
+
+def get_penulis_stats() -> list[dict]:
+    with _pools_lock:
+        return [penulis.statistik() for penulis in _penulis.values()]
+
+
+def tutup_semua_penulis():
+    with _pools_lock:
+        daftar = list(_penulis.values())
+        _penulis.clear()
+    for penulis in daftar:
+        penulis.tutup()
+
+
+def tutup_database(db_path: str):
+    """
+    Menuntaskan antrian tulis lalu menutup thread penulis dan pool satu file database
+    (mis. tenant yang dikeluarkan dari LRU). Pemakaian berikutnya membuka ulang secara otomatis.
+    """
+    with _pools_lock:
+        penulis = _penulis.pop(db_path, None)
+        pool = _pools.pop(db_path, None)
+    if penulis is not None:
+        penulis.tutup()
+    if pool is not None:
+        pool.tutup()
+
+
+atexit.register(tutup_semua_pool)
+atexit.register(tutup_semua_penulis)  # atexit berjalan terbalik: antrian tulis dituntaskan sebelum pool ditutup
+
+
+def execute_query(query: str, params: tuple = None, db_path: str | None = None):
+    """
+    Menjalankan query non-SELECT (seperti INSERT, UPDATE, DELETE) lewat thread penulis.
+    Mengembalikan lastrowid jika INSERT, True jika DELETE/UPDATE berhasil, None jika gagal.
+    """
+    ubah = query.strip().upper().startswith(("DELETE", "UPDATE"))
+
+    def kerja(conn):
+        cursor = conn.execute(query, params or ())
+        return (cursor.rowcount > 0 if ubah else cursor.lastrowid), max(cursor.rowcount, 0)
+
+    sumber = pemanggil()
+    mulai = time.perf_counter()  # Termasuk waktu antre: itulah latensi yang dirasakan pemanggil
+    try:
+        hasil, baris = get_penulis(db_path).kirim(kerja)
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, baris, sumber=sumber)
+        return hasil
+    except Exception as e:
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True, sumber=sumber)
         print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:60]}")
-        conn.rollback()
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
-def fetch_query(query: str, params: tuple = None, fetch_all: bool = True):
-    """Menjalankan query SELECT dan mengembalikan hasil."""
-    conn = get_db_connection()
-    if not conn:
+def execute_many(query: str, params_list: list[tuple], db_path: str | None = None) -> list[int] | None:
+    """
+    Menjalankan satu query INSERT untuk banyak baris (executemany) dalam SATU pekerjaan tulis.
+    Mengembalikan daftar id yang dibuat, atau None jika gagal (seluruh batch dibatalkan).
+    """
+    if not params_list:
+        return []
+
+    def kerja(conn):
+        # Thread penulis memegang kunci tulis sejak BEGIN IMMEDIATE, jadi id yang dibuat berurutan
+        conn.executemany(query, params_list)
+        id_terakhir = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(id_terakhir - len(params_list) + 1, id_terakhir + 1))
+
+    sumber = pemanggil()
+    mulai = time.perf_counter()
+    try:
+        id_baru = get_penulis(db_path).kirim(kerja)
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, len(params_list), sumber=sumber)
+        return id_baru
+    except Exception as e:
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True, sumber=sumber)
+        print(f"ERROR [database.py] Batch gagal ({len(params_list)} baris): {e} | Query: {query[:60]}")
         return None
 
+
+def execute_returning(query: str, params: tuple = (), db_path: str | None = None) -> list[tuple] | None:
+    """
+    Menjalankan satu query tulis dengan klausa RETURNING lewat thread penulis dan mengembalikan
+    semua baris hasilnya (list tuple), atau None jika gagal.
+    """
+    def kerja(conn):
+        return [tuple(row) for row in conn.execute(query, params).fetchall()]
+
+    sumber = pemanggil()
+    mulai = time.perf_counter()
     try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        result = cursor.fetchall() if fetch_all else cursor.fetchone()
-        return result
-    except sqlite3.Error as e:
-        print(f"ERROR [database.py] Fetch gagal: {e} | Query: {query[:60]}")
+        rows = get_penulis(db_path).kirim(kerja)
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, len(rows), sumber=sumber)
+        return rows
+    except Exception as e:
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True, sumber=sumber)
+        print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:60]}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
-def get_dataframe(query: str, params: tuple = None) -> pd.DataFrame:
-    """Menjalankan query SELECT dan mengembalikan hasil sebagai DataFrame Pandas."""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
+def execute_changes(query: str, params: tuple = (), db_path: str | None = None) -> int | None:
+    """
+    Menjalankan satu query tulis lewat thread penulis dan mengembalikan jumlah perubahan yang
+    dilakukannya (selisih total_changes, termasuk yang dibuat perintah khusus seperti FTS5 'merge'),
+    atau None jika gagal.
+    """
+    def kerja(conn):
+        sebelum = conn.total_changes
+        conn.execute(query, params)
+        return conn.total_changes - sebelum
 
+    sumber = pemanggil()
+    mulai = time.perf_counter()
     try:
-        df = pd.read_sql_query(query, conn, params=params)
-        return df
+        perubahan = get_penulis(db_path).kirim(kerja)
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, perubahan, sumber=sumber)
+        return perubahan
     except Exception as e:
-        print(f"ERROR [database.py] Gagal baca ke DataFrame: {e}")
-        return pd.DataFrame()
+        pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True, sumber=sumber)
+        print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:60]}")
+        return None
+
+
+@contextmanager
+def lampirkan(conn: sqlite3.Connection, lampiran: dict[str, str] | None):
+    """
+    ATTACH file database tambahan {alias: path} (mis. arsip tahunan) ke `conn` selama blok berjalan,
+    lalu DETACH lagi, jadi koneksi yang kembali ke pool tidak memegang file lain.
+    Tanpa lampiran tidak ada yang dijalankan.
+    """
+    if not lampiran:
+        yield conn
+        return
+    terpasang = {row[1] for row in conn.execute("PRAGMA database_list")}
+    baru = [nama for nama in lampiran if nama not in terpasang]
+    try:
+        for nama in baru:
+            conn.execute(f"ATTACH DATABASE ? AS {nama}", (lampiran[nama],))
+        yield conn
     finally:
-        if conn:
-            conn.close()
+        for nama in baru:
+            try:
+                conn.execute(f"DETACH DATABASE {nama}")
+            except sqlite3.Error as e:
+                print(f"Peringatan [database.py] DETACH {nama} gagal: {e}")
+
+
+def fetch_query(query: str, params: tuple = None, fetch_all: bool = True, db_path: str | None = None,
+                lampiran: dict[str, str] | None = None):
+    """Menjalankan query SELECT dan mengembalikan hasil. `lampiran`: file yang di-ATTACH selama query (lihat lampirkan)."""
+    with get_pool(db_path).koneksi() as conn:
+        if not conn:
+            return None
+
+        mulai = time.perf_counter()
+        try:
+            with lampirkan(conn, lampiran):
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                result = cursor.fetchall() if fetch_all else cursor.fetchone()
+                cursor.close()
+            baris = len(result) if fetch_all else int(result is not None)
+            pencatat.catat(query, (time.perf_counter() - mulai) * 1000, baris)
+            return result
+        except sqlite3.Error as e:
+            pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True)
+            print(f"ERROR [database.py] Fetch gagal: {e} | Query: {query[:60]}")
+            return None
+
+
+def iter_query(query: str, params: tuple = None, ukuran_chunk: int = 10000, sebagai_tuple: bool = True,
+               db_path: str | None = None, lampiran: dict[str, str] | None = None):
+    """
+    Generator: menjalankan query SELECT dan menghasilkan baris per potongan (fetchmany),
+    sehingga hasil besar tidak perlu dimuat sekaligus. Koneksi dipinjam selama iterasi berjalan.
+    Dengan sebagai_tuple=True baris berupa tuple biasa (lebih ringan dari sqlite3.Row).
+    """
+    # Pemanggil dicatat sekarang; body generator baru jalan saat diiterasi oleh fungsi lain
+    return _iter_query(query, params, ukuran_chunk, sebagai_tuple, pemanggil(), db_path, lampiran)
+
+
+def _iter_query(query: str, params: tuple, ukuran_chunk: int, sebagai_tuple: bool, sumber: str, db_path: str | None,
+                lampiran: dict[str, str] | None):
+    with get_pool(db_path).koneksi() as conn:
+        if not conn:
+            return
+
+        # Hanya waktu execute/fetchmany yang dihitung, bukan waktu pemakai memproses tiap potongan
+        durasi, baris, gagal = 0.0, 0, False
+        try:
+            with lampirkan(conn, lampiran):
+                mulai = time.perf_counter()
+                cursor = conn.cursor()
+                try:
+                    if sebagai_tuple:
+                        cursor.row_factory = None
+                    cursor.execute(query, params or ())
+                    while True:
+                        rows = cursor.fetchmany(ukuran_chunk)
+                        durasi += time.perf_counter() - mulai
+                        if not rows:
+                            break
+                        baris += len(rows)
+                        yield rows
+                        mulai = time.perf_counter()
+                finally:
+                    cursor.close()  # Iterasi yang berhenti di tengah: statement harus selesai sebelum DETACH
+        except sqlite3.Error as e:
+            gagal = True
+            print(f"ERROR [database.py] Fetch bertahap gagal: {e} | Query: {query[:60]}")
+        finally:
+            pencatat.catat(query, durasi * 1000, baris, gagal=gagal, sumber=sumber)
+
+
+def get_dataframe(query: str, params: tuple = None, db_path: str | None = None,
+                  lampiran: dict[str, str] | None = None) -> "pd.DataFrame":
+    """Menjalankan query SELECT dan mengembalikan hasil sebagai DataFrame Pandas."""
+    import pandas as pd
+
+    with get_pool(db_path).koneksi() as conn:
+        if not conn:
+            return pd.DataFrame()
+
+        mulai = time.perf_counter()
+        try:
+            with lampirkan(conn, lampiran):
+                df = pd.read_sql_query(query, conn, params=params)
+            pencatat.catat(query, (time.perf_counter() - mulai) * 1000, len(df))
+            return df
+        except Exception as e:
+            pencatat.catat(query, (time.perf_counter() - mulai) * 1000, 0, gagal=True)
+            print(f"ERROR [database.py] Gagal baca ke DataFrame: {e}")
+            return pd.DataFrame()
 
 
-def setup_database_initial():
+def setup_database_initial(db_path: str | None = None):
     """
-    Memastikan tabel 'transaksi' ada.
+    Memastikan skema database (tabel 'transaksi' + indeks) sudah versi terbaru lewat migrasi.
+    Jika PRAGMA user_version sudah terbaru, tidak ada DDL yang dijalankan.
     Dipanggil oleh AnggaranHarian jika perlu (opsional setup awal).
     """
-    print(f"Memeriksa/membuat tabel di database (via database.py): {DB_PATH}")
-    conn = get_db_connection()
-    if not conn:
-        return False
+    print(f"Memeriksa skema database (via database.py): {db_path or DB_PATH}")
+    with get_pool(db_path).koneksi() as conn:
+        if not conn:
+            return False
 
-    try:
-        cursor = conn.cursor()
-        sql_create_table = """
-            CREATE TABLE IF NOT EXISTS transaksi (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                deskripsi TEXT NOT NULL,
-                jumlah REAL NOT NULL CHECK(jumlah > 0),
-                kategori TEXT,
-                tanggal DATE NOT NULL
-            );
-        """
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'transaksi' siap.")
-        return True
-    except sqlite3.Error as e:
-        print(f"Error SQLite saat setup tabel: {e}")
-        return False
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        try:
+            versi = migrasi.jalankan_migrasi(conn)
+            print(f" -> Skema database versi {versi} siap.")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error SQLite saat migrasi skema: {e}")
+            return False
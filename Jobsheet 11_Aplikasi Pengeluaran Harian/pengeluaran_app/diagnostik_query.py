@@ -0,0 +1,179 @@
+# diagnostik_query.py
+
+import contextvars
+import logging
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+from konfigurasi import (QUERY_LAMBAT_MS, LOG_QUERY_LAMBAT, LOG_QUERY_LAMBAT_MAKS_BYTE,
+                         LOG_QUERY_LAMBAT_CADANGAN)
+
+# Instrumentasi query untuk database.py: waktu per query, jumlah baris, waktu connect,
+# dan sidik (fingerprint) query yang dinormalisasi. Query yang melewati ambang
+# QUERY_LAMBAT_MS ditulis ke log berotasi (log/query_lambat.log).
+
+_label_aktif = contextvars.ContextVar("label_diagnostik", default=None)
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_ANGKA = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_DAFTAR_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPASI = re.compile(r"\s+")
+
+# File yang dilewati saat mencari pemanggil query (lapisan database itu sendiri)
+_FILE_INTERNAL = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.py")}
+
+
+@lru_cache(maxsize=1024)
+def sidik_query(query: str) -> str:
+    """
+    Menormalkan query menjadi sidik: literal string/angka diganti '?', daftar IN (?, ?, ...)
+    diringkas, spasi dirapikan. Query yang sama dengan parameter berbeda punya sidik yang sama.
+    """
+    sidik = _RE_STRING.sub("?", query)
+    sidik = _RE_ANGKA.sub("?", sidik)
+    sidik = _RE_DAFTAR_IN.sub("(?...)", sidik)
+    return _RE_SPASI.sub(" ", sidik).strip()
+
+
+@lru_cache(maxsize=256)
+def _file_internal(nama_file: str) -> bool:
+    return os.path.abspath(nama_file) in _FILE_INTERNAL
+
+
+@contextmanager
+def label(nama: str):
+    """Menandai query di dalam blok ini, mis. `with label("halaman Ringkasan"): ...`."""
+    token = _label_aktif.set(nama)
+    try:
+        yield
+    finally:
+        _label_aktif.reset(token)
+
+
+def pemanggil() -> str:
+    """
+    Nama fungsi di luar database.py yang memicu query, mis. 'manager_anggaran.hitung_total_pengeluaran'.
+    Helper privat (_total_rekap, ...) dilewati agar yang tercatat adalah method publiknya.
+    """
+    frame = sys._getframe(1)
+    while frame is not None and _file_internal(frame.f_code.co_filename):
+        frame = frame.f_back
+    pertama = frame
+    while frame is not None and frame.f_code.co_name.startswith(("_", "<")):
+        frame = frame.f_back
+    frame = frame or pertama
+    return _nama_fungsi(frame.f_code) if frame is not None else "?"
+
+
+@lru_cache(maxsize=1024)
+def _nama_fungsi(kode) -> str:
+    modul = os.path.splitext(os.path.basename(kode.co_filename))[0]
+    return f"{modul}.{kode.co_name}"
+
+
+class PencatatQuery:
+    """
+    Mengumpulkan statistik query sejak proses dimulai, dikelompokkan per sidik query.
+    Dipakai dari banyak thread (Streamlit), jadi semua counter dijaga lock.
+    """
+
+    def __init__(self, ambang_lambat_ms: float = QUERY_LAMBAT_MS):
+        self.ambang_lambat_ms = ambang_lambat_ms
+        self._lock = threading.Lock()
+        self._per_sidik = {}  # sidik -> dict statistik
+        self._log_lambat = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._per_sidik.clear()
+            self.jumlah_koneksi = 0
+            self.total_koneksi_ms = 0.0
+            self.maks_koneksi_ms = 0.0
+            self.jumlah_lambat = 0
+
+    def catat_koneksi(self, durasi_ms: float):
+        """Mencatat waktu membuka koneksi baru (connect + PRAGMA)."""
+        with self._lock:
+            self.jumlah_koneksi += 1
+            self.total_koneksi_ms += durasi_ms
+            self.maks_koneksi_ms = max(self.maks_koneksi_ms, durasi_ms)
+
+    def catat(self, query: str, durasi_ms: float, baris: int, gagal: bool = False, sumber: str | None = None):
+        """Mencatat satu eksekusi query; jika melewati ambang, juga ditulis ke log query lambat."""
+        sidik = sidik_query(query)
+        sumber = _label_aktif.get() or sumber or pemanggil()
+        with self._lock:
+            stat = self._per_sidik.get(sidik)
+            if stat is None:
+                stat = self._per_sidik[sidik] = {
+                    "sidik": sidik, "panggilan": 0, "total_ms": 0.0, "maks_ms": 0.0,
+                    "baris": 0, "gagal": 0, "sumber": {},
+                }
+            stat["panggilan"] += 1
+            stat["total_ms"] += durasi_ms
+            stat["maks_ms"] = max(stat["maks_ms"], durasi_ms)
+            stat["baris"] += baris
+            stat["gagal"] += gagal
+            stat["sumber"][sumber] = stat["sumber"].get(sumber, 0) + 1
+            lambat = 0 < self.ambang_lambat_ms <= durasi_ms
+            if lambat:
+                self.jumlah_lambat += 1
+
+        if lambat:
+            self._tulis_lambat(sidik, durasi_ms, baris, sumber)
+
+    def _tulis_lambat(self, sidik: str, durasi_ms: float, baris: int, sumber: str):
+        if self._log_lambat is None:
+            self._log_lambat = _buat_logger_lambat()
+        self._log_lambat.warning("%.1f ms | %d baris | %s | %s", durasi_ms, baris, sumber, sidik)
+
+    def teratas(self, n: int = 10, urut: str = "total_ms") -> list[dict]:
+        """Query teratas berdasarkan `urut` (total_ms, maks_ms, panggilan, baris)."""
+        with self._lock:
+            data = [dict(stat, sumber=dict(stat["sumber"])) for stat in self._per_sidik.values()]
+        for stat in data:
+            stat["rata_ms"] = stat["total_ms"] / stat["panggilan"]
+            stat["sumber_utama"] = max(stat["sumber"], key=stat["sumber"].get)
+        data.sort(key=lambda stat: stat[urut], reverse=True)
+        return data[:n]
+
+    def ringkasan(self) -> dict:
+        with self._lock:
+            return {
+                "query": sum(stat["panggilan"] for stat in self._per_sidik.values()),
+                "total_query_ms": sum(stat["total_ms"] for stat in self._per_sidik.values()),
+                "sidik_unik": len(self._per_sidik),
+                "lambat": self.jumlah_lambat,
+                "ambang_lambat_ms": self.ambang_lambat_ms,
+                "koneksi": self.jumlah_koneksi,
+                "rata_koneksi_ms": (self.total_koneksi_ms / self.jumlah_koneksi) if self.jumlah_koneksi else 0.0,
+                "maks_koneksi_ms": self.maks_koneksi_ms,
+            }
+
+
+def _buat_logger_lambat() -> logging.Logger:
+    """Logger berotasi untuk query lambat; dibuat saat query lambat pertama agar folder log tidak dibuat percuma."""
+    logger = logging.getLogger("pengeluaran_app.query_lambat")
+    if not logger.handlers:
+        try:
+            os.makedirs(os.path.dirname(LOG_QUERY_LAMBAT), exist_ok=True)
+            handler = RotatingFileHandler(LOG_QUERY_LAMBAT, maxBytes=LOG_QUERY_LAMBAT_MAKS_BYTE,
+                                          backupCount=LOG_QUERY_LAMBAT_CADANGAN, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+        except OSError as e:
+            print(f"ERROR [diagnostik_query.py] Log query lambat tidak bisa dibuat: {e}")
+            logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+    return logger
+
+
+# Satu pencatat untuk seluruh proses
+pencatat = PencatatQuery()
@@ -0,0 +1,127 @@
+# ekspor_pengeluaran.py
+
+import argparse
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import os
+import time
+from konfigurasi import EKSPOR_UKURAN_CHUNK
+from manager_anggaran import AnggaranHarian
+
+# Ekspor transaksi ke CSV, JSON Lines, atau Parquet.
+# Baris dibaca per potongan (fetchmany) lewat AnggaranHarian.iter_transaksi dan langsung
+# ditulis ke file, jadi memori puncak bergantung pada ukuran potongan, bukan ukuran tabel.
+
+# Urutan kolom sama dengan tuple dari AnggaranHarian.iter_transaksi
+KOLOM_EKSPOR = ["id", "tanggal", "kategori", "deskripsi", "jumlah"]
+FORMAT_EKSPOR = {
+    "csv": ("text/csv", ".csv"),
+    "jsonl": ("application/x-ndjson", ".jsonl"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def parquet_tersedia() -> bool:
+    """Parquet butuh pyarrow (opsional)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _tulis_csv(chunks, f) -> int:
+    teks = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    writer = csv.writer(teks)
+    writer.writerow(KOLOM_EKSPOR)
+    baris = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        baris += len(rows)
+    teks.flush()
+    teks.detach()  # File milik pemanggil, jangan ikut ditutup
+    return baris
+
+
+def _tulis_jsonl(chunks, f) -> int:
+    encode = json.JSONEncoder(ensure_ascii=False).encode  # json.dumps(..., ensure_ascii=False) membuat encoder baru tiap panggilan
+    baris = 0
+    for rows in chunks:
+        f.write("".join(encode(dict(zip(KOLOM_EKSPOR, row))) + "\n" for row in rows).encode("utf-8"))
+        baris += len(rows)
+    return baris
+
+
+def _tulis_parquet(chunks, f) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    skema = pa.schema([("id", pa.int64()), ("tanggal", pa.date32()), ("kategori", pa.string()),
+                       ("deskripsi", pa.string()), ("jumlah", pa.float64())])
+    baris = 0
+    with pq.ParquetWriter(f, skema, compression="zstd") as writer:
+        for rows in chunks:
+            kolom = list(zip(*rows))
+            tanggal = [datetime.date.fromisoformat(t) if t else None for t in kolom[1]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(kolom[0], pa.int64()), pa.array(tanggal, pa.date32()), pa.array(kolom[2], pa.string()),
+                 pa.array(kolom[3], pa.string()), pa.array(kolom[4], pa.float64())], schema=skema))  # Satu row group per potongan
+            baris += len(rows)
+    return baris
+
+
+PENULIS_FORMAT = {"csv": _tulis_csv, "jsonl": _tulis_jsonl, "parquet": _tulis_parquet}
+
+
+def ekspor_transaksi(tujuan, format: str = "csv", anggaran: AnggaranHarian | None = None,
+                     tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None,
+                     ukuran_chunk: int = EKSPOR_UKURAN_CHUNK) -> dict:
+    """
+    Mengekspor transaksi (opsional dibatasi rentang tanggal, inklusif) ke `tujuan`:
+    path file atau objek file biner yang bisa ditulis. Mengembalikan ringkasan hasil ekspor.
+    """
+    if format not in PENULIS_FORMAT:
+        raise ValueError(f"Format ekspor '{format}' tidak dikenal. Pilihan: {', '.join(PENULIS_FORMAT)}")
+    if format == "parquet" and not parquet_tersedia():
+        raise ImportError("Ekspor Parquet membutuhkan pyarrow (pip install pyarrow).")
+
+    anggaran = anggaran or AnggaranHarian()
+    chunks = anggaran.iter_transaksi(tanggal_mulai, tanggal_akhir, ukuran_chunk=ukuran_chunk)
+
+    mulai = time.perf_counter()
+    if isinstance(tujuan, (str, os.PathLike)):
+        with open(tujuan, "wb") as f:
+            baris = PENULIS_FORMAT[format](chunks, f)
+            ukuran_byte = f.tell()
+    else:
+        posisi_awal = tujuan.tell()
+        baris = PENULIS_FORMAT[format](chunks, tujuan)
+        ukuran_byte = tujuan.tell() - posisi_awal
+    durasi = time.perf_counter() - mulai
+
+    return {
+        "baris": baris,
+        "byte": ukuran_byte,
+        "durasi_detik": durasi,
+        "baris_per_detik": baris / durasi if durasi > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekspor transaksi pengeluaran ke CSV, JSON Lines, atau Parquet.")
+    parser.add_argument("file_tujuan", help="Path file hasil ekspor")
+    parser.add_argument("--format", choices=list(FORMAT_EKSPOR), default=None,
+                        help="Format file (default: ditebak dari ekstensi file_tujuan)")
+    parser.add_argument("--mulai", type=datetime.date.fromisoformat, default=None, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--akhir", type=datetime.date.fromisoformat, default=None, help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument("--chunk", type=int, default=EKSPOR_UKURAN_CHUNK, help="Jumlah baris per potongan")
+    args = parser.parse_args()
+
+    format_file = args.format or os.path.splitext(args.file_tujuan)[1].lstrip(".").lower()
+    print(f"--- Memulai Ekspor: {os.path.basename(args.file_tujuan)} ({format_file}) ---")
+    hasil = ekspor_transaksi(args.file_tujuan, format_file, tanggal_mulai=args.mulai, tanggal_akhir=args.akhir,
+                             ukuran_chunk=args.chunk)
+
+    print(f"Diekspor      : {hasil['baris']} baris")
+    print(f"Ukuran file   : {hasil['byte'] / 1024:,.1f} KiB")
+    print(f"Kecepatan     : {hasil['baris_per_detik']:,.0f} baris/detik ({hasil['durasi_detik']:.2f} detik)")
+    print("--- Ekspor Selesai ---")
@@ -0,0 +1,56 @@
+# format_rupiah.py
+
+from functools import lru_cache
+
+# Format Rupiah tanpa locale. locale.setlocale berlaku global untuk seluruh proses
+# dan tidak aman dipanggil bersamaan dari thread-thread sesi Streamlit, jadi semua
+# tampilan (tabel riwayat, ringkasan, repr Transaksi) memakai fungsi di sini agar
+# hasilnya selalu sama, contoh: 25000 -> "Rp 25.000".
+
+
+def _bersihkan(angka) -> float:
+    """None / NaN / teks kosong dianggap 0."""
+    try:
+        nilai = float(angka or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if nilai != nilai else nilai  # NaN != NaN
+
+
+@lru_cache(maxsize=8192)
+def _format_angka_cached(nilai: float) -> str:
+    return f"{nilai:,.0f}".replace(",", ".")
+
+
+def format_angka(angka) -> str:
+    """Format angka dengan pemisah ribuan titik, tanpa desimal: 1250000 -> '1.250.000'."""
+    return _format_angka_cached(_bersihkan(angka))
+
+
+def format_rp(angka) -> str:
+    """Format angka ke Rupiah: 25000 -> 'Rp 25.000'."""
+    return "Rp " + _format_angka_cached(_bersihkan(angka))
+
+
+def format_rp_kolom(nilai):
+    """
+    Format satu kolom sekaligus (pandas Series, numpy array, atau list).
+    Nilai unik diformat sekali saja, lalu hasilnya disebar ke semua baris dengan
+    indexing numpy, jadi tidak ada lambda Python per baris.
+    Mengembalikan Series (index sama) jika input Series, selain itu numpy array berisi str.
+    """
+    import numpy as np
+
+    arr = np.asarray(nilai, dtype="float64")
+    if arr.size == 0:
+        hasil = np.array([], dtype=object)
+    else:
+        arr = np.where(np.isnan(arr), 0.0, arr)
+        unik, posisi = np.unique(arr, return_inverse=True)
+        teks_unik = np.array(["Rp " + _format_angka_cached(x) for x in unik.tolist()], dtype=object)
+        hasil = teks_unik[posisi.reshape(-1)]
+
+    if hasattr(nilai, "index") and hasattr(nilai, "to_numpy"):  # pandas Series
+        import pandas as pd
+        return pd.Series(hasil, index=nilai.index, name=getattr(nilai, "name", None), dtype=object)
+    return hasil
@@ -0,0 +1,196 @@
+import argparse
+import csv
+import datetime
+import os
+import re
+import time
+from konfigurasi import BATCH_UKURAN_CHUNK, KATEGORI_DEFAULT
+from manager_anggaran import AnggaranHarian
+
+# Impor massal transaksi dari file CSV / mutasi rekening bank.
+# File dibaca baris per baris (tidak dimuat seluruhnya ke memori) lalu
+# diteruskan ke AnggaranHarian.tambah_transaksi_batch.
+
+# Nama kolom yang dikenali (huruf kecil). Kolom pertama yang cocok dipakai.
+ALIAS_KOLOM = {
+    "tanggal": ["tanggal", "tgl", "date", "tanggal transaksi", "transaction date", "posting date"],
+    "deskripsi": ["deskripsi", "keterangan", "uraian", "description", "remarks"],
+    "jumlah": ["jumlah", "nominal", "amount", "debit", "debet", "mutasi"],
+    "kategori": ["kategori", "category"],
+}
+FORMAT_TANGGAL = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y/%m/%d"]
+# Kolom buku besar bertanda (uang keluar negatif, uang masuk positif). Kolom jumlah lain berisi nominal pengeluaran.
+KOLOM_BERTANDA = {"mutasi"}
+
+
+class BarisDitolak(ValueError):
+    """Baris CSV yang tidak bisa diubah menjadi transaksi pengeluaran."""
+
+
+def parse_tanggal(teks: str) -> datetime.date:
+    teks = (teks or "").strip()
+    for fmt in FORMAT_TANGGAL:
+        try:
+            return datetime.datetime.strptime(teks, fmt).date()
+        except ValueError:
+            continue
+    raise BarisDitolak(f"format tanggal '{teks}' tidak dikenali")
+
+
+def parse_jumlah(teks: str, bertanda: bool = False) -> float:
+    """
+    Mengubah teks nominal ke float positif. Mendukung 'Rp 25.000', '25.000,00', '25,000.00',
+    tanda '+'/'-' (juga '25.000-' dan '(25.000)') dan penanda mutasi bank 'DB'/'CR'.
+
+    Arti tanda:
+    - 'DB' = pengeluaran, 'CR' = uang masuk (ditolak), apa pun tandanya.
+    - bertanda=True (kolom mutasi buku besar): negatif = uang keluar (pengeluaran),
+      positif/tanpa tanda = uang masuk (ditolak).
+    - bertanda=False (kolom nominal pengeluaran): tanpa tanda atau '+' = pengeluaran,
+      negatif = refund/koreksi (ditolak, bukan diubah jadi pengeluaran).
+    """
+    teks = (teks or "").strip().upper()
+    if teks.endswith("CR"):
+        raise BarisDitolak("mutasi kredit (uang masuk), bukan pengeluaran")
+    debit = teks.endswith("DB")
+    teks = re.sub(r"[^0-9,.()+\-]", "", teks.replace("DB", ""))
+    negatif = teks.startswith("-") or teks.endswith("-") or (teks.startswith("(") and teks.endswith(")"))
+    positif = teks.startswith("+")
+    teks = teks.strip("+-()")
+    if not teks:
+        raise BarisDitolak("jumlah kosong")
+    if not re.fullmatch(r"[0-9][0-9,.]*", teks):
+        raise BarisDitolak(f"jumlah '{teks}' tidak valid")
+
+    if not debit:
+        if bertanda and not negatif:
+            raise BarisDitolak("mutasi kredit (uang masuk, nominal positif), bukan pengeluaran")
+        if not bertanda and negatif:
+            raise BarisDitolak("nominal negatif (refund/koreksi), bukan pengeluaran")
+    if negatif and positif:
+        raise BarisDitolak("jumlah bertanda ganda")
+
+    if "," in teks and "." in teks:
+        # Pemisah yang muncul terakhir adalah pemisah desimal
+        if teks.rfind(",") > teks.rfind("."):
+            teks = teks.replace(".", "").replace(",", ".")
+        else:
+            teks = teks.replace(",", "")
+    elif "," in teks:
+        bagian = teks.split(",")
+        teks = teks.replace(",", ".") if len(bagian) == 2 and len(bagian[1]) <= 2 else teks.replace(",", "")
+    elif teks.count(".") > 1 or re.search(r"\.\d{3}$", teks):
+        teks = teks.replace(".", "")  # Titik sebagai pemisah ribuan: 25.000
+
+    try:
+        return float(teks)
+    except ValueError:
+        raise BarisDitolak(f"jumlah '{teks}' tidak valid")
+
+
+def _petakan_kolom(header: list[str]) -> dict:
+    header_kecil = {nama.strip().lower(): nama for nama in header if nama}
+    peta = {}
+    for kunci, alias_list in ALIAS_KOLOM.items():
+        for alias in alias_list:
+            if alias in header_kecil:
+                peta[kunci] = header_kecil[alias]
+                break
+    hilang = [k for k in ("tanggal", "deskripsi", "jumlah") if k not in peta]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ditemukan di header CSV: {', '.join(hilang)}")
+    return peta
+
+
+def baca_csv(path: str, ditolak: list, pemisah: str | None = None, encoding: str = "utf-8-sig",
+             bertanda: bool | None = None):
+    """
+    Generator: membaca CSV secara lazy dan menghasilkan tuple (deskripsi, jumlah, kategori, tanggal).
+    Baris yang gagal di-parse dicatat ke list `ditolak` sebagai (nomor_baris, alasan).
+    bertanda=None: kolom jumlah dianggap bertanda hanya jika namanya ada di KOLOM_BERTANDA (lihat parse_jumlah).
+    """
+    with open(path, newline="", encoding=encoding) as f:
+        if pemisah is None:
+            contoh = f.read(4096)
+            f.seek(0)
+            try:
+                pemisah = csv.Sniffer().sniff(contoh, delimiters=",;\t|").delimiter
+            except csv.Error:
+                pemisah = ","
+
+        reader = csv.DictReader(f, delimiter=pemisah)
+        peta = _petakan_kolom(reader.fieldnames or [])
+        if bertanda is None:
+            bertanda = peta["jumlah"].strip().lower() in KOLOM_BERTANDA
+
+        for row in reader:
+            nomor = reader.line_num
+            try:
+                tanggal = parse_tanggal(row.get(peta["tanggal"]))
+                jumlah = parse_jumlah(row.get(peta["jumlah"]), bertanda)
+                deskripsi = (row.get(peta["deskripsi"]) or "").strip()
+                kategori = (row.get(peta["kategori"]) or "").strip() if "kategori" in peta else ""
+                yield (deskripsi, jumlah, kategori or KATEGORI_DEFAULT, tanggal)
+            except BarisDitolak as e:
+                ditolak.append((nomor, str(e)))
+
+
+def ringkas_id(ids: list[int]) -> str:
+    """[1, 2, 3, 7, 8] -> '1-3, 7-8'"""
+    if not ids:
+        return "-"
+    rentang, awal, sebelum = [], ids[0], ids[0]
+    for i in ids[1:]:
+        if i != sebelum + 1:
+            rentang.append(f"{awal}-{sebelum}" if awal != sebelum else f"{awal}")
+            awal = i
+        sebelum = i
+    rentang.append(f"{awal}-{sebelum}" if awal != sebelum else f"{awal}")
+    return ", ".join(rentang)
+
+
+def impor_csv(path: str, anggaran: AnggaranHarian | None = None, ukuran_chunk: int = BATCH_UKURAN_CHUNK,
+              pemisah: str | None = None, encoding: str = "utf-8-sig", bertanda: bool | None = None) -> dict:
+    """Mengimpor satu file CSV. Mengembalikan ringkasan hasil impor."""
+    anggaran = anggaran or AnggaranHarian()
+    ditolak_parse = []
+
+    id_impor = anggaran.mulai_batch_impor(os.path.basename(path))  # Untuk menghapus/undo seluruh impor sekaligus
+
+    mulai = time.perf_counter()
+    hasil = anggaran.tambah_transaksi_batch(baca_csv(path, ditolak_parse, pemisah, encoding, bertanda), ukuran_chunk=ukuran_chunk,
+                                            id_impor=id_impor)
+    durasi = time.perf_counter() - mulai
+
+    hasil["ditolak"] = ditolak_parse + [(f"#{nomor}", alasan) for nomor, alasan in hasil["ditolak"]]
+    hasil["durasi_detik"] = durasi
+    hasil["id_impor"] = id_impor
+    hasil["baris_per_detik"] = (hasil["disimpan"] + len(hasil["ditolak"])) / durasi if durasi > 0 else 0.0
+    return hasil
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Impor transaksi pengeluaran dari file CSV / mutasi rekening.")
+    parser.add_argument("file_csv", help="Path file CSV yang akan diimpor")
+    parser.add_argument("--chunk", type=int, default=BATCH_UKURAN_CHUNK, help="Jumlah baris per commit")
+    parser.add_argument("--pemisah", default=None, help="Pemisah kolom (default: deteksi otomatis)")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--bertanda", action=argparse.BooleanOptionalAction, default=None,
+                        help="Kolom jumlah bertanda: negatif = uang keluar, positif = uang masuk "
+                             "(default: hanya untuk kolom 'mutasi')")
+    args = parser.parse_args()
+
+    print(f"--- Memulai Impor: {os.path.basename(args.file_csv)} ---")
+    hasil = impor_csv(args.file_csv, ukuran_chunk=args.chunk, pemisah=args.pemisah, encoding=args.encoding,
+                      bertanda=args.bertanda)
+
+    print(f"Disimpan      : {hasil['disimpan']} baris")
+    print(f"Ditolak       : {len(hasil['ditolak'])} baris")
+    for nomor, alasan in hasil["ditolak"][:20]:
+        print(f"   - baris {nomor}: {alasan}")
+    if len(hasil["ditolak"]) > 20:
+        print(f"   ... dan {len(hasil['ditolak']) - 20} baris lainnya")
+    print(f"ID baru       : {ringkas_id(hasil['id_baru'])}")
+    print(f"Batch impor   : #{hasil['id_impor']} (hapus sekaligus lewat menu Riwayat Transaksi)")
+    print(f"Kecepatan     : {hasil['baris_per_detik']:,.0f} baris/detik ({hasil['durasi_detik']:.2f} detik)")
+    print("--- Impor Selesai ---")
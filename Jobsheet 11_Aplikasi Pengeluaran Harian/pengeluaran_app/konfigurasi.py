@@ -5,3 +5,61 @@ NAMA_DB = 'pengeluaran_harian.db'
 DB_PATH = os.path.join(BASE_DIR, NAMA_DB)
 KATEGORI_PENGELUARAN = ["Makanan", "Transportasi", "Hiburan", "Tagihan", "Belanja", "Kesehatan", "Pendidikan", "Lainnya"]
 KATEGORI_DEFAULT = "Lainnya"
+
+# Pengaturan pool koneksi SQLite (dipakai oleh database.py)
+DB_TIMEOUT = 10
+DB_POOL_MAKS = 8  # Jumlah koneksi idle maksimum yang disimpan per file database
+DB_PRAGMA = {
+    "journal_mode": "WAL",     # Pembaca tidak memblokir penulis (dan sebaliknya)
+    "synchronous": "NORMAL",   # Aman untuk WAL, jauh lebih cepat dari FULL
+    "cache_size": -20000,      # Nilai negatif = KiB, jadi sekitar 20 MB per koneksi
+    "mmap_size": 268435456,    # 256 MB memory-mapped I/O
+}
+
+# Impor massal: jumlah baris per transaksi/commit saat tambah_transaksi_batch
+BATCH_UKURAN_CHUNK = 5000
+
+# Diagnostik query (dipakai oleh diagnostik_query.py)
+QUERY_LAMBAT_MS = float(os.environ.get("PENGELUARAN_QUERY_LAMBAT_MS", 100))  # Ambang query lambat; <= 0 mematikan log
+LOG_QUERY_LAMBAT = os.path.join(BASE_DIR, "log", "query_lambat.log")
+LOG_QUERY_LAMBAT_MAKS_BYTE = 1_000_000  # Ukuran per file sebelum dirotasi
+LOG_QUERY_LAMBAT_CADANGAN = 3           # Jumlah file lama yang disimpan (query_lambat.log.1 ... .3)
+TAMPILKAN_DIAGNOSTIK = os.environ.get("PENGELUARAN_DIAGNOSTIK", "0") == "1"  # Panel diagnostik di sidebar (PENGELUARAN_DIAGNOSTIK=1 untuk menampilkan)
+
+# Penulis tunggal: semua INSERT/UPDATE/DELETE lewat satu thread dengan group commit
+PENULIS_MAKS_GRUP = 256  # Maksimum pekerjaan tulis yang digabung dalam satu COMMIT
+PENULIS_TIMEOUT = 30     # Detik menunggu hasil tulis sebelum menyerah
+
+# Snapshot kolom di memori untuk Ringkasan; 0 = selalu hitung lewat SQL (rekap_harian)
+SNAPSHOT_ANALITIK = os.environ.get("PENGELUARAN_SNAPSHOT", "1") == "1"
+
+# Ekspor: jumlah baris per potongan fetchmany (batas memori puncak saat ekspor)
+EKSPOR_UKURAN_CHUNK = 5000
+
+# Hapus transaksi = soft delete (tombstone); tombstone lebih tua dari ini dibuang permanen oleh pembersih latar
+TOMBSTONE_SIMPAN_HARI = int(os.environ.get("PENGELUARAN_TOMBSTONE_HARI", "7"))
+PURGE_INTERVAL_DETIK = 3600
+
+# Pencarian deskripsi: hanya N kecocokan terbaru yang diberi peringkat bm25 (biaya tetap berapapun besar tabel)
+CARI_JENDELA_PERINGKAT = 500
+
+# Mode multi-pengguna: tiap pengguna punya file database sendiri di TENANT_FOLDER (lihat manager_tenant.py)
+MULTI_TENANT = os.environ.get("PENGELUARAN_MULTI_TENANT", "0") == "1"
+TENANT_FOLDER = os.environ.get("PENGELUARAN_TENANT_FOLDER", os.path.join(BASE_DIR, "tenant"))
+TENANT_MAKS_AKTIF = 16      # Tenant yang koneksi & AnggaranHarian-nya tetap hangat (LRU)
+TENANT_PEKERJA_AGREGAT = 8  # Thread paralel untuk ringkasan lintas tenant
+# Asal identitas pengguna (= tenant) di mode multi-tenant:
+#   "login"  : st.login / st.user (OIDC, butuh bagian [auth] di .streamlit/secrets.toml), identitas = email
+#   "header" : header dari reverse proxy yang sudah mengautentikasi pengguna (TENANT_HEADER);
+#              aplikasi tidak boleh bisa diakses langsung tanpa proxy, karena header mudah dipalsukan
+#   "manual" : nama diketik di sidebar TANPA autentikasi, hanya untuk satu host tepercaya; halaman admin mati
+TENANT_IDENTITAS = os.environ.get("PENGELUARAN_TENANT_IDENTITAS", "login")
+TENANT_HEADER = os.environ.get("PENGELUARAN_TENANT_HEADER", "X-Forwarded-User")
+# Identitas (email/isi header) yang boleh melihat ringkasan lintas pengguna; kosong = tidak ada admin
+TENANT_ADMIN = [n.strip().lower() for n in os.environ.get("PENGELUARAN_ADMIN", "").split(",") if n.strip()]
+
+# Batas anggaran per kategori: status "hampir habis" jika pemakaian sudah mencapai porsi ini dari batas
+ANGGARAN_AMBANG_PERINGATAN = 0.8
+
+# Cetak rincian waktu cold start (impor, inisialisasi, render pertama) ke konsol, lihat profil_startup.py
+PROFIL_STARTUP = os.environ.get("PENGELUARAN_PROFIL_STARTUP", "0") == "1"
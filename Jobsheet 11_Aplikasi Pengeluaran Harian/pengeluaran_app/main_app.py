@@ -2,47 +2,105 @@
 
 import streamlit as st
 import datetime
-import pandas as pd
-import locale
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING
+import profil_startup  # pandas tidak diimpor di sini: baru dimuat saat halaman pertama kali butuh DataFrame
 
-# --- Setting Locale ---
-try:
-    locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-except locale.Error:
-    try:
-        locale.setlocale(locale.LC_ALL, 'Indonesian_Indonesia.1252')
-    except:
-        print("Locale id_ID/Indonesian tidak tersedia.")
-
-def format_rp(angka):
-    """Format angka ke Rupiah."""
-    try:
-        return locale.currency(angka or 0, grouping=True, symbol='Rp ')[:-3]
-    except:
-        return f"Rp {angka or 0:,.0f}".replace(",", ".")
+if TYPE_CHECKING:
+    import pandas as pd  # Hanya untuk anotasi; saat runtime pandas diimpor di dalam fungsi yang memakainya
 
 
 # --- Import Modul Internal ---
-try:
-    from model import Transaksi
-    from manager_anggaran import AnggaranHarian # PERBAIKI: Ganti 'manajer_anggaran' menjadi 'manager_anggaran'
-    from konfigurasi import KATEGORI_PENGELUARAN
-except ImportError as e:
-    st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada.")
-    st.stop()
+with profil_startup.tahap("impor modul aplikasi"):
+    try:
+        from model import Transaksi
+        from manager_anggaran import AnggaranHarian # PERBAIKI: Ganti 'manajer_anggaran' menjadi 'manager_anggaran'
+        from konfigurasi import (KATEGORI_PENGELUARAN, TAMPILKAN_DIAGNOSTIK, MULTI_TENANT, TENANT_ADMIN, TENANT_IDENTITAS,
+                                 TENANT_HEADER, SNAPSHOT_ANALITIK)
+        from manager_tenant import ManagerTenant, nama_dari_identitas
+        from format_rupiah import format_rp, format_rp_kolom
+        import periode
+        from ekspor_pengeluaran import ekspor_transaksi, parquet_tersedia, FORMAT_EKSPOR
+        import diagnostik_query
+        import database
+    except ImportError as e:
+        st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada.")
+        st.stop()
 
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(page_title="Catatan Pengeluaran", layout="wide", initial_sidebar_state="expanded")
 
+PILIHAN_PERIODE = ["Semua Waktu", "Hari Ini", "Pilih Tanggal", "Minggu Ini", "Bulan Ini (s.d. Hari Ini)",
+                   "30 Hari Terakhir", "Pilih Bulan", "Pilih Rentang"]
+
 
 # --- Inisialisasi Pengelola Anggaran (gunakan cache) ---
 @st.cache_resource
 def get_anggaran_manager():
     print(">>> STREAMLIT: (Cache Resource) Menginisialisasi AnggaranHarian...")
-    return AnggaranHarian()
+    with profil_startup.tahap("inisialisasi AnggaranHarian (cek skema)"):
+        manager = AnggaranHarian()
+    manager.mulai_pembersih_latar()  # Purge tombstone lewat masa undo + merge bertahap indeks pencarian
+    return manager
 
-anggaran = get_anggaran_manager()
+
+@st.cache_resource
+def get_manager_tenant():
+    print(">>> STREAMLIT: (Cache Resource) Menginisialisasi ManagerTenant...")
+    return ManagerTenant()
+
+
+def identitas_pengguna() -> str | None:
+    """Identitas pengguna multi-tenant menurut TENANT_IDENTITAS; None (dengan pesan) jika belum diketahui."""
+    if TENANT_IDENTITAS == "login":
+        if "is_logged_in" not in st.user:  # Hanya ada jika bagian [auth] dikonfigurasi
+            st.error("Mode login membutuhkan bagian [auth] di .streamlit/secrets.toml (lihat dokumentasi st.login).")
+            return None
+        if not st.user.is_logged_in:
+            st.info("Masuk dulu untuk membuka catatan Anda.")
+            st.sidebar.button("Masuk", on_click=st.login, key="tenant_masuk")
+            return None
+        st.sidebar.caption(f"Masuk sebagai {st.user.get('email')}")
+        st.sidebar.button("Keluar", on_click=st.logout, key="tenant_keluar")
+        return st.user.get("email") or st.user.get("sub")
+    if TENANT_IDENTITAS == "header":
+        identitas = st.context.headers.get(TENANT_HEADER)
+        if not identitas:
+            st.error(f"Header {TENANT_HEADER} tidak ada. Mode ini harus dijalankan di balik reverse proxy "
+                     "yang mengautentikasi pengguna.")
+        return identitas
+    if TENANT_IDENTITAS == "manual":
+        st.sidebar.warning("Mode tanpa autentikasi: siapa pun bisa membuka nama siapa pun. Hanya untuk host tepercaya.")
+        identitas = st.sidebar.text_input("Nama pengguna:", key="tenant_nama", placeholder="Contoh: budi").strip()
+        if not identitas:
+            st.info("Masukkan nama pengguna di sidebar untuk membuka catatan Anda.")
+        return identitas or None
+    st.error(f"PENGELUARAN_TENANT_IDENTITAS '{TENANT_IDENTITAS}' tidak dikenal (login, header, atau manual).")
+    return None
+
+
+def pilih_anggaran() -> tuple[AnggaranHarian | None, bool]:
+    """
+    Mode satu pengguna: satu AnggaranHarian global. Mode multi-tenant: milik pengguna yang terautentikasi.
+    Mengembalikan (anggaran, boleh melihat halaman admin).
+    """
+    if not MULTI_TENANT:
+        return get_anggaran_manager(), False
+    identitas = identitas_pengguna()
+    if not identitas:
+        return None, False
+    # Nama ketikan bebas tidak bisa dipercaya, jadi mode manual tidak pernah mendapat hak admin
+    admin = TENANT_IDENTITAS != "manual" and identitas.strip().lower() in TENANT_ADMIN
+    try:
+        nama = identitas if TENANT_IDENTITAS == "manual" else nama_dari_identitas(identitas)
+        with profil_startup.tahap("buka database tenant"):
+            return get_manager_tenant().ambil(nama), admin
+    except ValueError as e:
+        st.sidebar.error(str(e))
+        return None, False
 
 
 # --- Halaman Tambah Transaksi ---
@@ -67,80 +125,331 @@ def halaman_input(anggaran: AnggaranHarian):
                 st.warning("Deskripsi wajib!")
             elif jumlah is None or jumlah <= 0:
                 st.warning("Jumlah wajib!")
+            elif tanggal.year in {a['tahun'] for a in anggaran.cached("get_daftar_arsip")}:
+                st.warning(f"Tahun {tanggal.year} sudah diarsipkan (hanya-baca). Kembalikan arsipnya dulu di halaman Riwayat.")
             else:
                 with st.spinner("Menyimpan..."):
                     tx = Transaksi(deskripsi, float(jumlah), kategori, tanggal)
-                    if anggaran.tambah_transaksi(tx):
-                        st.success("OK! Disimpan.")
-                        st.cache_data.clear() # Hapus cache agar data terbaru dimuat
+                    # Hanya disimpan jika masih dalam batas anggaran; jika tidak, minta konfirmasi dulu
+                    hasil = anggaran.tambah_transaksi(tx, dalam_anggaran=True)
+                    if hasil:
+                        st.success("OK! Disimpan.") # Cache ringkasan basi otomatis karena versi data berubah
                         st.rerun() # Refresh aplikasi
+                    elif hasil is False:  # False hanya berarti melewati batas anggaran
+                        st.session_state['tx_tertunda'] = tx
+                    elif tx.jumlah <= 0:
+                        st.warning("Jumlah tidak valid, transaksi tidak disimpan.")
                     else:
                         st.error("Gagal menyimpan.")
 
+    konfirmasi_lewat_anggaran(anggaran)
+
+    # Ringkas tanpa tabel DataFrame, supaya halaman pertama tidak perlu memuat pandas
+    for status in anggaran.cached("get_status_anggaran", datetime.date.today()):
+        if status['status'] is None:
+            continue
+        sisa = [f"{periode_batas} {format_rp(status[f'sisa_{periode_batas}'])}"
+                for periode_batas in ("harian", "bulanan") if status[f'batas_{periode_batas}'] is not None]
+        st.caption(f"Sisa anggaran {status['kategori']}: {' · '.join(sisa)} ({LABEL_STATUS_ANGGARAN[status['status']]})")
+
+
+def konfirmasi_lewat_anggaran(anggaran: AnggaranHarian):
+    """Transaksi yang ditahan karena melewati batas anggaran: tampilkan peringatan, simpan hanya jika dikonfirmasi."""
+    tx = st.session_state.get('tx_tertunda')
+    if tx is None:
+        return
+    status = anggaran.cek_anggaran(tx.kategori, tx.tanggal, tx.jumlah)
+    pesan = [f"**{tx.deskripsi}** ({format_rp(tx.jumlah)}) membuat kategori {tx.kategori} melewati batas anggaran:"]
+    if status.get("status_harian") == "melebihi":
+        pesan.append(f"- Harian: terpakai {format_rp(status['terpakai_harian'])} dari {format_rp(status['batas_harian'])}")
+    if status.get("status_bulanan") == "melebihi":
+        pesan.append(f"- Bulanan: terpakai {format_rp(status['terpakai_bulanan'])} dari {format_rp(status['batas_bulanan'])}")
+    st.warning("\n".join(pesan))
+    col_simpan, col_batal = st.columns(2)
+    with col_simpan:
+        if st.button("Tetap Simpan", key="anggaran_tetap_simpan", type="primary"):
+            if anggaran.tambah_transaksi(tx):
+                st.session_state['tx_tertunda'] = None
+                st.rerun()
+            else:
+                st.error("Gagal menyimpan.")
+    with col_batal:
+        if st.button("Batal", key="anggaran_batal"):
+            st.session_state['tx_tertunda'] = None
+            st.rerun()
+
+
+LABEL_STATUS_ANGGARAN = {"melebihi": "Melebihi", "hampir": "Hampir habis", "aman": "Aman", None: "-"}
+
+
+def tabel_status_anggaran(daftar_status: list[dict]):
+    """Tabel batas, pemakaian, dan sisa anggaran per kategori (hari ini & bulan ini)."""
+    import pandas as pd
+
+    def rp(nilai):
+        return "-" if nilai is None else format_rp(nilai)
+
+    df_status = pd.DataFrame([{
+        "Kategori": s['kategori'],
+        "Terpakai Hari Ini": rp(s['terpakai_harian']),
+        "Batas Harian": rp(s['batas_harian']),
+        "Sisa Harian": rp(s['sisa_harian']),
+        "Terpakai Bulan Ini": rp(s['terpakai_bulanan']),
+        "Batas Bulanan": rp(s['batas_bulanan']),
+        "Sisa Bulanan": rp(s['sisa_bulanan']),
+        "Status": LABEL_STATUS_ANGGARAN[s['status']],
+    } for s in daftar_status])
+    st.dataframe(df_status, hide_index=True, use_container_width=True)
+
 
 # --- Halaman Riwayat ---
 def halaman_riwayat(anggaran: AnggaranHarian):
     st.subheader("Detail Semua Transaksi")
-    if st.button("Refresh Riwayat"):
-        st.cache_data.clear() # Hapus cache agar data terbaru dimuat
-        st.rerun() # Refresh aplikasi
 
+    # Paginasi keyset: simpan kursor awal setiap halaman yang sudah dibuka (halaman 1 = None)
+    if 'riwayat_kursor' not in st.session_state:
+        st.session_state.riwayat_kursor = [None]
+
+    def reset_halaman():
+        st.session_state.riwayat_kursor = [None]
+
+    col_ref, col_ukuran = st.columns([3, 1])
+    with col_ref:
+        if st.button("Refresh Riwayat"):
+            reset_halaman()
+            st.rerun() # Refresh aplikasi
+    with col_ukuran:
+        ukuran_halaman = st.selectbox("Baris per halaman:", [25, 50, 100, 200], index=1, key="riwayat_ukuran", on_change=reset_halaman)
+
+    kata_cari = st.text_input("Cari deskripsi:", placeholder="Contoh: grab, listrik, makan si", key="riwayat_cari",
+                              on_change=reset_halaman).strip()
+    if kata_cari:
+        halaman_cari(anggaran, kata_cari, ukuran_halaman)
+        return
+
+    nomor_halaman = len(st.session_state.riwayat_kursor)
     with st.spinner("Memuat riwayat..."):
-        df_transaksi = anggaran.get_dataframe_transaksi()
+        df_transaksi, kursor_berikutnya = anggaran.get_halaman_transaksi(ukuran=ukuran_halaman, setelah=st.session_state.riwayat_kursor[-1])
 
     if df_transaksi is None:
         st.error("Gagal mengambil riwayat.")
-    elif df_transaksi.empty:
+    elif df_transaksi.empty and nomor_halaman == 1:
         st.info("Belum ada transaksi.")
     else:
-        st.dataframe(df_transaksi, use_container_width=True, hide_index=True)
-
-        # --- Fungsionalitas Hapus Transaksi ---
-        st.markdown("---")
-        st.subheader("Hapus Transaksi")
-        st.warning("Perhatian: Penghapusan transaksi bersifat permanen.")
-
-        col_del1, col_del2 = st.columns([1, 2])
-        with col_del1:
-            id_to_delete = st.number_input(
-                "Masukkan ID Transaksi yang ingin dihapus:",
-                min_value=1,
-                step=1,
-                value=None,
-                placeholder="Contoh: 101",
-                key="id_delete_input"
-            )
-        with col_del2:
-            st.markdown("<br>", unsafe_allow_html=True) # Spacer
-            if st.button("Hapus Transaksi Terpilih", key="delete_button"):
-                if id_to_delete is None:
-                    st.error("Mohon masukkan ID transaksi yang valid.")
+        terpilih = tabel_transaksi(df_transaksi)
+
+        total_transaksi = anggaran.hitung_jumlah_transaksi()
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ Sebelumnya", disabled=nomor_halaman == 1, key="riwayat_prev"):
+                st.session_state.riwayat_kursor.pop()
+                st.rerun()
+        with col_info:
+            st.caption(f"Halaman {nomor_halaman} · {len(df_transaksi)} baris ditampilkan dari {total_transaksi} transaksi")
+        with col_next:
+            if st.button("Berikutnya ▶", disabled=kursor_berikutnya is None, key="riwayat_next"):
+                st.session_state.riwayat_kursor.append(kursor_berikutnya)
+                st.rerun()
+
+        bagian_ekspor(anggaran)
+        bagian_arsip(anggaran)
+
+        bagian_hapus(anggaran, terpilih)
+
+
+def tabel_transaksi(df_transaksi: "pd.DataFrame") -> list[int]:
+    """Tabel transaksi dengan pilihan baris; mengembalikan ID baris yang dicentang."""
+    pilihan = st.dataframe(df_transaksi, use_container_width=True, hide_index=True,
+                           on_select="rerun", selection_mode="multi-row", key="riwayat_tabel")
+    return [int(df_transaksi['id'].iloc[i]) for i in pilihan.selection.rows if i < len(df_transaksi)]
+
+
+def halaman_cari(anggaran: AnggaranHarian, kata_cari: str, ukuran_halaman: int):
+    """Hasil pencarian deskripsi (FTS5), urut relevansi, dipaginasi dengan offset."""
+    # riwayat_kursor dipakai ulang sebagai penanda halaman: reset_halaman juga mengembalikan pencarian ke halaman 1
+    nomor_halaman = len(st.session_state.riwayat_kursor)
+    offset = (nomor_halaman - 1) * ukuran_halaman
+    with st.spinner("Mencari..."):
+        df_hasil, jumlah_hasil, lebih = anggaran.cari_transaksi(kata_cari, limit=ukuran_halaman, offset=offset)
+
+    if df_hasil.empty and nomor_halaman == 1:
+        st.info(f"Tidak ada transaksi yang cocok dengan '{kata_cari}'.")
+        return
+
+    terpilih = tabel_transaksi(df_hasil)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("◀ Sebelumnya", disabled=nomor_halaman == 1, key="cari_prev"):
+            st.session_state.riwayat_kursor.pop()
+            st.rerun()
+    with col_info:
+        keterangan = f"{jumlah_hasil}+ kecocokan (peringkat dari {jumlah_hasil} terbaru)" if lebih else f"{jumlah_hasil} kecocokan"
+        st.caption(f"Halaman {nomor_halaman} · {len(df_hasil)} baris ditampilkan · {keterangan}")
+    with col_next:
+        if st.button("Berikutnya ▶", disabled=offset + len(df_hasil) >= jumlah_hasil, key="cari_next"):
+            st.session_state.riwayat_kursor.append(None)
+            st.rerun()
+
+    bagian_hapus(anggaran, terpilih)
+
+
+def parse_daftar_id(teks: str) -> list[int]:
+    """'1, 5, 10-12' -> [1, 5, 10, 11, 12]. ValueError jika format salah."""
+    ids = []
+    for bagian in teks.replace(";", ",").split(","):
+        bagian = bagian.strip()
+        if not bagian:
+            continue
+        awal, _, akhir = bagian.partition("-")
+        awal, akhir = int(awal), int(akhir or awal)
+        if awal <= 0 or akhir < awal:
+            raise ValueError(f"Rentang ID '{bagian}' tidak valid.")
+        ids.extend(range(awal, akhir + 1))
+    return ids
+
+
+def bagian_hapus(anggaran: AnggaranHarian, terpilih: list[int]):
+    """Hapus massal (satu transaksi database) berdasarkan baris terpilih, daftar ID, rentang tanggal, atau batch impor."""
+    st.markdown("---")
+    st.subheader("Hapus Transaksi")
+
+    # Hasil hapus terakhir + tombol undo (token disimpan per sesi)
+    hapus_terakhir = st.session_state.get('hapus_terakhir')
+    if hapus_terakhir:
+        col_info, col_undo = st.columns([3, 1])
+        with col_info:
+            st.success(f"{hapus_terakhir['dihapus']} transaksi dihapus ({hapus_terakhir['keterangan']}).")
+        with col_undo:
+            if st.button("Batalkan (Undo)", key="hapus_undo"):
+                dipulihkan = anggaran.batalkan_hapus(hapus_terakhir['token'])
+                st.session_state['hapus_terakhir'] = None
+                st.toast(f"{dipulihkan} transaksi dipulihkan.")
+                st.rerun()
+
+    mode = st.radio("Hapus berdasarkan:", ["Baris terpilih", "Daftar ID", "Rentang tanggal", "Batch impor"],
+                    horizontal=True, key="hapus_mode")
+    kriteria, keterangan = {}, ""
+    if mode == "Baris terpilih":
+        if terpilih:
+            kriteria, keterangan = {"ids": terpilih}, f"{len(terpilih)} baris terpilih"
+        else:
+            st.caption("Centang baris pada tabel di atas untuk memilih transaksi.")
+    elif mode == "Daftar ID":
+        teks_id = st.text_input("ID transaksi:", placeholder="Contoh: 101, 105, 110-120", key="hapus_daftar_id")
+        if teks_id:
+            try:
+                kriteria, keterangan = {"ids": parse_daftar_id(teks_id)}, f"ID {teks_id}"
+            except ValueError as e:
+                st.error(f"Daftar ID tidak valid: {e}")
+    elif mode == "Rentang tanggal":
+        hari_ini = datetime.date.today()
+        rentang = st.date_input("Rentang:", value=(hari_ini, hari_ini), key="hapus_rentang")
+        if isinstance(rentang, (tuple, list)) and len(rentang) == 2:
+            kriteria = {"tanggal_mulai": rentang[0], "tanggal_akhir": rentang[1]}
+            keterangan = f"{rentang[0].strftime('%d %b %Y')} - {rentang[1].strftime('%d %b %Y')}"
+    else:
+        daftar_batch = [b for b in anggaran.get_batch_impor() if b['aktif'] > 0]
+        if daftar_batch:
+            batch = st.selectbox("Batch impor:", daftar_batch, key="hapus_batch",
+                                 format_func=lambda b: f"#{b['id']} · {b['sumber']} · {b['dibuat_pada']} ({b['aktif']} transaksi)")
+            kriteria, keterangan = {"id_impor": batch['id']}, f"batch impor #{batch['id']} {batch['sumber']}"
+        else:
+            st.caption("Belum ada batch impor yang masih punya transaksi.")
+
+    if kriteria:
+        jumlah_calon = anggaran.hitung_calon_hapus(**kriteria)
+        st.caption(f"{jumlah_calon} transaksi akan dihapus. Penghapusan bisa dibatalkan sampai tombstone dibersihkan.")
+        if jumlah_calon == 0 and anggaran.cached("get_daftar_arsip"):
+            st.caption("Transaksi di tahun arsip tidak bisa dihapus; kembalikan arsipnya dulu.")
+        if st.button(f"Hapus {jumlah_calon} Transaksi", key="hapus_button", type="primary", disabled=jumlah_calon == 0):
+            with st.spinner("Menghapus..."):
+                hasil = anggaran.hapus_transaksi_batch(**kriteria)
+            if hasil["dihapus"]:
+                st.session_state['hapus_terakhir'] = dict(hasil, keterangan=keterangan)
+            else:
+                st.error("Tidak ada transaksi yang dihapus.")
+            st.rerun()
+
+
+def bagian_ekspor(anggaran: AnggaranHarian):
+    """Tombol unduh: file baru dibuat saat tombol diklik, baris dialirkan per potongan ke file sementara."""
+    with st.expander("Ekspor Transaksi"):
+        pilihan_format = ["csv", "jsonl"] + (["parquet"] if parquet_tersedia() else [])
+        col_format, col_rentang = st.columns([1, 2])
+        with col_format:
+            format_ekspor = st.selectbox("Format:", pilihan_format, format_func=str.upper, key="ekspor_format")
+        with col_rentang:
+            tanggal_mulai, tanggal_akhir = None, None
+            if st.checkbox("Batasi rentang tanggal", key="ekspor_pakai_rentang"):
+                hari_ini = datetime.date.today()
+                rentang = st.date_input("Rentang:", value=(hari_ini.replace(day=1), hari_ini), key="ekspor_rentang")
+                if len(rentang) == 2:
+                    tanggal_mulai, tanggal_akhir = rentang
+
+        mime, ekstensi = FORMAT_EKSPOR[format_ekspor]
+
+        def buat_file() -> bytes:
+            # Penulis mengalirkan baris ke file sementara bernama (bukan ke memori), tetapi Streamlit tetap
+            # membaca seluruh isi unduhan menjadi bytes. File dibaca sekali lalu langsung ditutup & dihapus.
+            fd, path = tempfile.mkstemp(prefix="ekspor_", suffix=ekstensi)
+            os.close(fd)
+            try:
+                ekspor_transaksi(path, format_ekspor, anggaran, tanggal_mulai, tanggal_akhir)
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+        akhiran = f"_{tanggal_mulai}_{tanggal_akhir}" if tanggal_mulai else ""
+        st.download_button(f"Unduh {format_ekspor.upper()}", data=buat_file, file_name=f"transaksi{akhiran}{ekstensi}",
+                           mime=mime, on_click="ignore", key="ekspor_unduh")
+        st.caption("Unduhan lewat browser disiapkan utuh di memori server. Untuk data sangat besar, "
+                   "gunakan CLI: python ekspor_pengeluaran.py (ditulis bertahap langsung ke file).")
+
+
+def bagian_arsip(anggaran: AnggaranHarian):
+    """Tahun yang sudah tutup dipindah ke file arsip: tabel live tetap kecil, ringkasan tetap lengkap."""
+    with st.expander("Arsip Tahunan"):
+        daftar = anggaran.cached("get_daftar_arsip")
+        for a in daftar:
+            st.caption(f"{a['tahun']}: {a['jumlah']:,} transaksi · {format_rp(a['total'])} · diarsipkan {a['diarsipkan_pada']}"
+                       + ("" if a['ada'] else " · FILE ARSIP TIDAK DITEMUKAN"))
+        st.caption("Transaksi tahun arsip tetap muncul di riwayat, ekspor, dan pencarian, tetapi tidak bisa ditambah, "
+                   "diubah, atau dihapus. Tombstone tahun itu dibuang permanen saat diarsipkan.")
+
+        tahun_ini = datetime.date.today().year
+        diarsipkan = [a['tahun'] for a in daftar]
+        col_arsip, col_kembali = st.columns(2)
+        with col_arsip:
+            tahun = int(st.number_input("Tahun:", min_value=1900, max_value=tahun_ini - 1, value=tahun_ini - 1, step=1,
+                                        key="arsip_tahun"))
+            if st.button(f"Arsipkan {tahun}", key="arsip_button", disabled=tahun in diarsipkan):
+                try:
+                    with st.spinner(f"Mengarsipkan {tahun}..."):
+                        hasil = anggaran.arsipkan_tahun(tahun)
+                except ValueError as e:
+                    st.error(str(e))
                 else:
-                    # Konfirmasi Penghapusan
-                    st.session_state['confirm_delete_id'] = id_to_delete
-                    st.session_state['show_confirm_dialog'] = True
-
-        if st.session_state.get('show_confirm_dialog', False):
-            with st.expander(f"Konfirmasi Penghapusan ID: {st.session_state['confirm_delete_id']}", expanded=True):
-                st.warning(f"Anda yakin ingin menghapus transaksi dengan ID **{st.session_state['confirm_delete_id']}**? Tindakan ini tidak dapat dibatalkan.")
-                col_confirm_btn1, col_confirm_btn2 = st.columns(2)
-                with col_confirm_btn1:
-                    if st.button("YA, Hapus Sekarang!", key="confirm_delete_yes"):
-                        with st.spinner("Menghapus..."):
-                            if anggaran.hapus_transaksi(st.session_state['confirm_delete_id']):
-                                st.success(f"Transaksi dengan ID {st.session_state['confirm_delete_id']} berhasil dihapus!")
-                                st.cache_data.clear() # Bersihkan cache
-                                st.session_state['show_confirm_dialog'] = False # Sembunyikan dialog
-                                st.rerun() # Refresh tampilan
-                            else:
-                                st.error(f"Gagal menghapus transaksi dengan ID {st.session_state['confirm_delete_id']}. Pastikan ID benar.")
-                                st.session_state['show_confirm_dialog'] = False # Sembunyikan dialog
-                                st.rerun() # Refresh tampilan (opsional)
-                with col_confirm_btn2:
-                    if st.button("TIDAK, Batalkan", key="confirm_delete_no"):
-                        st.info("Penghapusan dibatalkan.")
-                        st.session_state['show_confirm_dialog'] = False # Sembunyikan dialog
-                        st.rerun() # Refresh tampilan (opsional)
+                    if hasil:
+                        st.toast(f"{hasil['dipindah']:,} transaksi tahun {tahun} dipindah ke arsip.")
+                        st.rerun()
+                    else:
+                        st.error("Pengarsipan gagal (lihat log konsol).")
+        with col_kembali:
+            if diarsipkan:
+                tahun_kembali = st.selectbox("Kembalikan tahun:", diarsipkan, key="arsip_kembalikan")
+                if st.button(f"Kembalikan {tahun_kembali}", key="arsip_kembalikan_button"):
+                    try:
+                        with st.spinner(f"Mengembalikan {tahun_kembali}..."):
+                            jumlah = anggaran.kembalikan_arsip(tahun_kembali)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        if jumlah is not None:
+                            st.toast(f"{jumlah:,} transaksi tahun {tahun_kembali} dikembalikan.")
+                            st.rerun()
+                        else:
+                            st.error("Gagal mengembalikan arsip (lihat log konsol).")
 
 
 # --- Halaman Ringkasan ---
@@ -149,45 +458,67 @@ def halaman_ringkasan(anggaran: AnggaranHarian):
     col_filter1, col_filter2 = st.columns([1, 2])
 
     with col_filter1:
-        pilihan_periode = st.selectbox("Filter Periode:", ["Semua Waktu", "Hari Ini", "Pilih Tanggal"], key="filter_periode", on_change=lambda: st.cache_data.clear())
+        pilihan_periode = st.selectbox("Filter Periode:", PILIHAN_PERIODE, key="filter_periode")
 
-    tanggal_filter = None
+    # Semua pilihan diterjemahkan ke rentang (tanggal_mulai, tanggal_akhir) inklusif; None = tanpa batas
+    tanggal_mulai, tanggal_akhir = None, None
     label_periode = "(Semua Waktu)"
 
     if pilihan_periode == "Hari Ini":
-        tanggal_filter = datetime.date.today()
-        label_periode = f"({tanggal_filter.strftime('%d %b')})"
+        tanggal_mulai = tanggal_akhir = datetime.date.today()
+        label_periode = f"({tanggal_mulai.strftime('%d %b')})"
     elif pilihan_periode == "Pilih Tanggal":
         if 'tanggal_pilihan_state' not in st.session_state:
             st.session_state.tanggal_pilihan_state = datetime.date.today()
-        tanggal_filter = st.date_input("Pilih Tanggal:", value=st.session_state.tanggal_pilihan_state, key="tanggal_pilihan", on_change=lambda: setattr(st.session_state, 'tanggal_pilihan_state', st.session_state.tanggal_pilihan) or st.cache_data.clear())
-        label_periode = f"({tanggal_filter.strftime('%d %b %Y')})"
+        tanggal_mulai = tanggal_akhir = st.date_input("Pilih Tanggal:", value=st.session_state.tanggal_pilihan_state, key="tanggal_pilihan", on_change=lambda: setattr(st.session_state, 'tanggal_pilihan_state', st.session_state.tanggal_pilihan))
+        label_periode = f"({tanggal_mulai.strftime('%d %b %Y')})"
+    elif pilihan_periode == "Minggu Ini":
+        tanggal_mulai, tanggal_akhir = periode.minggu_ini()
+        label_periode = f"(Minggu {tanggal_mulai.isocalendar()[1]}: {tanggal_mulai.strftime('%d %b')} - {tanggal_akhir.strftime('%d %b')})"
+    elif pilihan_periode == "Bulan Ini (s.d. Hari Ini)":
+        tanggal_mulai, tanggal_akhir = periode.bulan_berjalan()
+        label_periode = f"({tanggal_mulai.strftime('%d')} - {tanggal_akhir.strftime('%d %b %Y')})"
+    elif pilihan_periode == "30 Hari Terakhir":
+        tanggal_mulai, tanggal_akhir = periode.n_hari_terakhir(30)
+        label_periode = f"({tanggal_mulai.strftime('%d %b')} - {tanggal_akhir.strftime('%d %b %Y')})"
+    elif pilihan_periode == "Pilih Bulan":
+        hari_ini = datetime.date.today()
+        col_bln, col_thn = st.columns(2)
+        with col_bln:
+            bulan = st.selectbox("Bulan:", list(range(1, 13)), index=hari_ini.month - 1, key="filter_bulan")
+        with col_thn:
+            tahun = st.number_input("Tahun:", min_value=2000, max_value=2100, value=hari_ini.year, step=1, key="filter_tahun")
+        tanggal_mulai, tanggal_akhir = periode.rentang_bulan(int(tahun), int(bulan))
+        label_periode = f"({tanggal_mulai.strftime('%B %Y')})"
+    elif pilihan_periode == "Pilih Rentang":
+        hari_ini = datetime.date.today()
+        rentang = st.date_input("Pilih Rentang:", value=(hari_ini - datetime.timedelta(days=6), hari_ini), key="rentang_pilihan")
+        if len(rentang) == 2:
+            tanggal_mulai, tanggal_akhir = rentang
+        else:  # Pengguna baru memilih tanggal awal
+            tanggal_mulai = tanggal_akhir = rentang[0]
+        label_periode = f"({tanggal_mulai.strftime('%d %b %Y')} - {tanggal_akhir.strftime('%d %b %Y')})"
 
     with col_filter2:
-        @st.cache_data(ttl=300)
-        def hitung_total_cached(tgl_filter):
-            return anggaran.hitung_total_pengeluaran(tanggal=tgl_filter)
-
-        total_pengeluaran = hitung_total_cached(tanggal_filter)
+        # Cache per versi data: ganti filter tidak menghapus apa pun, hanya penulisan yang membuat entri basi
+        total_pengeluaran = anggaran.cached("hitung_total_pengeluaran", tanggal_mulai=tanggal_mulai, tanggal_akhir=tanggal_akhir)
         st.metric(label=f"Total Pengeluaran {label_periode}", value=format_rp(total_pengeluaran))
 
     st.divider()
     st.subheader(f"Pengeluaran per Kategori {label_periode}")
 
-    @st.cache_data(ttl=300)
-    def get_kategori_cached(tgl_filter):
-        return anggaran.get_pengeluaran_per_kategori(tanggal=tgl_filter)
-
     with st.spinner(f"Memuat ringkasan kategori..."):
-        dict_per_kategori = get_kategori_cached(tanggal_filter)
+        dict_per_kategori = anggaran.cached("get_pengeluaran_per_kategori", tanggal_mulai=tanggal_mulai, tanggal_akhir=tanggal_akhir)
 
     if not dict_per_kategori:
         st.info(f"Tidak ada data untuk periode ini.")
     else:
         try:
+            import pandas as pd
+
             data_kategori = [{"Kategori": kat, "Total": jml} for kat, jml in dict_per_kategori.items()]
             df_kategori = pd.DataFrame(data_kategori).sort_values(by="Total", ascending=False).reset_index(drop=True)
-            df_kategori['Total (Rp)'] = df_kategori['Total'].apply(format_rp)
+            df_kategori['Total (Rp)'] = format_rp_kolom(df_kategori['Total'])
 
             col_kat1, col_kat2 = st.columns(2)
             with col_kat1:
@@ -200,25 +531,143 @@ def halaman_ringkasan(anggaran: AnggaranHarian):
         except Exception as e:
             st.error(f"Gagal tampilkan ringkasan: {e}")
 
+    bagian_anggaran(anggaran)
+
+
+def bagian_anggaran(anggaran: AnggaranHarian):
+    """Sisa anggaran per kategori (hari ini & bulan ini) dan form pengaturan batasnya."""
+    st.divider()
+    hari_ini = datetime.date.today()
+    st.subheader(f"Sisa Anggaran ({hari_ini.strftime('%d %b %Y')})")
+    tabel_status_anggaran(anggaran.cached("get_status_anggaran", hari_ini))
+
+    with st.expander("Atur Batas Anggaran"):
+        batas = anggaran.get_batas_anggaran()
+        kategori = st.selectbox("Kategori:", KATEGORI_PENGELUARAN, key="batas_kategori")
+        sekarang = batas.get(kategori, {})
+        with st.form("form_batas_anggaran"):
+            col1, col2 = st.columns(2)
+            with col1:
+                batas_harian = st.number_input("Batas harian (Rp, 0 = tanpa batas):", min_value=0.0, step=10000.0,
+                                               format="%.0f", value=float(sekarang.get("harian") or 0))
+            with col2:
+                batas_bulanan = st.number_input("Batas bulanan (Rp, 0 = tanpa batas):", min_value=0.0, step=100000.0,
+                                                format="%.0f", value=float(sekarang.get("bulanan") or 0))
+            if st.form_submit_button("Simpan Batas"):
+                if anggaran.set_batas_anggaran(kategori, batas_harian, batas_bulanan):
+                    st.rerun()
+                else:
+                    st.info("Tidak ada perubahan batas.")
+
+
+# --- Halaman Admin: ringkasan lintas pengguna (mode multi-tenant) ---
+def halaman_semua_pengguna(manager_tenant: ManagerTenant):
+    st.subheader("Ringkasan Semua Pengguna")
+    tanggal_mulai, tanggal_akhir = None, None
+    if st.checkbox("Batasi rentang tanggal", key="admin_pakai_rentang"):
+        hari_ini = datetime.date.today()
+        rentang = st.date_input("Rentang:", value=(hari_ini.replace(day=1), hari_ini), key="admin_rentang")
+        if isinstance(rentang, (tuple, list)) and len(rentang) == 2:
+            tanggal_mulai, tanggal_akhir = rentang
+
+    with st.spinner("Menghitung ringkasan semua pengguna..."):
+        mulai = time.perf_counter()
+        df_tenant = manager_tenant.ringkasan_semua(tanggal_mulai, tanggal_akhir)
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+
+    if df_tenant.empty:
+        st.info("Belum ada pengguna.")
+        return
+    col1, col2 = st.columns(2)
+    col1.metric("Total Semua Pengguna", format_rp(df_tenant['total'].sum()))
+    col2.metric("Jumlah Transaksi", f"{int(df_tenant['transaksi'].sum()):,}")
+    df_tampil = df_tenant.copy()
+    df_tampil['total'] = format_rp_kolom(df_tampil['total'])
+    df_tampil.columns = ['Pengguna', 'Transaksi', 'Total (Rp)', 'Kategori Teratas', 'Error']
+    st.dataframe(df_tampil, hide_index=True, use_container_width=True)
+    st.caption(f"{len(df_tenant)} pengguna dibaca paralel dalam {durasi_ms:.0f} ms")
+
+
+# --- Panel Diagnostik Query (sidebar) ---
+def panel_diagnostik():
+    """Query teratas berdasarkan total waktu sejak proses dimulai. Dirender setelah halaman agar run ini ikut terhitung."""
+    pencatat = diagnostik_query.pencatat
+    with st.sidebar.expander("Diagnostik Query"):
+        info = pencatat.ringkasan()
+        st.caption(f"Query: {info['query']} ({info['sidik_unik']} unik) · Total: {info['total_query_ms']:.1f} ms · "
+                   f"Lambat (≥ {info['ambang_lambat_ms']:.0f} ms): {info['lambat']}")
+        st.caption(f"Koneksi baru: {info['koneksi']} · Rata-rata connect: {info['rata_koneksi_ms']:.2f} ms "
+                   f"(maks {info['maks_koneksi_ms']:.2f} ms)")
+        for penulis in database.get_penulis_stats():
+            st.caption(f"Penulis: {penulis['pekerjaan']} tulis dalam {penulis['commit']} commit "
+                       f"(rata-rata grup {penulis['rata_grup']:.1f}, terbesar {penulis['grup_terbesar']})")
+
+        # Tabel hanya dibuat jika diminta: panel ini tampil di setiap halaman dan butuh pandas
+        teratas = pencatat.teratas(10) if st.toggle("Tampilkan query teratas", key="diagnostik_tabel") else None
+        if teratas:
+            import pandas as pd
+
+            df_query = pd.DataFrame(teratas)[['sidik', 'sumber_utama', 'panggilan', 'total_ms', 'rata_ms', 'maks_ms', 'baris']]
+            df_query.columns = ['Query', 'Sumber', 'Panggilan', 'Total (ms)', 'Rata-rata (ms)', 'Maks (ms)', 'Baris']
+            st.dataframe(df_query.round(2), hide_index=True, use_container_width=True)
+        elif teratas is not None:
+            st.caption("Belum ada query tercatat.")
+
+        if st.button("Reset Statistik", key="reset_diagnostik"):
+            pencatat.reset()
+            st.rerun()
+
 
 # --- Fungsi Utama Aplikasi Streamlit ---
 def main():
     st.sidebar.title("Catatan Pengeluaran")
-    menu_pilihan = st.sidebar.radio("Pilih Menu:", ["Tambah", "Riwayat", "Ringkasan"], key="menu_utama")
+    manajer_anggaran, admin = pilih_anggaran()
+    daftar_menu = ["Tambah", "Riwayat", "Ringkasan"]
+    if admin:
+        daftar_menu.append("Semua Pengguna")
+    menu_pilihan = st.sidebar.radio("Pilih Menu:", daftar_menu, key="menu_utama")
     st.sidebar.markdown("---")
     st.sidebar.info("Jobsheet - Aplikasi Keuangan")
 
-    manajer_anggaran = get_anggaran_manager()
-
-    if menu_pilihan == "Tambah":
-        halaman_input(manajer_anggaran)
-    elif menu_pilihan == "Riwayat":
-        halaman_riwayat(manajer_anggaran)
-    elif menu_pilihan == "Ringkasan":
-        halaman_ringkasan(manajer_anggaran)
+    if manajer_anggaran is None:
+        return
+
+    if MULTI_TENANT:
+        with st.sidebar.expander("Statistik Tenant"):
+            stat = get_manager_tenant().statistik()
+            st.caption(f"Aktif: {stat['aktif']}/{stat['maks_aktif']} · Hit: {stat['hit']} · Miss: {stat['miss']} · "
+                       f"Dikeluarkan (LRU): {stat['dikeluarkan']}")
+
+    with st.sidebar.expander("Statistik Cache"):
+        stat = manajer_anggaran.cache.statistik()
+        st.caption(f"Hit: {stat['hit']} · Miss: {stat['miss']} (basi: {stat['basi']}) · "
+                   f"Entri: {stat['entri']} · Rasio hit: {stat['rasio_hit']:.0%}")
+        if not SNAPSHOT_ANALITIK:
+            st.caption("Snapshot analitik: nonaktif (ringkasan lewat SQL)")
+        elif manajer_anggaran.snapshot is None:
+            st.caption("Snapshot analitik: belum dimuat")
+        else:
+            snap = manajer_anggaran.snapshot.statistik()
+            st.caption(f"Snapshot analitik: {snap['baris']:,} baris · {snap['memori_mb']:.1f} MB "
+                       f"(kolom {snap['memori_kolom_mb']:.1f} + matriks {snap['memori_matriks_mb']:.1f}) · "
+                       f"muat {snap['waktu_muat_ms']:.0f} ms" if snap['siap'] else "Snapshot analitik: belum dimuat")
+
+    with diagnostik_query.label(f"halaman {menu_pilihan}"), profil_startup.tahap(f"render halaman {menu_pilihan}"):
+        if menu_pilihan == "Tambah":
+            halaman_input(manajer_anggaran)
+        elif menu_pilihan == "Riwayat":
+            halaman_riwayat(manajer_anggaran)
+        elif menu_pilihan == "Ringkasan":
+            halaman_ringkasan(manajer_anggaran)
+        elif menu_pilihan == "Semua Pengguna":
+            halaman_semua_pengguna(get_manager_tenant())
+
+    if TAMPILKAN_DIAGNOSTIK:
+        panel_diagnostik()
 
     st.markdown("---")
     st.caption("Pengembangan Aplikasi Berbasis OOP")
+    profil_startup.laporan()
 
 
 if __name__ == "__main__":
@@ -1,44 +1,272 @@
 # manager_anggaran.py
 
 import datetime
-import pandas as pd
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import TYPE_CHECKING
 from model import Transaksi
 import database  # Impor modul database kita
+import arsip
+import periode
+from konfigurasi import (BATCH_UKURAN_CHUNK, EKSPOR_UKURAN_CHUNK, SNAPSHOT_ANALITIK, TOMBSTONE_SIMPAN_HARI,
+                         PURGE_INTERVAL_DETIK, CARI_JENDELA_PERINGKAT, KATEGORI_PENGELUARAN,
+                         ANGGARAN_AMBANG_PERINGATAN)
+from format_rupiah import format_rp_kolom
+from cache_versi import CacheVersi
+
+if TYPE_CHECKING:
+    # pandas/numpy baru diimpor saat halaman pertama kali butuh DataFrame/snapshot (cold start lebih cepat)
+    import pandas as pd
+    from snapshot_analitik import SnapshotAnalitik
+    from transaksi_batch import TransaksiBatch
+
+
+_URUTAN_STATUS_ANGGARAN = [None, "aman", "hampir", "melebihi"]  # Dari yang paling ringan
 
 
 class AnggaranHarian:
     """Mengelola logika bisnis pengeluaran harian (Repository Pattern)."""
 
-    _db_setup_done = False  # Flag untuk memastikan setup DB hanya dicek sekali per sesi
+    _db_siap: set[str] = set()  # File database yang skemanya sudah dicek (sekali per proses per file)
 
-    def __init__(self):
-        if not AnggaranHarian._db_setup_done:
-            print("[AnggaranHarian] Melakukan pengecekan/setup database awal...")
-            if database.setup_database_initial():  # Panggil fungsi setup dari database.py
-                AnggaranHarian._db_setup_done = True
-                print("[AnggaranHarian] Database siap.")
-            else:
-                print("[AnggaranHarian] KRITIKAL: Setup database awal GAGAL!")
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path  # None = database.DB_PATH (mode satu pengguna)
+        self.siapkan_database(db_path)
+
+        self.cache = CacheVersi()  # Hasil ringkasan, basi hanya jika data berubah
+        self._jumlah_tulis = 0  # Counter penulisan lewat instance ini
+        self._versi_lock = threading.Lock()
+        self.snapshot = None  # SnapshotAnalitik, dibuat saat ringkasan pertama kali dibutuhkan (jika SNAPSHOT_ANALITIK)
+        self._muat_lock = threading.Lock()
+        self._fts = None  # Ada tabel transaksi_fts? (dicek sekali)
+        self._pembersih = None  # threading.Event milik thread pembersih tombstone (jika berjalan)
 
-    def tambah_transaksi(self, transaksi: Transaksi) -> bool:
-        """Menambahkan transaksi baru ke database."""
+    @classmethod
+    def siapkan_database(cls, db_path: str | None = None) -> bool:
+        """Menjalankan migrasi skema untuk satu file database, sekali per proses per file."""
+        path = db_path or database.DB_PATH
+        if path in cls._db_siap:
+            return True
+        print("[AnggaranHarian] Melakukan pengecekan/setup database awal...")
+        if database.setup_database_initial(db_path):  # Panggil fungsi setup dari database.py
+            cls._db_siap.add(path)
+            print("[AnggaranHarian] Database siap.")
+            return True
+        print("[AnggaranHarian] KRITIKAL: Setup database awal GAGAL!")
+        return False
+
+    def tutup(self):
+        """Melepas semua sumber daya file database ini: thread pembersih, pool, dan thread penulis."""
+        self.hentikan_pembersih_latar()
+        database.tutup_database(self.db_path or database.DB_PATH)
+
+    @property
+    def versi_data(self) -> tuple:
+        """
+        Generasi data saat ini: (versi data file dari thread penulis, counter tulis lokal).
+        Versi file berubah setiap kali ada commit, baik lewat thread penulis proses ini (instance mana pun)
+        maupun dari koneksi lain (skrip impor, proses lain); lihat PenulisTunggal.versi_data.
+        """
+        versi_file = database.get_penulis(self.db_path).versi_data()
+        with self._versi_lock:
+            return versi_file, self._jumlah_tulis
+
+    def cached(self, nama_method: str, *args, **kwargs):
+        """
+        Memanggil method baca (mis. 'hitung_total_pengeluaran') lewat CacheVersi.
+        Hasil dipakai ulang untuk semua sesi selama versi data belum berubah.
+        Objek yang dikembalikan dipakai bersama, jadi jangan diubah oleh pemanggil.
+        """
+        kunci = (nama_method, args, tuple(sorted(kwargs.items())))
+        return self.cache.ambil(kunci, self.versi_data, lambda: getattr(self, nama_method)(*args, **kwargs))
+
+    def _catat_tulis(self, hasil):
+        """Menaikkan counter tulis jika operasi tulis berhasil, lalu meneruskan hasilnya."""
+        if hasil:
+            with self._versi_lock:
+                self._jumlah_tulis += 1
+        return hasil
+
+    def _snapshot_siap(self, tanggal_mulai: datetime.date | None = None,
+                       tanggal_akhir: datetime.date | None = None) -> "SnapshotAnalitik | None":
+        """
+        Mengembalikan snapshot yang sinkron dengan database, dibuat & dimuat (ulang) jika perlu;
+        None jika snapshot dinonaktifkan atau gagal dimuat (pemanggil kembali ke SQL).
+        Tulisan lewat instance ini langsung diterapkan ke snapshot, jadi pemuatan ulang
+        hanya terjadi jika ada penulis lain (skrip impor, proses lain).
+        Snapshot hanya berisi tabel live: untuk rentang inklusif yang menyentuh tahun arsip hasilnya None
+        (rekap_harian tetap memuat tahun arsip), jadi memuat ulang tidak pernah meng-ATTACH file arsip.
+        """
+        if not SNAPSHOT_ANALITIK:
+            return None
+        if any((tanggal_mulai is None or t >= tanggal_mulai.year) and (tanggal_akhir is None or t <= tanggal_akhir.year)
+               for t in self._tahun_diarsip()):
+            return None
+        versi_db = self.versi_data[0]
+        if versi_db is None:
+            return None
+        if self.snapshot is not None and self.snapshot.siap and self.snapshot.versi_db == versi_db:
+            return self.snapshot
+
+        with self._muat_lock:
+            if self.snapshot is None:
+                from snapshot_analitik import SnapshotAnalitik  # numpy baru diimpor di sini
+                self.snapshot = SnapshotAnalitik()
+            if not (self.snapshot.siap and self.snapshot.versi_db == versi_db):  # Thread lain mungkin sudah memuat
+                # versi_db dibaca SEBELUM data: tulisan yang masuk selama memuat memicu muat ulang berikutnya
+                mulai = time.perf_counter()
+                self.snapshot.muat(self.get_semua_transaksi_batch(dengan_deskripsi=False, urutkan=False, dengan_arsip=False),
+                                   versi_db)
+                self.snapshot.waktu_muat_ms = (time.perf_counter() - mulai) * 1000
+                if self.snapshot.jumlah_transaksi() != self._jumlah_transaksi_sql(tanpa_arsip=True):
+                    print("Peringatan: Snapshot analitik tidak cocok dengan database, ringkasan memakai SQL.")
+                    self.snapshot.siap = False
+                    return None
+        return self.snapshot
+
+    def tambah_transaksi(self, transaksi: Transaksi, dalam_anggaran: bool = False) -> int | bool | None:
+        """
+        Menambahkan transaksi baru ke database.
+        Dengan dalam_anggaran=True transaksi hanya disimpan jika kategorinya tidak jadi melewati batas
+        harian/bulanan; pengecekan ada di statement INSERT yang sama (baca rekap lewat primary key),
+        jadi tetap benar walau ada penulis lain. Mengembalikan id baru jika tersimpan, False HANYA jika
+        ditolak karena anggaran, dan None jika input tidak valid atau penyimpanan gagal.
+        """
         if not isinstance(transaksi, Transaksi) or transaksi.jumlah <= 0:
-            return False
+            print(f"Peringatan: Transaksi tidak valid, tidak disimpan: {transaksi!r}")
+            return None
+
+        params = {
+            "deskripsi": transaksi.deskripsi,
+            "jumlah": transaksi.jumlah,
+            "kategori": transaksi.kategori,
+            "tanggal": transaksi.tanggal.strftime("%Y-%m-%d"),
+        }
+        if dalam_anggaran:
+            # Batas NULL membuat perbandingannya NULL, jadi periode tanpa batas tidak pernah menolak
+            sql = """
+                INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal)
+                SELECT :deskripsi, :jumlah, :kategori, :tanggal
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM batas_anggaran b
+                    WHERE b.kategori = :kategori AND (
+                        COALESCE((SELECT total FROM rekap_harian WHERE tanggal = :tanggal AND kategori = :kategori), 0)
+                            + :jumlah > b.batas_harian
+                        OR COALESCE((SELECT total FROM rekap_bulanan
+                                     WHERE bulan = substr(:tanggal, 1, 7) AND kategori = :kategori), 0)
+                            + :jumlah > b.batas_bulanan
+                    )
+                )
+                RETURNING id
+            """
+            rows = database.execute_returning(sql, params, db_path=self.db_path)
+            if not rows:
+                return None if rows is None else False
+            id_baru = self._catat_tulis(rows[0][0])
+        else:
+            sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (:deskripsi, :jumlah, :kategori, :tanggal)"
+            id_baru = self._catat_tulis(database.execute_query(sql, params, db_path=self.db_path)) # execute_query mengembalikan id baru
+        if id_baru and self.snapshot is not None:
+            self.snapshot.tambah([(id_baru, transaksi.tanggal, transaksi.jumlah, transaksi.kategori)],
+                                 database.versi_tulis_terakhir())
+        return id_baru
+
+    @staticmethod
+    def _ke_transaksi(item) -> Transaksi | None:
+        """Mengubah satu baris input (Transaksi, dict, atau tuple) menjadi Transaksi yang valid, atau None."""
+        try:
+            if isinstance(item, Transaksi):
+                tx = item
+            elif isinstance(item, dict):
+                tanggal = item.get("tanggal")
+                if isinstance(tanggal, str):
+                    datetime.datetime.strptime(tanggal, "%Y-%m-%d")  # Tanggal salah -> tolak, jangan diganti hari ini
+                tx = Transaksi(item.get("deskripsi"), item.get("jumlah"), item.get("kategori"), tanggal)
+            else:
+                deskripsi, jumlah, kategori, tanggal = item
+                if isinstance(tanggal, str):
+                    datetime.datetime.strptime(tanggal, "%Y-%m-%d")
+                tx = Transaksi(deskripsi, jumlah, kategori, tanggal)
+        except (ValueError, TypeError):
+            return None
+        return tx if tx.jumlah > 0 else None
+
+    def tambah_transaksi_batch(self, data, ukuran_chunk: int = BATCH_UKURAN_CHUNK, id_impor: int | None = None) -> dict:
+        """
+        Menambahkan banyak transaksi sekaligus dari iterable (Transaksi, dict, atau tuple
+        (deskripsi, jumlah, kategori, tanggal)). Data dibaca bertahap, divalidasi lewat Transaksi,
+        lalu ditulis dengan executemany: satu chunk = satu transaksi/commit.
+        `id_impor` (dari mulai_batch_impor) menandai baris agar bisa dihapus per batch impor.
+        Mengembalikan dict {'disimpan', 'ditolak': [(nomor, alasan)], 'id_baru': [...]}.
+        """
+        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal, id_impor) VALUES (?, ?, ?, ?, ?)"
+        hasil = {"disimpan": 0, "ditolak": [], "id_baru": []}
+        ukuran_chunk = max(1, int(ukuran_chunk))
+        # Ditolak per baris di sini; kalau sampai ke trigger v7, seluruh chunk ikut gagal
+        tahun_arsip = self._tahun_diarsip()
+        iterator = enumerate(data, start=1)
 
-        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
-        params = (
-            transaksi.deskripsi,
-            transaksi.jumlah,
-            transaksi.kategori,
-            transaksi.tanggal.strftime("%Y-%m-%d")
-        )
+        while True:
+            chunk = list(islice(iterator, ukuran_chunk))
+            if not chunk:
+                break
+
+            nomor_valid, params_list, tx_valid = [], [], []
+            for nomor, item in chunk:
+                tx = self._ke_transaksi(item)
+                if tx is None:
+                    hasil["ditolak"].append((nomor, "data tidak valid"))
+                    continue
+                if tx.tanggal.year in tahun_arsip:
+                    hasil["ditolak"].append((nomor, f"tahun {tx.tanggal.year} sudah diarsipkan"))
+                    continue
+                nomor_valid.append(nomor)
+                tx_valid.append(tx)
+                params_list.append((tx.deskripsi, tx.jumlah, tx.kategori, tx.tanggal.strftime("%Y-%m-%d"), id_impor))
+
+            id_baru = database.execute_many(sql, params_list, db_path=self.db_path)
+            if id_baru is None:
+                hasil["ditolak"].extend((nomor, "gagal ditulis ke database") for nomor in nomor_valid)
+                continue
+            hasil["disimpan"] += len(id_baru)
+            self._catat_tulis(id_baru)
+            if id_baru and self.snapshot is not None:
+                self.snapshot.tambah([(i, tx.tanggal, tx.jumlah, tx.kategori) for i, tx in zip(id_baru, tx_valid)],
+                                     database.versi_tulis_terakhir())
+            hasil["id_baru"].extend(id_baru)
+
+        if id_impor is not None and hasil["disimpan"]:
+            database.execute_query("UPDATE batch_impor SET jumlah = jumlah + ? WHERE id = ?", (hasil["disimpan"], id_impor),
+                                   db_path=self.db_path)
+        return hasil
 
-        return database.execute_query(sql, params) # execute_query sekarang mengembalikan bool
+    def mulai_batch_impor(self, sumber: str) -> int | None:
+        """Mencatat satu batch impor (mis. nama file CSV) dan mengembalikan id-nya untuk tambah_transaksi_batch."""
+        sekarang = datetime.datetime.now().isoformat(timespec="seconds")
+        return database.execute_query("INSERT INTO batch_impor (sumber, dibuat_pada) VALUES (?, ?)", (sumber, sekarang),
+                                      db_path=self.db_path)
+
+    def get_batch_impor(self) -> list[dict]:
+        """Daftar batch impor (terbaru dulu) beserta jumlah transaksinya yang masih aktif di tabel live (tanpa arsip)."""
+        sql = """
+            SELECT b.id, b.sumber, b.dibuat_pada, b.jumlah, COUNT(t.id) AS aktif
+            FROM batch_impor b LEFT JOIN transaksi_aktif t ON t.id_impor = b.id
+            GROUP BY b.id ORDER BY b.id DESC
+        """
+        rows = database.fetch_query(sql, fetch_all=True, db_path=self.db_path)
+        return [dict(row) for row in rows] if rows else []
 
     def get_semua_transaksi_obj(self) -> list[Transaksi]:
         """Mengambil semua transaksi dari database dalam bentuk list Transaksi."""
-        sql = "SELECT id, deskripsi, jumlah, kategori, tanggal FROM transaksi ORDER BY tanggal DESC, id DESC"
-        rows = database.fetch_query(sql, fetch_all=True)
+        sumber, lampiran = self._sumber_transaksi()
+        sql = f"{sumber}SELECT id, deskripsi, jumlah, kategori, tanggal FROM transaksi_aktif ORDER BY tanggal DESC, id DESC"
+        rows = database.fetch_query(sql, fetch_all=True, db_path=self.db_path, lampiran=lampiran)
 
         transaksi_list = []
         if rows:
@@ -53,57 +281,222 @@ class AnggaranHarian:
                 transaksi_list.append(transaksi)
         return transaksi_list
 
-    def get_dataframe_transaksi(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        """Mengambil transaksi dalam bentuk DataFrame Pandas, bisa difilter berdasarkan tanggal."""
-        query = "SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi" # Tambahkan 'id' di sini
-        params = None
+    def get_semua_transaksi_batch(self, dengan_deskripsi: bool = True, urutkan: bool = True,
+                                  dengan_arsip: bool = True) -> "TransaksiBatch":
+        """
+        Mengambil semua transaksi sebagai TransaksiBatch (kolom numpy + kategori ter-encode),
+        tanpa membuat satu objek Python per baris. Dengan urutkan=True urutannya sama dengan
+        get_semua_transaksi_obj; untuk agregasi, urutkan=False cukup membaca covering index.
+        dengan_arsip=False hanya membaca tabel live (tanpa ATTACH file arsip).
+        """
+        from transaksi_batch import TransaksiBatch, SQL_KOLOM_BATCH
+
+        sumber, lampiran = self._sumber_transaksi() if dengan_arsip else ("", None)
+        sql = sumber + SQL_KOLOM_BATCH.format(deskripsi=", deskripsi" if dengan_deskripsi else "")
+        if urutkan:
+            sql += " ORDER BY tanggal DESC, id DESC"
+        return TransaksiBatch.dari_chunks(database.iter_query(sql, db_path=self.db_path, lampiran=lampiran),
+                                          dengan_deskripsi=dengan_deskripsi)
 
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"
-            params = (filter_tanggal.strftime("%Y-%m-%d"),)
+    def iter_transaksi(self, tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None,
+                       ukuran_chunk: int = EKSPOR_UKURAN_CHUNK):
+        """
+        Generator potongan baris (id, tanggal 'YYYY-MM-DD', kategori, deskripsi, jumlah) berupa tuple,
+        urut tanggal lalu id, untuk ekspor/streaming. Memori yang dipakai hanya sebesar satu potongan.
+        """
+        where, params = self._where_periode(None, tanggal_mulai, tanggal_akhir)
+        sumber, lampiran = self._sumber_transaksi(tanggal_mulai, tanggal_akhir)
+        # CAST: tanggal tetap teks (tanpa konversi ke datetime.date per baris). ORDER BY memakai nama
+        # kolom berkualifikasi agar SQLite membaca indeks (tanggal, id), bukan mengurutkan alias.
+        sql = (f"{sumber}SELECT id, CAST(tanggal AS TEXT) AS tanggal, kategori, deskripsi, jumlah FROM transaksi_aktif{where}"
+               " ORDER BY transaksi_aktif.tanggal, transaksi_aktif.id")
+        return database.iter_query(sql, params, ukuran_chunk=ukuran_chunk, db_path=self.db_path, lampiran=lampiran)
 
+    def get_dataframe_transaksi(self, filter_tanggal: datetime.date | None = None,
+                                tanggal_mulai: datetime.date | None = None,
+                                tanggal_akhir: datetime.date | None = None) -> "pd.DataFrame":
+        """Mengambil transaksi dalam bentuk DataFrame Pandas, bisa difilter berdasarkan tanggal atau rentang tanggal."""
+        where, params = self._where_periode(filter_tanggal, tanggal_mulai, tanggal_akhir)
+        sumber, lampiran = self._sumber_transaksi(*self._rentang_periode(filter_tanggal, tanggal_mulai, tanggal_akhir))
+        query = f"{sumber}SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi_aktif{where}" # Tambahkan 'id' di sini
         query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
+        df = database.get_dataframe(query, params=params, db_path=self.db_path, lampiran=lampiran)
+
+        return self._format_dataframe(df)
 
+    @staticmethod
+    def _format_dataframe(df: "pd.DataFrame") -> "pd.DataFrame":
+        """Menambahkan kolom 'Jumlah (Rp)' dan memilih kolom yang ditampilkan di frontend."""
         if not df.empty:
-            try:
-                import locale
-                locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-                df['Jumlah (Rp)'] = df['jumlah'].map(lambda x: locale.currency(x or 0, grouping=True, symbol='Rp ')[:-3])
-            except Exception:
-                df['Jumlah (Rp)'] = df['jumlah'].map(lambda x: f"Rp {x or 0:,.0f}".replace(",", "."))
+            df['Jumlah (Rp)'] = format_rp_kolom(df['jumlah'])  # Sekali jalan untuk seluruh kolom
 
             # Pastikan 'ID' ada di DataFrame untuk ditampilkan di frontend
             df = df[['id', 'tanggal', 'kategori', 'deskripsi', 'Jumlah (Rp)']]
         return df
 
-    def hitung_total_pengeluaran(self, tanggal: datetime.date | None = None) -> float:
-        """Menghitung total pengeluaran pada tanggal tertentu (atau seluruhnya jika tidak diberi tanggal)."""
-        sql = "SELECT SUM(jumlah) FROM transaksi"
-        params = None
+    def get_halaman_transaksi(self, ukuran: int = 50, setelah: tuple | None = None) -> tuple["pd.DataFrame", tuple | None]:
+        """
+        Mengambil satu halaman riwayat (urut tanggal DESC, id DESC) dengan keyset cursor.
+        `setelah` adalah (tanggal, id) baris terakhir halaman sebelumnya (None = halaman pertama).
+        Hanya `ukuran` baris yang dibaca lewat indeks, berapapun besar tabelnya.
+        Mengembalikan (DataFrame, kursor halaman berikutnya atau None jika sudah habis).
+        """
+        kondisi, params = [], []
+        if setelah:
+            kondisi.append("(tanggal, id) < (?, ?)")
+            params.extend([str(setelah[0]), int(setelah[1])])
+        sumber, lampiran = self._sumber_transaksi(
+            None, datetime.date.fromisoformat(str(setelah[0])[:10]) if setelah else None)
 
-        if tanggal:
-            sql += " WHERE tanggal = ?"
-            params = (tanggal.strftime("%Y-%m-%d"),)
+        df = None
+        if lampiran:
+            # Baris arsip paling baru bertanggal 31 Des tahun arsip terakhir: selama tabel live masih punya
+            # satu halaman penuh sesudah tanggal itu, arsip tidak perlu di-ATTACH sama sekali
+            batas = f"{max(self._tahun_arsip())}-12-31"
+            if not setelah or str(setelah[0]) > batas:
+                df = self._baca_halaman("", None, kondisi + ["tanggal > ?"], params + [batas], ukuran)
+                if len(df) <= ukuran:
+                    df = None
+        if df is None:
+            df = self._baca_halaman(sumber, lampiran, kondisi, params, ukuran)
+        kursor_berikutnya = None
+        if len(df) > ukuran:
+            df = df.iloc[:ukuran].copy()
+            terakhir = df.iloc[-1]
+            kursor_berikutnya = (str(terakhir['tanggal']), int(terakhir['id']))
+        return self._format_dataframe(df), kursor_berikutnya
+
+    def _baca_halaman(self, sumber: str, lampiran: dict | None, kondisi: list[str], params: list,
+                      ukuran: int) -> "pd.DataFrame":
+        query = f"{sumber}SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi_aktif"
+        if kondisi:
+            query += " WHERE " + " AND ".join(kondisi)
+        query += " ORDER BY tanggal DESC, id DESC LIMIT ?"
+        # Satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+        return database.get_dataframe(query, params=tuple(params) + (ukuran + 1,), db_path=self.db_path,
+                                      lampiran=lampiran)
+
+    # --- Pencarian deskripsi (FTS5) ---
+
+    @staticmethod
+    def _token_cari(teks: str) -> list[str]:
+        return re.findall(r"\w+", teks.lower())
+
+    def _fts_tersedia(self) -> bool:
+        if self._fts is None:
+            hasil = database.fetch_query("SELECT 1 FROM sqlite_master WHERE name = 'transaksi_fts'", fetch_all=False,
+                                         db_path=self.db_path)
+            self._fts = hasil is not None
+        return self._fts
+
+    def cari_transaksi(self, query: str, limit: int = 50, offset: int = 0) -> tuple["pd.DataFrame", int, bool]:
+        """
+        Mencari transaksi aktif yang deskripsinya memuat semua kata di `query` (kata terakhir boleh
+        awalan, mis. "makan si"). Kandidat = CARI_JENDELA_PERINGKAT kecocokan terbaru, diurutkan
+        dengan bm25 (relevansi) lalu tanggal terbaru, dan dipaginasi dengan limit/offset.
+        Pencarian tidak dibatasi tanggal, jadi arsip tahunan ikut dicari (tiap arsip punya indeks FTS5 sendiri).
+        Mengembalikan (DataFrame halaman ini, jumlah kandidat, True jika kecocokan lebih banyak dari jendela).
+        """
+        token = self._token_cari(query or "")
+        if not token:
+            import pandas as pd
+            return self._format_dataframe(pd.DataFrame()), 0, False
+
+        jendela = CARI_JENDELA_PERINGKAT
+        sumber, lampiran = self._sumber_transaksi()
+        if self._fts_tersedia():
+            # Tiap kata dikutip (sintaks FTS5 dari input pengguna tidak ikut dieksekusi)
+            cocok = " ".join(f'"{t}"' for t in token[:-1]) + f' "{token[-1]}"*'
+            # Satu cabang per indeks FTS5 (tabel live + tiap arsip), masing-masing kecocokan terbarunya saja
+            cabang = ["""
+                SELECT f.rowid AS id, bm25(transaksi_fts) AS skor, t.tanggal, t.kategori, t.deskripsi, t.jumlah
+                FROM main.transaksi_fts f JOIN main.transaksi t ON t.id = f.rowid
+                WHERE transaksi_fts MATCH ? AND t.dihapus_pada IS NULL
+                ORDER BY f.rowid DESC LIMIT ?
+            """]
+            cabang += [f"""
+                SELECT f.rowid AS id, bm25(transaksi_fts) AS skor, t.tanggal, t.kategori, t.deskripsi, t.jumlah
+                FROM {nama}.transaksi_fts f JOIN {nama}.transaksi t ON t.id = f.rowid
+                WHERE transaksi_fts MATCH ?
+                ORDER BY f.rowid DESC LIMIT ?
+            """ for nama in lampiran or {}]
+            params_kandidat = (cocok.strip(), jendela + 1) * len(cabang)
+            if len(cabang) == 1:
+                kandidat = cabang[0]
+            else:
+                kandidat = " UNION ALL ".join(f"SELECT * FROM ({c})" for c in cabang) + " ORDER BY id DESC LIMIT ?"
+                params_kandidat += (jendela + 1,)
+            sumber = ""  # Cabang FTS sudah menyebut tabelnya langsung
+        else:
+            kandidat = ("SELECT id, 0 AS skor, tanggal, kategori, deskripsi, jumlah FROM transaksi_aktif WHERE "
+                        + " AND ".join(["deskripsi LIKE ? ESCAPE '\\'"] * len(token)) + " ORDER BY id DESC LIMIT ?")
+            params_kandidat = tuple("%" + re.sub(r"([%_\\])", r"\\\1", t) + "%" for t in token) + (jendela + 1,)
+
+        # Satu query: kandidat dihitung sekali, jumlahnya lewat COUNT(*) OVER (). Kandidat ke-(jendela+1)
+        # hanya penanda 'lebih': selalu diurutkan paling akhir dan tidak pernah masuk halaman.
+        sql = f"""{sumber}
+            SELECT k.id, k.tanggal, k.kategori, k.deskripsi, k.jumlah, COUNT(*) OVER () AS jumlah_kandidat
+            FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY id DESC) AS urutan FROM ({kandidat})) k
+            ORDER BY k.urutan > ?, k.skor, k.tanggal DESC, k.id DESC
+            LIMIT ? OFFSET ?
+        """
+        df = database.get_dataframe(sql, params=params_kandidat + (jendela, max(0, min(limit, jendela - offset)), offset),
+                                    db_path=self.db_path, lampiran=lampiran)
+        if df.empty:
+            if offset <= 0:
+                return self._format_dataframe(df), 0, False
+            result = database.fetch_query(f"{sumber}SELECT COUNT(*) FROM ({kandidat})", params=params_kandidat,
+                                          fetch_all=False, db_path=self.db_path, lampiran=lampiran)
+            jumlah = int(result[0]) if result else 0
+        else:
+            jumlah = int(df['jumlah_kandidat'].iloc[0])
+        return self._format_dataframe(df), min(jumlah, jendela), jumlah > jendela
+
+    def optimasi_indeks_cari(self, halaman: int = 500) -> bool:
+        """
+        Menggabungkan segmen indeks FTS5 sedikit demi sedikit ('merge', dibatasi `halaman` halaman per
+        panggilan) agar pencarian tetap cepat tanpa 'optimize'/'rebuild' yang menulis ulang seluruh indeks.
+        Mengembalikan True jika masih ada yang digabung (panggil lagi nanti).
+        """
+        if not self._fts_tersedia():
+            return False
+        sql = "INSERT INTO transaksi_fts (transaksi_fts, rank) VALUES ('merge', ?)"
+        hasil = database.execute_changes(sql, (halaman,), db_path=self.db_path)
+        return bool(hasil)
+
+    def hitung_jumlah_transaksi(self) -> int:
+        """Menghitung jumlah seluruh transaksi dari snapshot, atau dari rekap_harian (tanpa COUNT atas tabel transaksi)."""
+        snapshot = self._snapshot_siap()
+        if snapshot is not None:
+            return snapshot.jumlah_transaksi()
+        return self._jumlah_transaksi_sql()
+
+    def _jumlah_transaksi_sql(self, tanpa_arsip: bool = False) -> int:
+        """Jumlah transaksi dari rekap_harian; tanpa_arsip=True hanya tahun yang masih di tabel live."""
+        where, params = "", ()
+        tahun = sorted(self._tahun_diarsip()) if tanpa_arsip else []
+        if tahun:
+            where = f" WHERE substr(tanggal, 1, 4) NOT IN ({', '.join('?' * len(tahun))})"
+            params = tuple(str(t) for t in tahun)
+        result = database.fetch_query(f"SELECT SUM(jumlah_transaksi) FROM rekap_harian{where}", params=params,
+                                      fetch_all=False, db_path=self.db_path)
+        if result and result[0] is not None:
+            return int(result[0])
+        return 0
+
+    # --- Ringkasan: dari snapshot di memori jika aktif, selain itu dari tabel rekap_harian (dijaga trigger) ---
 
-        result = database.fetch_query(sql, params=params, fetch_all=False)
+    def _total_rekap(self, where: str = "", params: tuple | None = None) -> float:
+        result = database.fetch_query(f"SELECT SUM(total) FROM rekap_harian{where}", params=params, fetch_all=False, db_path=self.db_path)
         if result and result[0] is not None:
             return float(result[0])
         return 0.0
 
-    def get_pengeluaran_per_kategori(self, tanggal: datetime.date | None = None) -> dict:
-        """Mengelompokkan pengeluaran berdasarkan kategori (opsional filter tanggal)."""
+    def _per_kategori_rekap(self, where: str = "", params: tuple | None = None) -> dict:
         hasil = {}
-        sql = "SELECT kategori, SUM(jumlah) FROM transaksi"
-        params = []
-
-        if tanggal:
-            sql += " WHERE tanggal = ?"
-            params.append(tanggal.strftime("%Y-%m-%d"))
-
-        sql += " GROUP BY kategori HAVING SUM(jumlah) > 0 ORDER BY SUM(jumlah) DESC"
-
-        rows = database.fetch_query(sql, params=tuple(params) if params else None, fetch_all=True)
+        sql = (f"SELECT kategori, SUM(total) FROM rekap_harian{where}"
+               " GROUP BY kategori HAVING SUM(total) > 0 ORDER BY SUM(total) DESC")
+        rows = database.fetch_query(sql, params=params, fetch_all=True, db_path=self.db_path)
         if rows:
             for row in rows:
                 kategori = row['kategori'] if row['kategori'] else "Lainnya"
@@ -111,17 +504,409 @@ class AnggaranHarian:
                 hasil[kategori] = jumlah
         return hasil
 
+    @staticmethod
+    def _where_periode(tanggal: datetime.date | None = None,
+                       tanggal_mulai: datetime.date | None = None,
+                       tanggal_akhir: datetime.date | None = None) -> tuple[str, tuple | None]:
+        """
+        Menyusun klausa WHERE untuk satu tanggal atau rentang (inklusif). Perbandingan langsung
+        pada kolom tanggal supaya SQLite bisa memakai indeks (range scan), bukan scan penuh.
+        """
+        if tanggal:
+            return " WHERE tanggal = ?", (tanggal.strftime("%Y-%m-%d"),)
+        if tanggal_mulai and tanggal_akhir:
+            return " WHERE tanggal BETWEEN ? AND ?", (tanggal_mulai.strftime("%Y-%m-%d"), tanggal_akhir.strftime("%Y-%m-%d"))
+        if tanggal_mulai:
+            return " WHERE tanggal >= ?", (tanggal_mulai.strftime("%Y-%m-%d"),)
+        if tanggal_akhir:
+            return " WHERE tanggal <= ?", (tanggal_akhir.strftime("%Y-%m-%d"),)
+        return "", None
+
+    @staticmethod
+    def _rentang_periode(tanggal: datetime.date | None = None,
+                         tanggal_mulai: datetime.date | None = None,
+                         tanggal_akhir: datetime.date | None = None) -> tuple:
+        """Padanan _where_periode untuk snapshot: (tanggal_mulai, tanggal_akhir), None = tanpa batas."""
+        if tanggal:
+            return tanggal, tanggal
+        return tanggal_mulai, tanggal_akhir
+
+    def hitung_total_pengeluaran(self, tanggal: datetime.date | None = None,
+                                 tanggal_mulai: datetime.date | None = None,
+                                 tanggal_akhir: datetime.date | None = None) -> float:
+        """
+        Menghitung total pengeluaran pada tanggal tertentu, pada rentang tanggal_mulai..tanggal_akhir
+        (inklusif), atau seluruhnya jika tidak diberi filter.
+        """
+        rentang = self._rentang_periode(tanggal, tanggal_mulai, tanggal_akhir)
+        snapshot = self._snapshot_siap(*rentang)
+        if snapshot is not None:
+            return snapshot.total(*rentang)
+        return self._total_rekap(*self._where_periode(tanggal, tanggal_mulai, tanggal_akhir))
+
+    def hitung_total_pengeluaran_minggu(self, tahun: int, minggu: int) -> float:
+        """Menghitung total pengeluaran dalam satu minggu ISO (Senin s.d. Minggu)."""
+        return self.hitung_total_pengeluaran(None, *periode.rentang_minggu_iso(tahun, minggu))
+
+    def hitung_total_pengeluaran_bulan(self, tahun: int, bulan: int) -> float:
+        """Menghitung total pengeluaran dalam satu bulan kalender."""
+        return self.hitung_total_pengeluaran(None, *periode.rentang_bulan(tahun, bulan))
+
+    def hitung_total_pengeluaran_tahun(self, tahun: int) -> float:
+        """Menghitung total pengeluaran dalam satu tahun."""
+        return self.hitung_total_pengeluaran(None, *periode.rentang_tahun(tahun))
+
+    def get_pengeluaran_per_kategori(self, tanggal: datetime.date | None = None,
+                                     tanggal_mulai: datetime.date | None = None,
+                                     tanggal_akhir: datetime.date | None = None) -> dict:
+        """Mengelompokkan pengeluaran berdasarkan kategori (opsional filter tanggal atau rentang tanggal)."""
+        rentang = self._rentang_periode(tanggal, tanggal_mulai, tanggal_akhir)
+        snapshot = self._snapshot_siap(*rentang)
+        if snapshot is not None:
+            return snapshot.per_kategori(*rentang)
+        return self._per_kategori_rekap(*self._where_periode(tanggal, tanggal_mulai, tanggal_akhir))
+
+    def get_pengeluaran_per_kategori_minggu(self, tahun: int, minggu: int) -> dict:
+        """Mengelompokkan pengeluaran satu minggu ISO berdasarkan kategori."""
+        return self.get_pengeluaran_per_kategori(None, *periode.rentang_minggu_iso(tahun, minggu))
+
+    def get_pengeluaran_per_kategori_bulan(self, tahun: int, bulan: int) -> dict:
+        """Mengelompokkan pengeluaran satu bulan kalender berdasarkan kategori."""
+        return self.get_pengeluaran_per_kategori(None, *periode.rentang_bulan(tahun, bulan))
+
+    def get_pengeluaran_per_kategori_tahun(self, tahun: int) -> dict:
+        """Mengelompokkan pengeluaran satu tahun berdasarkan kategori."""
+        return self.get_pengeluaran_per_kategori(None, *periode.rentang_tahun(tahun))
+
+    # --- Batas anggaran per kategori ---
+    # Pemakaian dibaca dari rekap_harian (tanggal, kategori) dan rekap_bulanan (bulan, kategori) yang
+    # dijaga trigger, jadi cek anggaran = beberapa lookup primary key, tidak pernah SUM atas transaksi.
+
+    def set_batas_anggaran(self, kategori: str, batas_harian: float | None = None,
+                           batas_bulanan: float | None = None) -> bool:
+        """Mengatur batas harian/bulanan satu kategori. None atau <= 0 = tanpa batas; keduanya kosong = hapus batas."""
+        batas_harian = float(batas_harian) if batas_harian and batas_harian > 0 else None
+        batas_bulanan = float(batas_bulanan) if batas_bulanan and batas_bulanan > 0 else None
+        if batas_harian is None and batas_bulanan is None:
+            hasil = database.execute_changes("DELETE FROM batas_anggaran WHERE kategori = ?", (kategori,), db_path=self.db_path)
+        else:
+            sql = """
+                INSERT INTO batas_anggaran (kategori, batas_harian, batas_bulanan) VALUES (?, ?, ?)
+                ON CONFLICT (kategori) DO UPDATE SET
+                    batas_harian = excluded.batas_harian, batas_bulanan = excluded.batas_bulanan
+            """
+            hasil = database.execute_changes(sql, (kategori, batas_harian, batas_bulanan), db_path=self.db_path)
+        return bool(self._catat_tulis(hasil))
+
+    def get_batas_anggaran(self) -> dict:
+        """Semua batas yang diatur: {kategori: {'harian': ..., 'bulanan': ...}} (None = tanpa batas)."""
+        rows = database.fetch_query("SELECT kategori, batas_harian, batas_bulanan FROM batas_anggaran", fetch_all=True,
+                                    db_path=self.db_path)
+        return {row['kategori']: {"harian": row['batas_harian'], "bulanan": row['batas_bulanan']} for row in rows or []}
+
+    @staticmethod
+    def _status_batas(terpakai: float, batas: float | None, tambahan: float) -> str | None:
+        if batas is None:
+            return None
+        if terpakai + tambahan > batas:
+            return "melebihi"
+        if terpakai + tambahan >= batas * ANGGARAN_AMBANG_PERINGATAN:
+            return "hampir"
+        return "aman"
+
+    def get_status_anggaran(self, tanggal: datetime.date | None = None, kategori: list[str] | None = None,
+                            tambahan: float = 0.0) -> list[dict]:
+        """
+        Batas, pemakaian, dan sisa anggaran per kategori (default KATEGORI_PENGELUARAN) untuk hari `tanggal`
+        dan bulannya (default hari ini). `tambahan` ikut dihitung ke status, mis. jumlah yang akan disimpan.
+        Status: 'melebihi', 'hampir' (>= ANGGARAN_AMBANG_PERINGATAN dari batas), 'aman', atau None tanpa batas;
+        'status' = yang terburuk dari status_harian dan status_bulanan.
+        """
+        tanggal = tanggal or datetime.date.today()
+        kategori = list(kategori or KATEGORI_PENGELUARAN)
+        sql = """
+            SELECT k.value AS kategori, b.batas_harian, b.batas_bulanan,
+                   COALESCE(h.total, 0) AS terpakai_harian, COALESCE(m.total, 0) AS terpakai_bulanan
+            FROM json_each(?) k
+            LEFT JOIN batas_anggaran b ON b.kategori = k.value
+            LEFT JOIN rekap_harian h ON h.tanggal = ? AND h.kategori = k.value
+            LEFT JOIN rekap_bulanan m ON m.bulan = ? AND m.kategori = k.value
+            ORDER BY k.key
+        """
+        params = (json.dumps(kategori), tanggal.strftime("%Y-%m-%d"), tanggal.strftime("%Y-%m"))
+        hasil = []
+        for row in database.fetch_query(sql, params=params, fetch_all=True, db_path=self.db_path) or []:
+            status = {
+                "kategori": row['kategori'],
+                "batas_harian": row['batas_harian'],
+                "terpakai_harian": float(row['terpakai_harian']),
+                "sisa_harian": None if row['batas_harian'] is None else row['batas_harian'] - row['terpakai_harian'],
+                "status_harian": self._status_batas(row['terpakai_harian'], row['batas_harian'], tambahan),
+                "batas_bulanan": row['batas_bulanan'],
+                "terpakai_bulanan": float(row['terpakai_bulanan']),
+                "sisa_bulanan": None if row['batas_bulanan'] is None else row['batas_bulanan'] - row['terpakai_bulanan'],
+                "status_bulanan": self._status_batas(row['terpakai_bulanan'], row['batas_bulanan'], tambahan),
+            }
+            status["status"] = max(status["status_harian"], status["status_bulanan"], key=_URUTAN_STATUS_ANGGARAN.index)
+            status["melebihi"] = status["status"] == "melebihi"
+            hasil.append(status)
+        return hasil
+
+    def cek_anggaran(self, kategori: str, tanggal: datetime.date, jumlah: float = 0.0) -> dict:
+        """Status anggaran satu kategori jika `jumlah` disimpan pada `tanggal` (lihat get_status_anggaran)."""
+        status = self.get_status_anggaran(tanggal, [kategori], tambahan=jumlah)
+        return status[0] if status else {"kategori": kategori, "melebihi": False}
+
     def hapus_transaksi(self, id_transaksi: int) -> bool:
         """
-        Menghapus transaksi dari database berdasarkan ID.
+        Menghapus (soft delete) satu transaksi berdasarkan ID.
         Mengembalikan True jika penghapusan berhasil, False jika gagal.
         """
         if not isinstance(id_transaksi, int) or id_transaksi <= 0:
             print(f"Peringatan: ID transaksi '{id_transaksi}' tidak valid untuk dihapus.")
             return False
+        return self.hapus_transaksi_batch(ids=[id_transaksi])["dihapus"] > 0
+
+    # --- Hapus massal (soft delete) ---
+    # Baris tidak langsung dibuang: kolom dihapus_pada diisi token hapus. View transaksi_aktif,
+    # indeks parsial, dan trigger rekap mengabaikan tombstone, jadi undo cukup mengosongkan
+    # kolom itu lagi. bersihkan_tombstone membuang tombstone lama secara permanen.
+
+    @staticmethod
+    def _where_hapus(ids=None, tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None,
+                     id_impor: int | None = None) -> tuple[str, tuple]:
+        """Kriteria hapus digabung dengan AND. Minimal satu kriteria wajib, supaya tidak pernah menghapus semua."""
+        kondisi, params = ["dihapus_pada IS NULL"], []
+        if ids is not None:
+            # Satu parameter JSON, jadi tidak terbentur batas jumlah parameter SQLite
+            kondisi.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([int(i) for i in ids]))
+        if tanggal_mulai:
+            kondisi.append("tanggal >= ?")
+            params.append(tanggal_mulai.strftime("%Y-%m-%d"))
+        if tanggal_akhir:
+            kondisi.append("tanggal <= ?")
+            params.append(tanggal_akhir.strftime("%Y-%m-%d"))
+        if id_impor is not None:
+            kondisi.append("id_impor = ?")
+            params.append(int(id_impor))
+        if len(kondisi) == 1:
+            raise ValueError("Hapus massal butuh minimal satu kriteria: ids, rentang tanggal, atau id_impor.")
+        return " WHERE " + " AND ".join(kondisi), tuple(params)
+
+    def hitung_calon_hapus(self, ids=None, tanggal_mulai: datetime.date | None = None,
+                           tanggal_akhir: datetime.date | None = None, id_impor: int | None = None) -> int:
+        """Jumlah transaksi aktif yang akan kena hapus_transaksi_batch dengan kriteria yang sama."""
+        where, params = self._where_hapus(ids, tanggal_mulai, tanggal_akhir, id_impor)
+        result = database.fetch_query(f"SELECT COUNT(*) FROM transaksi{where}", params=params, fetch_all=False, db_path=self.db_path)
+        return int(result[0]) if result else 0
+
+    def hapus_transaksi_batch(self, ids=None, tanggal_mulai: datetime.date | None = None,
+                              tanggal_akhir: datetime.date | None = None, id_impor: int | None = None) -> dict:
+        """
+        Soft delete semua transaksi aktif yang cocok dengan kriteria (daftar ID, rentang tanggal
+        inklusif, dan/atau batch impor) dalam SATU transaksi.
+        Mengembalikan {'dihapus': n, 'token': token untuk batalkan_hapus (None jika tidak ada yang dihapus)}.
+        """
+        where, params = self._where_hapus(ids, tanggal_mulai, tanggal_akhir, id_impor)
+        # Token berawalan waktu ISO: unik per operasi, dan bisa dibandingkan dengan batas waktu purge
+        token = f"{datetime.datetime.now().isoformat(timespec='microseconds')}#{uuid.uuid4().hex[:8]}"
+        rows = database.execute_returning(f"UPDATE transaksi SET dihapus_pada = ?{where} RETURNING id", (token, *params),
+                                          db_path=self.db_path)
+        if not rows:
+            return {"dihapus": 0, "token": None}
+
+        id_dihapus = [row[0] for row in rows]
+        self._catat_tulis(id_dihapus)
+        if self.snapshot is not None:
+            self.snapshot.hapus(id_dihapus, database.versi_tulis_terakhir())
+        return {"dihapus": len(id_dihapus), "token": token}
+
+    def batalkan_hapus(self, token: str) -> int:
+        """Undo satu operasi hapus: semua tombstone dengan token ini aktif kembali. Mengembalikan jumlah baris."""
+        rows = database.execute_returning("UPDATE transaksi SET dihapus_pada = NULL WHERE dihapus_pada = ? RETURNING id",
+                                          (token,), db_path=self.db_path)
+        if not rows:
+            return 0
+        id_pulih = [row[0] for row in rows]
+        self._catat_tulis(id_pulih)
+        if self.snapshot is not None:
+            self.snapshot.pulihkan(id_pulih, database.versi_tulis_terakhir())
+        return len(id_pulih)
+
+    def bersihkan_tombstone(self, simpan: datetime.timedelta = datetime.timedelta(days=TOMBSTONE_SIMPAN_HARI),
+                            ukuran_chunk: int = BATCH_UKURAN_CHUNK) -> int:
+        """
+        Membuang permanen tombstone yang lebih tua dari `simpan` (setelah itu tidak bisa di-undo).
+        Dikerjakan per potongan agar thread penulis tidak tertahan lama. Mengembalikan jumlah baris.
+        """
+        batas = (datetime.datetime.now() - simpan).isoformat(timespec="microseconds")
+        sql = """
+            DELETE FROM transaksi WHERE id IN (
+                SELECT id FROM transaksi WHERE dihapus_pada IS NOT NULL AND dihapus_pada < ? LIMIT ?
+            ) RETURNING id
+        """
+        total = 0
+        while True:
+            rows = database.execute_returning(sql, (batas, ukuran_chunk), db_path=self.db_path)
+            if not rows:
+                return total
+            total += len(rows)
+
+    def mulai_pembersih_latar(self, interval_detik: float = PURGE_INTERVAL_DETIK):
+        """Menjalankan bersihkan_tombstone dan optimasi_indeks_cari secara berkala di thread latar (sekali per instance)."""
+        if self._pembersih is not None:
+            return
+        self._pembersih = threading.Event()
+
+        def loop():
+            while not self._pembersih.wait(interval_detik):
+                dibuang = self.bersihkan_tombstone()
+                if dibuang:
+                    print(f"[AnggaranHarian] {dibuang} tombstone lama dibuang permanen.")
+                self.optimasi_indeks_cari()
+
+        threading.Thread(target=loop, name="pembersih-tombstone", daemon=True).start()
+
+    def hentikan_pembersih_latar(self):
+        if self._pembersih is not None:
+            self._pembersih.set()
+            self._pembersih = None
+
+    # --- Arsip tahunan (lihat arsip.py) ---
+    # Tahun yang sudah tutup dipindah ke file arsip per tahun. rekap_harian/rekap_bulanan tahun itu tetap di
+    # database utama, jadi ringkasan & anggaran tidak pernah membuka arsip. Query baris memakai _sumber_transaksi:
+    # arsip hanya di-ATTACH (lalu DETACH lagi) jika rentang tanggalnya menyentuh tahun arsip.
+
+    def get_daftar_arsip(self) -> list[dict]:
+        """Tahun yang sudah diarsipkan (urut tahun): tahun, file, jumlah, total, diarsipkan_pada, path, ada (file ditemukan)."""
+        rows = database.fetch_query("SELECT tahun, file, jumlah, total, diarsipkan_pada FROM arsip_tahun ORDER BY tahun",
+                                    fetch_all=True, db_path=self.db_path)
+        hasil = []
+        for row in rows or []:
+            path = os.path.join(arsip.folder_arsip(self.db_path), row['file'])
+            hasil.append(dict(row, path=path, ada=os.path.exists(path)))
+        return hasil
+
+    def _tahun_diarsip(self) -> set[int]:
+        """Semua tahun yang barisnya sudah keluar dari tabel live (termasuk yang filenya hilang). Lewat cache."""
+        return {a['tahun'] for a in self.cached("get_daftar_arsip")}
 
-        sql = "DELETE FROM transaksi WHERE id = ?"
-        params = (id_transaksi,)
+    def _tahun_arsip(self) -> dict[int, str]:
+        """{tahun: path} arsip yang filenya ada. Lewat cache, jadi biasanya hanya satu PRAGMA data_version."""
+        return {a['tahun']: a['path'] for a in self.cached("get_daftar_arsip") if a['ada']}
 
-        # Karena database.execute_query sekarang mengembalikan bool, kita bisa langsung menggunakannya.
-        return database.execute_query(sql, params)
\ No newline at end of file
+    def _sumber_transaksi(self, tanggal_mulai: datetime.date | None = None,
+                          tanggal_akhir: datetime.date | None = None) -> tuple[str, dict | None]:
+        """
+        (awalan WITH, lampiran ATTACH) untuk query baris atas transaksi_aktif pada rentang inklusif
+        (None = tanpa batas). Jika tidak ada tahun arsip di rentang itu hasilnya ("", None):
+        query tetap membaca view transaksi_aktif di tabel live saja.
+        """
+        semua = self._tahun_arsip()
+        tahun = [t for t in semua if (tanggal_mulai is None or t >= tanggal_mulai.year)
+                 and (tanggal_akhir is None or t <= tanggal_akhir.year)]
+        if not tahun:
+            return "", None
+        return f"WITH {arsip.cte_transaksi_aktif(tahun)} ", {arsip.alias(t): semua[t] for t in tahun}
+
+    def arsipkan_tahun(self, tahun: int) -> dict | None:
+        """
+        Memindah semua transaksi aktif `tahun` (harus sebelum tahun berjalan) ke file arsipnya.
+        Tombstone tahun itu dibuang permanen (tidak bisa di-undo lagi); setelahnya tahun itu hanya-baca.
+        Tahap 1 menyalin ke file arsip lewat koneksi sendiri; tahap 2 = satu pekerjaan tulis yang menghapus
+        baris yang disalin, memulihkan rekap tahun itu, dan mendaftarkan arsipnya. Jika transaksi tahun itu
+        berubah di antara dua tahap, tahap 2 dibatalkan dan file arsip dibuang (cukup diulang).
+        Mengembalikan {'tahun', 'dipindah', 'tombstone_dibuang', 'file'}, atau None jika gagal.
+        """
+        tahun = int(tahun)
+        tahun_ini = datetime.date.today().year
+        if tahun >= tahun_ini:
+            raise ValueError(f"Tahun {tahun} belum tutup; hanya tahun sebelum {tahun_ini} yang bisa diarsipkan.")
+        if any(a['tahun'] == tahun for a in self.get_daftar_arsip()):
+            raise ValueError(f"Tahun {tahun} sudah diarsipkan.")
+
+        try:
+            path, id_salin = arsip.salin_tahun(self.db_path, tahun)
+        except (sqlite3.Error, OSError) as e:
+            print(f"ERROR [AnggaranHarian] Menyalin tahun {tahun} ke arsip gagal: {e}")
+            return None
+        if not id_salin:
+            arsip.hapus_file(path)
+            raise ValueError(f"Tidak ada transaksi aktif di tahun {tahun}.")
+        rentang = (f"{tahun}-01-01", f"{tahun}-12-31")
+
+        def kerja(conn):
+            rekap = conn.execute("SELECT CAST(tanggal AS TEXT), kategori, total, jumlah_transaksi FROM rekap_harian"
+                                 " WHERE tanggal BETWEEN ? AND ?", rentang).fetchall()
+            rows = conn.execute("DELETE FROM transaksi WHERE dihapus_pada IS NULL AND tanggal BETWEEN ? AND ?"
+                                " RETURNING id, jumlah", rentang).fetchall()
+            if sorted(row[0] for row in rows) != sorted(id_salin):
+                raise sqlite3.IntegrityError(f"Transaksi tahun {tahun} berubah selama pengarsipan; ulangi pengarsipan.")
+            # Trigger ikut mengurangi rekap baris yang dipindah: kembalikan angka persisnya (tanpa sisa pembulatan)
+            conn.execute("DELETE FROM rekap_harian WHERE tanggal BETWEEN ? AND ?", rentang)
+            conn.executemany("INSERT INTO rekap_harian (tanggal, kategori, total, jumlah_transaksi) VALUES (?, ?, ?, ?)",
+                             rekap)
+            tombstone = conn.execute("DELETE FROM transaksi WHERE dihapus_pada IS NOT NULL AND tanggal BETWEEN ? AND ?",
+                                     rentang).rowcount
+            conn.execute("INSERT INTO arsip_tahun (tahun, file, jumlah, total, diarsipkan_pada) VALUES (?, ?, ?, ?, ?)",
+                         (tahun, os.path.basename(path), len(rows), sum(row[1] for row in rows),
+                          datetime.datetime.now().isoformat(timespec="seconds")))
+            return len(rows), tombstone
+
+        try:
+            dipindah, tombstone = database.get_penulis(self.db_path).kirim(kerja)
+        except Exception as e:
+            print(f"ERROR [AnggaranHarian] Pengarsipan tahun {tahun} dibatalkan: {e}")
+            arsip.hapus_file(path)
+            return None
+        self._catat_tulis(True)  # Snapshot dimuat ulang saat ringkasan berikutnya (tanpa tahun yang kini diarsipkan)
+        return {"tahun": tahun, "dipindah": dipindah, "tombstone_dibuang": tombstone, "file": path}
+
+    def kembalikan_arsip(self, tahun: int) -> int | None:
+        """
+        Kebalikan arsipkan_tahun: baris arsip dimasukkan lagi ke tabel transaksi (id tetap), rekap tahun itu
+        dipulihkan ke angka sebelumnya, lalu file arsip dihapus. Mengembalikan jumlah baris, atau None jika gagal.
+        """
+        tahun = int(tahun)
+        data = next((a for a in self.get_daftar_arsip() if a['tahun'] == tahun), None)
+        if data is None:
+            raise ValueError(f"Tahun {tahun} tidak ada di arsip.")
+        if not data['ada']:
+            raise ValueError(f"File arsip tahun {tahun} tidak ditemukan: {data['path']}")
+        rows = arsip.baca_arsip(data['path'])
+        rentang = (f"{tahun}-01-01", f"{tahun}-12-31")
+
+        def kerja(conn):
+            rekap = conn.execute("SELECT CAST(tanggal AS TEXT), kategori, total, jumlah_transaksi FROM rekap_harian"
+                                 " WHERE tanggal BETWEEN ? AND ?", rentang).fetchall()
+            conn.execute("DELETE FROM arsip_tahun WHERE tahun = ?", (tahun,))  # Dulu, supaya trigger v7 mengizinkan INSERT
+            conn.executemany(f"INSERT INTO transaksi ({arsip.KOLOM}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            # Rekap sudah memuat baris arsip; trigger barusan menambahkannya lagi
+            conn.execute("DELETE FROM rekap_harian WHERE tanggal BETWEEN ? AND ?", rentang)
+            conn.executemany("INSERT INTO rekap_harian (tanggal, kategori, total, jumlah_transaksi) VALUES (?, ?, ?, ?)",
+                             rekap)
+            return len(rows)
+
+        try:
+            jumlah = database.get_penulis(self.db_path).kirim(kerja)
+        except Exception as e:
+            print(f"ERROR [AnggaranHarian] Mengembalikan arsip tahun {tahun} gagal: {e}")
+            return None
+        self._catat_tulis(True)
+        arsip.hapus_file(data['path'])
+        return jumlah
+
+    def vacuum(self) -> bool:
+        """VACUUM database utama (mis. setelah mengarsipkan) agar ruang baris yang dipindah dilepas dari file."""
+        conn = database.get_db_connection(self.db_path)
+        if conn is None:
+            return False
+        try:
+            conn.execute("VACUUM")
+            return True
+        except sqlite3.Error as e:
+            print(f"ERROR [AnggaranHarian] VACUUM gagal: {e}")
+            return False
+        finally:
+            conn.close()
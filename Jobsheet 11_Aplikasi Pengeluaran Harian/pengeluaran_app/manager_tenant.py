@@ -0,0 +1,172 @@
+# manager_tenant.py
+
+import datetime
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import database
+from konfigurasi import TENANT_FOLDER, TENANT_MAKS_AKTIF, TENANT_PEKERJA_AGREGAT
+from manager_anggaran import AnggaranHarian
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Mode multi-pengguna: tiap pengguna (tenant) punya file database sendiri, jadi penulisan
+# antar pengguna tidak berebut satu file & satu kunci tulis. Hanya TENANT_MAKS_AKTIF tenant
+# yang tetap hangat (pool koneksi, thread penulis, snapshot); sisanya ditutup (LRU).
+
+_RE_NAMA_TENANT = re.compile(r"^[a-z0-9][a-z0-9_.-]{0,63}$")
+
+
+def normalisasi_nama(nama: str) -> str:
+    """Nama tenant = nama file database, jadi hanya huruf kecil, angka, '_', '.', '-'."""
+    nama = (nama or "").strip().lower()
+    if not _RE_NAMA_TENANT.match(nama):
+        raise ValueError(f"Nama pengguna '{nama}' tidak valid (huruf/angka/_ . -, maksimal 64 karakter).")
+    return nama
+
+
+def nama_dari_identitas(identitas: str) -> str:
+    """
+    Nama tenant dari identitas terautentikasi (email/username). Jika ada karakter yang harus diganti,
+    nama diberi akhiran hash identitas asli agar 'a+b@x.id' dan 'a_b@x.id' tidak berbagi file.
+    """
+    identitas = (identitas or "").strip().lower()
+    if not identitas:
+        raise ValueError("Identitas pengguna kosong.")
+    if _RE_NAMA_TENANT.match(identitas):
+        return identitas
+    nama = re.sub(r"[^a-z0-9_.-]", "_", identitas).lstrip("_.-")[:47]
+    sidik = hashlib.blake2b(identitas.encode("utf-8"), digest_size=8).hexdigest()
+    return normalisasi_nama(f"{nama}-{sidik}" if nama else sidik)
+
+
+class ManagerTenant:
+    """
+    Mengarahkan setiap pengguna ke AnggaranHarian miliknya (satu file .db per pengguna).
+
+    - ambil(nama): instance dibuat saat pertama dipakai (migrasi skema berjalan saat itu juga),
+      lalu disimpan di LRU. Tenant yang paling lama tidak dipakai ditutup jika LRU penuh.
+    - ringkasan_semua(): ringkasan lintas tenant, tiap tenant dibaca paralel dari rekap_harian.
+    """
+
+    def __init__(self, folder: str = TENANT_FOLDER, maks_aktif: int = TENANT_MAKS_AKTIF):
+        self.folder = folder
+        self.maks_aktif = maks_aktif
+        self._aktif: OrderedDict[str, AnggaranHarian] = OrderedDict()
+        self._lock = threading.Lock()
+        self._buat_lock = threading.Lock()  # Membuat/menutup file tenant; cache hit tidak pernah menunggu lock ini
+        self.hit = 0
+        self.miss = 0
+        self.dikeluarkan = 0
+
+    def path_tenant(self, nama: str) -> str:
+        return os.path.join(self.folder, f"{normalisasi_nama(nama)}.db")
+
+    def daftar_tenant(self) -> list[str]:
+        """Semua tenant yang sudah punya file database, urut nama."""
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(self.folder) if f.endswith(".db"))
+
+    def ambil(self, nama: str) -> AnggaranHarian:
+        """AnggaranHarian untuk satu tenant; file database & skemanya dibuat jika belum ada."""
+        nama = normalisasi_nama(nama)
+        with self._lock:
+            anggaran = self._aktif.get(nama)
+            if anggaran is not None:
+                self._aktif.move_to_end(nama)
+                self.hit += 1
+                return anggaran
+            self.miss += 1
+
+        # Migrasi tenant baru berjalan di luar self._lock, jadi pengguna yang sudah hangat tidak ikut menunggu
+        with self._buat_lock:
+            with self._lock:
+                anggaran = self._aktif.get(nama)  # Bisa saja thread lain sudah membuatnya lebih dulu
+            if anggaran is not None:
+                return anggaran
+            os.makedirs(self.folder, exist_ok=True)
+            anggaran = AnggaranHarian(self.path_tenant(nama))
+            anggaran.mulai_pembersih_latar()
+            dikeluarkan = []
+            with self._lock:
+                self._aktif[nama] = anggaran
+                while len(self._aktif) > self.maks_aktif:
+                    dikeluarkan.append(self._aktif.popitem(last=False)[1])
+                    self.dikeluarkan += 1
+            for lama in dikeluarkan:
+                lama.tutup()  # Sesi yang masih memegang instance lama tetap jalan: koneksi dibuka ulang saat dipakai
+        return anggaran
+
+    def tutup_semua(self):
+        with self._lock:
+            daftar = list(self._aktif.values())
+            self._aktif.clear()
+        for anggaran in daftar:
+            anggaran.tutup()
+
+    def statistik(self) -> dict:
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "aktif": len(self._aktif),
+                "maks_aktif": self.maks_aktif,
+                "hit": self.hit,
+                "miss": self.miss,
+                "dikeluarkan": self.dikeluarkan,
+                "rasio_hit": (self.hit / total) if total else 0.0,
+            }
+
+    # --- Ringkasan lintas tenant (admin) ---
+
+    def _ringkas_tenant(self, nama: str, tanggal_mulai: datetime.date | None,
+                        tanggal_akhir: datetime.date | None) -> dict:
+        """Satu query GROUP BY kategori atas rekap_harian tenant (tanpa memuat snapshot)."""
+        try:
+            path = self.path_tenant(nama)
+        except ValueError:
+            # File .db lain di folder tenant (bukan dibuat ManagerTenant): dilaporkan, tidak dibuka
+            return {"tenant": nama, "transaksi": 0, "total": 0.0, "kategori_teratas": None,
+                    "error": "nama file bukan nama tenant yang valid"}
+        with self._lock:
+            hangat = nama in self._aktif
+        try:
+            if not AnggaranHarian.siapkan_database(path):
+                return {"tenant": nama, "transaksi": 0, "total": 0.0, "kategori_teratas": None, "error": "migrasi gagal"}
+            where, params = AnggaranHarian._where_periode(tanggal_mulai=tanggal_mulai, tanggal_akhir=tanggal_akhir)
+            sql = (f"SELECT kategori, SUM(total), SUM(jumlah_transaksi) FROM rekap_harian{where}"
+                   " GROUP BY kategori ORDER BY 2 DESC")
+            rows = database.fetch_query(sql, params=params, fetch_all=True, db_path=path) or []
+            return {
+                "tenant": nama,
+                "transaksi": int(sum(row[2] for row in rows)),
+                "total": float(sum(row[1] for row in rows)),
+                "kategori_teratas": rows[0]['kategori'] if rows and rows[0][1] > 0 else None,
+                "error": None,
+            }
+        finally:
+            with self._buat_lock:  # Jangan sampai menutup file yang sedang dibuka oleh ambil()
+                if not (hangat or nama in self._aktif):
+                    database.tutup_database(path)  # Tenant dingin tidak menambah koneksi terbuka
+
+    def ringkasan_semua(self, tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None,
+                        maks_pekerja: int = TENANT_PEKERJA_AGREGAT) -> "pd.DataFrame":
+        """
+        Total & jumlah transaksi per tenant untuk rentang tanggal (inklusif; None = tanpa batas).
+        Tenant dibaca paralel (modul sqlite3 melepas GIL selama query berjalan).
+        """
+        import pandas as pd
+
+        tenant = self.daftar_tenant()
+        if not tenant:
+            return pd.DataFrame(columns=["tenant", "transaksi", "total", "kategori_teratas", "error"])
+        with ThreadPoolExecutor(max_workers=max(1, min(maks_pekerja, len(tenant))),
+                                thread_name_prefix="agregat-tenant") as pool:
+            hasil = list(pool.map(lambda nama: self._ringkas_tenant(nama, tanggal_mulai, tanggal_akhir), tenant))
+        return pd.DataFrame(hasil).sort_values("total", ascending=False, ignore_index=True)
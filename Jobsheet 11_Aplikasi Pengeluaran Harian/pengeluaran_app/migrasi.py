@@ -0,0 +1,301 @@
+# migrasi.py
+
+import sqlite3
+from konfigurasi import KATEGORI_DEFAULT
+
+_KATEGORI_DEFAULT_SQL = "'" + KATEGORI_DEFAULT.replace("'", "''") + "'"
+
+# Mengisi rekap_harian dari tabel dasar. Versi v3 dibekukan (belum ada kolom dihapus_pada);
+# SQL_ISI_REKAP (hanya transaksi aktif) dipakai rekap.bangun_ulang_rekap.
+_SQL_ISI_REKAP_V3 = f"""
+    INSERT INTO rekap_harian (tanggal, kategori, total, jumlah_transaksi)
+    SELECT tanggal, COALESCE(kategori, {_KATEGORI_DEFAULT_SQL}), SUM(jumlah), COUNT(*)
+    FROM transaksi
+    GROUP BY tanggal, COALESCE(kategori, {_KATEGORI_DEFAULT_SQL})
+"""
+SQL_ISI_REKAP = f"""
+    INSERT INTO rekap_harian (tanggal, kategori, total, jumlah_transaksi)
+    SELECT tanggal, COALESCE(kategori, {_KATEGORI_DEFAULT_SQL}), SUM(jumlah), COUNT(*)
+    FROM transaksi_aktif
+    GROUP BY tanggal, COALESCE(kategori, {_KATEGORI_DEFAULT_SQL})
+"""
+
+# Potongan trigger untuk menambah/mengurangi satu baris transaksi di rekap_harian
+_SQL_REKAP_TAMBAH = f"""
+        INSERT INTO rekap_harian (tanggal, kategori, total, jumlah_transaksi)
+        VALUES (NEW.tanggal, COALESCE(NEW.kategori, {_KATEGORI_DEFAULT_SQL}), NEW.jumlah, 1)
+        ON CONFLICT (tanggal, kategori) DO UPDATE SET
+            total = total + excluded.total,
+            jumlah_transaksi = jumlah_transaksi + 1;
+"""
+_SQL_REKAP_KURANG = f"""
+        UPDATE rekap_harian
+        SET total = total - OLD.jumlah, jumlah_transaksi = jumlah_transaksi - 1
+        WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, {_KATEGORI_DEFAULT_SQL});
+        DELETE FROM rekap_harian
+        WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, {_KATEGORI_DEFAULT_SQL})
+          AND jumlah_transaksi <= 0;
+"""
+
+# rekap_bulanan (bulan 'YYYY-MM', kategori) dijaga trigger pada rekap_harian, jadi semua jalur tulis
+# (insert, soft delete, undo, bangun ulang rekap) ikut terhitung tanpa trigger tambahan di transaksi.
+# Baris rekap_harian hanya pernah di-UPDATE kolom total/jumlah_transaksi, jadi update cukup satu selisih.
+_SQL_REKAP_BULANAN = [
+    """
+    CREATE TABLE IF NOT EXISTS rekap_bulanan (
+        bulan TEXT NOT NULL,
+        kategori TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bulan, kategori)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bulanan_insert AFTER INSERT ON rekap_harian BEGIN
+        INSERT INTO rekap_bulanan (bulan, kategori, total, jumlah_transaksi)
+        VALUES (substr(NEW.tanggal, 1, 7), NEW.kategori, NEW.total, NEW.jumlah_transaksi)
+        ON CONFLICT (bulan, kategori) DO UPDATE SET
+            total = total + excluded.total,
+            jumlah_transaksi = jumlah_transaksi + excluded.jumlah_transaksi;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bulanan_update AFTER UPDATE OF total, jumlah_transaksi ON rekap_harian BEGIN
+        UPDATE rekap_bulanan
+        SET total = total + NEW.total - OLD.total,
+            jumlah_transaksi = jumlah_transaksi + NEW.jumlah_transaksi - OLD.jumlah_transaksi
+        WHERE bulan = substr(NEW.tanggal, 1, 7) AND kategori = NEW.kategori;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bulanan_delete AFTER DELETE ON rekap_harian BEGIN
+        UPDATE rekap_bulanan
+        SET total = total - OLD.total, jumlah_transaksi = jumlah_transaksi - OLD.jumlah_transaksi
+        WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori;
+        DELETE FROM rekap_bulanan
+        WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori AND jumlah_transaksi <= 0;
+    END
+    """,
+    "DELETE FROM rekap_bulanan",
+]
+SQL_ISI_REKAP_BULANAN = """
+    INSERT INTO rekap_bulanan (bulan, kategori, total, jumlah_transaksi)
+    SELECT substr(tanggal, 1, 7), kategori, SUM(total), SUM(jumlah_transaksi)
+    FROM rekap_harian
+    GROUP BY 1, 2
+"""
+
+# Tahun (INTEGER) dari kolom tanggal 'YYYY-MM-DD', untuk lookup arsip_tahun
+_SQL_TAHUN = "CAST(substr({kolom}, 1, 4) AS INTEGER)"
+
+# Skema database dikelola di sini dan dilacak dengan PRAGMA user_version.
+# Setiap entri: (versi, keterangan, langkah). Langkah berupa string SQL atau
+# fungsi yang menerima koneksi. Versi harus naik berurutan dan entri lama
+# TIDAK BOLEH diubah, karena database yang sudah ada tidak akan menjalankannya lagi.
+# Indeks teks penuh (FTS5) atas deskripsi. External content: teks tidak disimpan dua kali,
+# trigger meneruskan setiap insert/hapus/ubah deskripsi. Tombstone tetap diindeks (undo instan);
+# baris keluar dari indeks saat dibuang permanen oleh purge.
+_SQL_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaksi_fts USING fts5(
+        deskripsi, content='transaksi', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON transaksi BEGIN
+        INSERT INTO transaksi_fts (rowid, deskripsi) VALUES (NEW.id, NEW.deskripsi);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON transaksi BEGIN
+        INSERT INTO transaksi_fts (transaksi_fts, rowid, deskripsi) VALUES ('delete', OLD.id, OLD.deskripsi);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF deskripsi ON transaksi BEGIN
+        INSERT INTO transaksi_fts (transaksi_fts, rowid, deskripsi) VALUES ('delete', OLD.id, OLD.deskripsi);
+        INSERT INTO transaksi_fts (rowid, deskripsi) VALUES (NEW.id, NEW.deskripsi);
+    END
+    """,
+    "INSERT INTO transaksi_fts (transaksi_fts) VALUES ('rebuild')",
+]
+
+
+def _buat_indeks_cari(conn: sqlite3.Connection):
+    """Langkah v5. FTS5 bawaan hampir semua build SQLite; jika tidak ada, pencarian memakai LIKE."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._cek_fts5 USING fts5(x)")
+        conn.execute("DROP TABLE temp._cek_fts5")
+    except sqlite3.OperationalError as e:
+        print(f"Peringatan: FTS5 tidak tersedia ({e}); pencarian transaksi memakai LIKE.")
+        return
+    for langkah in _SQL_FTS:
+        conn.execute(langkah)
+
+
+MIGRASI = [
+    (1, "Tabel transaksi", [
+        """
+        CREATE TABLE IF NOT EXISTS transaksi (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deskripsi TEXT NOT NULL,
+            jumlah REAL NOT NULL CHECK(jumlah > 0),
+            kategori TEXT,
+            tanggal DATE NOT NULL
+        )
+        """,
+    ]),
+    (2, "Indeks filter tanggal/kategori dan urutan riwayat", [
+        # Covering index: WHERE tanggal = ? ... GROUP BY kategori + SUM(jumlah) tanpa menyentuh tabel
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal_kategori_jumlah ON transaksi (tanggal, kategori, jumlah)",
+        # Urutan riwayat: ORDER BY tanggal DESC, id DESC
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal_id ON transaksi (tanggal DESC, id DESC)",
+        # GROUP BY kategori untuk 'Semua Waktu'
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_kategori_jumlah ON transaksi (kategori, jumlah)",
+    ]),
+    (3, "Tabel rekap_harian (tanggal, kategori) + trigger sinkronisasi", [
+        """
+        CREATE TABLE IF NOT EXISTS rekap_harian (
+            tanggal DATE NOT NULL,
+            kategori TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal, kategori)
+        ) WITHOUT ROWID
+        """,
+        f"CREATE TRIGGER IF NOT EXISTS trg_rekap_insert AFTER INSERT ON transaksi BEGIN {_SQL_REKAP_TAMBAH} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_rekap_delete AFTER DELETE ON transaksi BEGIN {_SQL_REKAP_KURANG} END",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rekap_update AFTER UPDATE OF tanggal, kategori, jumlah ON transaksi
+        BEGIN {_SQL_REKAP_KURANG} {_SQL_REKAP_TAMBAH} END
+        """,
+        "DELETE FROM rekap_harian",
+        _SQL_ISI_REKAP_V3,
+    ]),
+    (4, "Soft delete (dihapus_pada), batch impor, view transaksi_aktif + indeks parsial", [
+        """
+        CREATE TABLE IF NOT EXISTS batch_impor (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sumber TEXT,
+            dibuat_pada TEXT NOT NULL,
+            jumlah INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        # NULL = aktif; terisi = tombstone (token hapus berawalan waktu ISO, jadi bisa dibandingkan dengan waktu)
+        "ALTER TABLE transaksi ADD COLUMN dihapus_pada TEXT",
+        "ALTER TABLE transaksi ADD COLUMN id_impor INTEGER REFERENCES batch_impor(id)",
+        """
+        CREATE VIEW IF NOT EXISTS transaksi_aktif AS
+        SELECT id, deskripsi, jumlah, kategori, tanggal, id_impor FROM transaksi WHERE dihapus_pada IS NULL
+        """,
+        # Indeks v2 dibuat ulang sebagai indeks parsial: baris tombstone tidak ikut diindeks
+        "DROP INDEX IF EXISTS idx_transaksi_tanggal_kategori_jumlah",
+        "DROP INDEX IF EXISTS idx_transaksi_tanggal_id",
+        "DROP INDEX IF EXISTS idx_transaksi_kategori_jumlah",
+        "CREATE INDEX idx_transaksi_tanggal_kategori_jumlah ON transaksi (tanggal, kategori, jumlah) WHERE dihapus_pada IS NULL",
+        "CREATE INDEX idx_transaksi_tanggal_id ON transaksi (tanggal DESC, id DESC) WHERE dihapus_pada IS NULL",
+        "CREATE INDEX idx_transaksi_kategori_jumlah ON transaksi (kategori, jumlah) WHERE dihapus_pada IS NULL",
+        # Undo (dihapus_pada = token) dan purge (dihapus_pada < batas waktu) hanya menyentuh tombstone
+        "CREATE INDEX idx_transaksi_dihapus ON transaksi (dihapus_pada) WHERE dihapus_pada IS NOT NULL",
+        "CREATE INDEX idx_transaksi_id_impor ON transaksi (id_impor) WHERE id_impor IS NOT NULL",
+        # Trigger rekap hanya menghitung baris aktif: soft delete = kurangi, undo = tambah, purge = tidak ada efek
+        "DROP TRIGGER IF EXISTS trg_rekap_insert",
+        "DROP TRIGGER IF EXISTS trg_rekap_delete",
+        "DROP TRIGGER IF EXISTS trg_rekap_update",
+        f"""
+        CREATE TRIGGER trg_rekap_insert AFTER INSERT ON transaksi WHEN NEW.dihapus_pada IS NULL
+        BEGIN {_SQL_REKAP_TAMBAH} END
+        """,
+        f"""
+        CREATE TRIGGER trg_rekap_delete AFTER DELETE ON transaksi WHEN OLD.dihapus_pada IS NULL
+        BEGIN {_SQL_REKAP_KURANG} END
+        """,
+        f"""
+        CREATE TRIGGER trg_rekap_update_kurang AFTER UPDATE OF tanggal, kategori, jumlah, dihapus_pada ON transaksi
+        WHEN OLD.dihapus_pada IS NULL
+        BEGIN {_SQL_REKAP_KURANG} END
+        """,
+        f"""
+        CREATE TRIGGER trg_rekap_update_tambah AFTER UPDATE OF tanggal, kategori, jumlah, dihapus_pada ON transaksi
+        WHEN NEW.dihapus_pada IS NULL
+        BEGIN {_SQL_REKAP_TAMBAH} END
+        """,
+    ]),
+    (5, "Indeks teks penuh (FTS5) deskripsi transaksi", [
+        _buat_indeks_cari,
+    ]),
+    (6, "Batas anggaran per kategori + tabel rekap_bulanan", [
+        # NULL = tanpa batas untuk periode itu
+        """
+        CREATE TABLE IF NOT EXISTS batas_anggaran (
+            kategori TEXT PRIMARY KEY,
+            batas_harian REAL CHECK(batas_harian IS NULL OR batas_harian > 0),
+            batas_bulanan REAL CHECK(batas_bulanan IS NULL OR batas_bulanan > 0)
+        ) WITHOUT ROWID
+        """,
+        *_SQL_REKAP_BULANAN,
+        SQL_ISI_REKAP_BULANAN,
+    ]),
+    (7, "Arsip tahunan: daftar tahun yang dipindah ke file arsip + tahun arsip hanya-baca", [
+        # file = nama file di folder arsip database ini (lihat arsip.py); rekap tahun itu tetap di sini
+        """
+        CREATE TABLE IF NOT EXISTS arsip_tahun (
+            tahun INTEGER PRIMARY KEY,
+            file TEXT NOT NULL,
+            jumlah INTEGER NOT NULL,
+            total REAL NOT NULL,
+            diarsipkan_pada TEXT NOT NULL
+        )
+        """,
+        # Satu lookup primary key per baris yang ditulis; arsip_tahun biasanya kosong atau berisi beberapa baris
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_arsip_tolak_insert BEFORE INSERT ON transaksi
+        WHEN EXISTS (SELECT 1 FROM arsip_tahun WHERE tahun = {_SQL_TAHUN.format(kolom="NEW.tanggal")})
+        BEGIN SELECT RAISE(ABORT, 'Tahun transaksi sudah diarsipkan'); END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_arsip_tolak_update BEFORE UPDATE OF tanggal, dihapus_pada ON transaksi
+        WHEN EXISTS (SELECT 1 FROM arsip_tahun WHERE tahun = {_SQL_TAHUN.format(kolom="NEW.tanggal")})
+        BEGIN SELECT RAISE(ABORT, 'Tahun transaksi sudah diarsipkan'); END
+        """,
+    ]),
+]
+
+VERSI_TERBARU = MIGRASI[-1][0]
+
+
+def get_versi(conn: sqlite3.Connection) -> int:
+    """Membaca versi skema dari PRAGMA user_version (0 = database baru/lama tanpa migrasi)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def jalankan_migrasi(conn: sqlite3.Connection) -> int:
+    """
+    Menaikkan skema ke VERSI_TERBARU. Jika versi sudah terbaru, tidak ada DDL yang dijalankan.
+    Setiap versi dijalankan dalam transaksinya sendiri. Mengembalikan versi akhir.
+    """
+    versi = get_versi(conn)
+    if versi >= VERSI_TERBARU:
+        return versi
+
+    for nomor, keterangan, langkah_list in MIGRASI:
+        if nomor <= versi:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_versi(conn) >= nomor:  # Sudah dimigrasi proses lain sambil kita menunggu kunci
+                conn.rollback()
+                continue
+            print(f" -> Migrasi skema v{nomor}: {keterangan}")
+            for langkah in langkah_list:
+                if callable(langkah):
+                    langkah(conn)
+                else:
+                    conn.execute(langkah)
+            conn.execute(f"PRAGMA user_version = {nomor}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return get_versi(conn)
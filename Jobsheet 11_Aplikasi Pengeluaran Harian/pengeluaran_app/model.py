@@ -1,7 +1,7 @@
 # model.py
 
 import datetime
-import locale
+from format_rupiah import format_angka
 
 
 class Transaksi:
@@ -38,12 +38,7 @@ class Transaksi:
             print(f"Peringatan: Tipe tanggal '{type(tanggal)}' tidak valid.")
 
     def __repr__(self) -> str:
-        try:
-            locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-            jml_str = locale.format_string("%.0f", self.jumlah, grouping=True)
-        except Exception:
-            jml_str = f"{self.jumlah:.0f}"
-
+        jml_str = format_angka(self.jumlah)
         return (
             f"Transaksi(ID:{self.id}, Tgl:{self.tanggal.strftime('%Y-%m-%d')}, "
             f"Jml:{jml_str}, Kat:'{self.kategori}', Desc:'{self.deskripsi}')"
@@ -56,4 +51,28 @@ class Transaksi:
             "jumlah": self.jumlah,
             "kategori": self.kategori,
             "tanggal": self.tanggal.strftime("%Y-%m-%d")
-        }
\ No newline at end of file
+        }
+
+
+class TransaksiRingan:
+    """
+    Versi ringan Transaksi dengan __slots__ (tanpa __dict__), untuk data yang dibaca dari database.
+    Tidak ada validasi/parsing ulang karena baris dari database sudah valid.
+    """
+
+    __slots__ = ("id", "deskripsi", "jumlah", "kategori", "tanggal")
+
+    def __init__(self, deskripsi: str, jumlah: float, kategori: str, tanggal: datetime.date, id_transaksi: int | None = None):
+        self.id = id_transaksi
+        self.deskripsi = deskripsi
+        self.jumlah = jumlah
+        self.kategori = kategori
+        self.tanggal = tanggal
+
+    # Tampilan dan serialisasi sama persis dengan Transaksi
+    __repr__ = Transaksi.__repr__
+    to_dict = Transaksi.to_dict
+
+    def ke_transaksi(self) -> Transaksi:
+        """Mengubah ke Transaksi biasa (misalnya untuk diedit lalu disimpan ulang)."""
+        return Transaksi(self.deskripsi, self.jumlah, self.kategori, self.tanggal, id_transaksi=self.id)
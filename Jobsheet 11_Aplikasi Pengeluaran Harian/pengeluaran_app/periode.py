@@ -0,0 +1,44 @@
+# periode.py
+
+import calendar
+import datetime
+
+# Helper rentang tanggal untuk filter ringkasan. Semua fungsi mengembalikan
+# tuple (tanggal_mulai, tanggal_akhir) inklusif, siap dipakai sebagai
+# `WHERE tanggal BETWEEN ? AND ?` (range scan pada indeks tanggal).
+
+
+def rentang_bulan(tahun: int, bulan: int) -> tuple[datetime.date, datetime.date]:
+    """Satu bulan kalender penuh."""
+    hari_terakhir = calendar.monthrange(tahun, bulan)[1]
+    return datetime.date(tahun, bulan, 1), datetime.date(tahun, bulan, hari_terakhir)
+
+
+def rentang_tahun(tahun: int) -> tuple[datetime.date, datetime.date]:
+    """Satu tahun kalender penuh."""
+    return datetime.date(tahun, 1, 1), datetime.date(tahun, 12, 31)
+
+
+def rentang_minggu_iso(tahun: int, minggu: int) -> tuple[datetime.date, datetime.date]:
+    """Minggu ISO (Senin s.d. Minggu), contoh rentang_minggu_iso(2025, 1)."""
+    senin = datetime.date.fromisocalendar(tahun, minggu, 1)
+    return senin, senin + datetime.timedelta(days=6)
+
+
+def minggu_ini(hari_ini: datetime.date | None = None) -> tuple[datetime.date, datetime.date]:
+    """Minggu ISO yang memuat hari ini."""
+    hari_ini = hari_ini or datetime.date.today()
+    tahun, minggu, _ = hari_ini.isocalendar()
+    return rentang_minggu_iso(tahun, minggu)
+
+
+def bulan_berjalan(hari_ini: datetime.date | None = None) -> tuple[datetime.date, datetime.date]:
+    """Month-to-date: tanggal 1 bulan ini s.d. hari ini."""
+    hari_ini = hari_ini or datetime.date.today()
+    return hari_ini.replace(day=1), hari_ini
+
+
+def n_hari_terakhir(n: int, hari_ini: datetime.date | None = None) -> tuple[datetime.date, datetime.date]:
+    """Rolling window n hari, termasuk hari ini."""
+    hari_ini = hari_ini or datetime.date.today()
+    return hari_ini - datetime.timedelta(days=n - 1), hari_ini
@@ -0,0 +1,48 @@
+# profil_startup.py
+
+import sys
+import time
+from contextlib import contextmanager
+
+from konfigurasi import PROFIL_STARTUP
+
+# Profil cold start (PENGELUARAN_PROFIL_STARTUP=1): main_app.py membungkus tahap-tahap run pertama
+# (impor modul, inisialisasi AnggaranHarian, render halaman) dengan tahap(), lalu laporan() mencetak
+# rinciannya sekali per proses. Rincian per modul yang diimpor: python -X importtime main_app.py.
+
+MODUL_BERAT = ("pandas", "numpy", "pyarrow")
+
+_tahap = []  # (nama, durasi ms, jumlah modul baru)
+_awal = None  # Waktu mulai tahap pertama
+_selesai = False
+
+
+@contextmanager
+def tahap(nama: str):
+    """Mengukur satu tahap startup; tidak melakukan apa pun jika profil nonaktif atau laporan sudah dicetak."""
+    global _awal
+    if not PROFIL_STARTUP or _selesai:
+        yield
+        return
+    modul_awal = len(sys.modules)
+    mulai = time.perf_counter()
+    _awal = _awal or mulai
+    try:
+        yield
+    finally:
+        _tahap.append((nama, (time.perf_counter() - mulai) * 1000, len(sys.modules) - modul_awal))
+
+
+def laporan():
+    """Mencetak rincian waktu tahap yang sudah diukur (sekali saja) beserta modul berat yang sudah dimuat."""
+    global _selesai
+    if not PROFIL_STARTUP or _selesai:
+        return
+    _selesai = True
+    total_ms = (time.perf_counter() - _awal) * 1000 if _awal else 0.0
+    print("--- Profil Cold Start ---")
+    for nama, durasi_ms, modul_baru in _tahap:
+        print(f"{nama:<45} {durasi_ms:>9.1f} ms   (+{modul_baru} modul)")
+    print(f"{'Total run pertama (sejak tahap pertama)':<45} {total_ms:>9.1f} ms")
+    dimuat = [nama for nama in MODUL_BERAT if nama in sys.modules]
+    print(f"Modul berat yang sudah dimuat: {', '.join(dimuat) if dimuat else 'tidak ada'}")
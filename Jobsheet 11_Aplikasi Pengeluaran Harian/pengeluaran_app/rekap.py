@@ -0,0 +1,105 @@
+# rekap.py
+
+import argparse
+import sqlite3
+import arsip
+import database
+import migrasi
+from konfigurasi import KATEGORI_DEFAULT
+
+# Alat bantu untuk tabel rekap_harian (total per tanggal & kategori yang dijaga trigger)
+# dan rekap_bulanan (total per bulan & kategori, dijaga trigger pada rekap_harian).
+# Jalankan `python rekap.py` untuk memeriksa drift, `python rekap.py --perbaiki` untuk membangun ulang.
+# Rekap tahun yang diarsipkan tetap di database utama, jadi arsip tahunan ikut di-ATTACH & dihitung.
+
+TOLERANSI = 0.005  # Selisih total (Rupiah) yang masih dianggap sama
+
+
+def verifikasi_rekap(conn: sqlite3.Connection, db_path: str | None = None) -> list[dict]:
+    """
+    Membandingkan rekap_harian dengan hasil hitung ulang dari transaksi aktif (bukan tombstone), termasuk
+    arsip tahunan milik `db_path`. Mengembalikan daftar baris yang berbeda (kosong = rekap sinkron).
+    """
+    sql = """
+        asli AS (
+            SELECT tanggal, COALESCE(kategori, ?) AS kategori, SUM(jumlah) AS total, COUNT(*) AS n
+            FROM transaksi_aktif
+            GROUP BY 1, 2
+        )
+        SELECT a.tanggal, a.kategori, r.total AS total_rekap, a.total AS total_asli,
+               r.jumlah_transaksi AS n_rekap, a.n AS n_asli
+        FROM asli a LEFT JOIN rekap_harian r ON r.tanggal = a.tanggal AND r.kategori = a.kategori
+        WHERE r.tanggal IS NULL OR ABS(r.total - a.total) > ? OR r.jumlah_transaksi != a.n
+        UNION ALL
+        SELECT r.tanggal, r.kategori, r.total, NULL, r.jumlah_transaksi, NULL
+        FROM rekap_harian r LEFT JOIN asli a ON a.tanggal = r.tanggal AND a.kategori = r.kategori
+        WHERE a.tanggal IS NULL
+    """
+    with arsip.semua_arsip(conn, db_path) as cte:
+        rows = conn.execute(f"WITH {cte + ', ' if cte else ''}{sql}", (KATEGORI_DEFAULT, TOLERANSI)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def verifikasi_rekap_bulanan(conn: sqlite3.Connection) -> list[dict]:
+    """Membandingkan rekap_bulanan dengan rekap_harian yang dijumlahkan per bulan (kosong = sinkron)."""
+    sql = """
+        WITH asli AS (
+            SELECT substr(tanggal, 1, 7) AS bulan, kategori, SUM(total) AS total, SUM(jumlah_transaksi) AS n
+            FROM rekap_harian
+            GROUP BY 1, 2
+        )
+        SELECT a.bulan, a.kategori, r.total AS total_rekap, a.total AS total_asli
+        FROM asli a LEFT JOIN rekap_bulanan r ON r.bulan = a.bulan AND r.kategori = a.kategori
+        WHERE r.bulan IS NULL OR ABS(r.total - a.total) > ? OR r.jumlah_transaksi != a.n
+        UNION ALL
+        SELECT r.bulan, r.kategori, r.total, NULL
+        FROM rekap_bulanan r LEFT JOIN asli a ON a.bulan = r.bulan AND a.kategori = r.kategori
+        WHERE a.bulan IS NULL
+    """
+    return [dict(row) for row in conn.execute(sql, (TOLERANSI,)).fetchall()]
+
+
+def bangun_ulang_rekap(conn: sqlite3.Connection, db_path: str | None = None) -> int:
+    """
+    Mengosongkan lalu menghitung ulang rekap_harian dari transaksi aktif + arsip tahunan (rekap_bulanan
+    ikut terisi lewat trigger). Mengembalikan jumlah baris rekap_harian.
+    """
+    with arsip.semua_arsip(conn, db_path) as cte:  # ATTACH tidak boleh di dalam transaksi
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rekap_harian")
+            conn.execute("DELETE FROM rekap_bulanan")
+            conn.execute(f"WITH {cte} {migrasi.SQL_ISI_REKAP}" if cte else migrasi.SQL_ISI_REKAP)
+            jumlah = conn.execute("SELECT COUNT(*) FROM rekap_harian").fetchone()[0]
+            conn.commit()
+            return jumlah
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi / bangun ulang tabel rekap_harian dan rekap_bulanan.")
+    parser.add_argument("--perbaiki", action="store_true", help="Bangun ulang rekap jika ditemukan drift")
+    args = parser.parse_args()
+
+    database.setup_database_initial()
+    with database.get_pool().koneksi() as conn:
+        drift = verifikasi_rekap(conn)
+        drift_bulanan = verifikasi_rekap_bulanan(conn)
+        if drift_bulanan:
+            print(f"Ditemukan {len(drift_bulanan)} baris rekap_bulanan yang tidak sinkron dengan rekap_harian.")
+        if not drift:
+            print("Rekap sinkron dengan tabel transaksi.")
+        else:
+            print(f"Ditemukan {len(drift)} baris rekap yang tidak sinkron:")
+            for baris in drift[:20]:
+                print(f"   - {baris['tanggal']} | {baris['kategori']}: rekap={baris['total_rekap']} "
+                      f"({baris['n_rekap']} trx), asli={baris['total_asli']} ({baris['n_asli']} trx)")
+            if len(drift) > 20:
+                print(f"   ... dan {len(drift) - 20} baris lainnya")
+
+        if args.perbaiki and (drift or drift_bulanan):
+            jumlah = bangun_ulang_rekap(conn)
+            print(f"Rekap dibangun ulang: {jumlah} baris. Sisa drift: {len(verifikasi_rekap(conn))}"
+                  f" (bulanan: {len(verifikasi_rekap_bulanan(conn))})")
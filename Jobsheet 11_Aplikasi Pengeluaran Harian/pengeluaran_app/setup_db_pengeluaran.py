@@ -1,6 +1,7 @@
 import sqlite3
 import os
 from konfigurasi import DB_PATH  # Ambil path dari konfigurasi
+import migrasi
 
 # Pemrograman Berorientasi Objek (432-242-206)
 # Ir. Prayitno, S.ST., M.T., Ph.D.
@@ -10,21 +11,10 @@ def setup_database():
     conn = None
     try:
         conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS transaksi (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            deskripsi TEXT NOT NULL,
-            jumlah REAL NOT NULL CHECK(jumlah > 0),
-            kategori TEXT,
-            tanggal DATE NOT NULL
-        );
-        """
-        print("Membuat tabel 'transaksi' (jika belum ada)...")
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'transaksi' siap.")
+        versi_awal = migrasi.get_versi(conn)
+        print(f"Versi skema saat ini: {versi_awal} (terbaru: {migrasi.VERSI_TERBARU})")
+        versi = migrasi.jalankan_migrasi(conn)
+        print(f" -> Skema database versi {versi} siap (tabel 'transaksi' + indeks).")
         return True
     except sqlite3.Error as e:
         print(f" -> Error SQLite saat setup: {e}")
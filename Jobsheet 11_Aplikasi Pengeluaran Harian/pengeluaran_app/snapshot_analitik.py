@@ -0,0 +1,213 @@
+# snapshot_analitik.py
+
+import datetime
+import threading
+import numpy as np
+from konfigurasi import KATEGORI_DEFAULT
+from transaksi_batch import TransaksiBatch
+
+
+class SnapshotAnalitik:
+    """
+    Salinan kolom tabel transaksi di memori untuk halaman Ringkasan.
+
+    - Kolom per baris (urut id): id, tanggal_ordinal, jumlah, kode_kategori, aktif
+      -> dipakai untuk mencari baris yang dihapus.
+    - Matriks hari x kategori (total & jumlah transaksi) -> total dan group-by untuk rentang
+      tanggal apa pun cukup dengan menjumlahkan potongan matriks (mikrodetik).
+
+    Insert (O(1) amortisasi) dan hapus/pulihkan (vektor per batch) diterapkan tanpa membaca ulang tabel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.versi_db = None  # Versi data file (PenulisTunggal.versi_data) saat snapshot terakhir diketahui sinkron
+        self.siap = False
+        self.waktu_muat_ms = 0.0  # Diisi pemanggil: baca tabel + bangun snapshot
+        self._kosongkan()
+
+    def _kosongkan(self):
+        self._n = 0
+        self._id = np.empty(0, np.int64)
+        self._tanggal = np.empty(0, np.int32)
+        self._jumlah = np.empty(0, np.float64)
+        self._kode = np.empty(0, np.int16)
+        self._aktif = np.empty(0, bool)
+        self.kategori = []
+        self._kode_kategori = {}
+        self._ordinal_awal = datetime.date.today().toordinal()
+        self._total = np.zeros((1, 0), np.float64)   # [hari, kategori]
+        self._cacah = np.zeros((1, 0), np.int64)     # [hari, kategori]
+
+    # --- Memuat & memelihara ---
+
+    def muat(self, batch: TransaksiBatch, versi_db):
+        """Membangun ulang snapshot dari TransaksiBatch (cukup kolom numerik, tanpa deskripsi)."""
+        urutan = np.argsort(batch.id, kind="stable")
+        with self._lock:
+            self._kosongkan()
+            self.kategori = list(batch.kategori)
+            self._kode_kategori = {nama: i for i, nama in enumerate(self.kategori)}
+            self._id = batch.id[urutan]
+            self._tanggal = batch.tanggal_ordinal[urutan].astype(np.int32)
+            self._jumlah = batch.jumlah[urutan]
+            self._kode = batch.kode_kategori[urutan]
+            self._aktif = np.ones(len(batch), bool)
+            self._n = len(batch)
+            self._bangun_matriks()
+            self.versi_db = versi_db
+            self.siap = True
+
+    def _bangun_matriks(self):
+        jumlah_kategori = max(len(self.kategori), 1)
+        if self._n:
+            self._ordinal_awal = int(self._tanggal[:self._n].min())
+            jumlah_hari = int(self._tanggal[:self._n].max()) - self._ordinal_awal + 1
+        else:
+            jumlah_hari = 1
+        indeks = (self._tanggal[:self._n].astype(np.int64) - self._ordinal_awal) * jumlah_kategori + self._kode[:self._n]
+        ukuran = jumlah_hari * jumlah_kategori
+        self._total = np.bincount(indeks, weights=self._jumlah[:self._n], minlength=ukuran).reshape(jumlah_hari, jumlah_kategori)
+        self._cacah = np.bincount(indeks, minlength=ukuran).reshape(jumlah_hari, jumlah_kategori)
+
+    def _kode_untuk(self, kategori: str | None) -> int:
+        nama = kategori or KATEGORI_DEFAULT
+        kode = self._kode_kategori.get(nama)
+        if kode is None:
+            kode = len(self.kategori)
+            self.kategori.append(nama)
+            self._kode_kategori[nama] = kode
+            kolom = ((0, 0), (0, kode + 1 - self._total.shape[1]))
+            self._total = np.pad(self._total, kolom)
+            self._cacah = np.pad(self._cacah, kolom)
+        return kode
+
+    def _baris_matriks(self, ordinal: int) -> int:
+        """Indeks baris matriks untuk tanggal; matriks diperlebar jika tanggal di luar rentang."""
+        if ordinal < self._ordinal_awal:
+            tambah = self._ordinal_awal - ordinal
+            self._total = np.pad(self._total, ((tambah, 0), (0, 0)))
+            self._cacah = np.pad(self._cacah, ((tambah, 0), (0, 0)))
+            self._ordinal_awal = ordinal
+        baris = ordinal - self._ordinal_awal
+        if baris >= self._total.shape[0]:
+            tambah = baris + 1 - self._total.shape[0]
+            self._total = np.pad(self._total, ((0, tambah), (0, 0)))
+            self._cacah = np.pad(self._cacah, ((0, tambah), (0, 0)))
+        return baris
+
+    def _pastikan_kapasitas(self, tambahan: int):
+        """Kolom per baris tumbuh dua kali lipat saat penuh, jadi append rata-rata O(1)."""
+        perlu = self._n + tambahan
+        if perlu <= len(self._id):
+            return
+        kapasitas = max(perlu, 2 * len(self._id), 1024)
+        for nama in ("_id", "_tanggal", "_jumlah", "_kode", "_aktif"):
+            lama = getattr(self, nama)
+            baru = np.zeros(kapasitas, lama.dtype)
+            baru[:self._n] = lama[:self._n]
+            setattr(self, nama, baru)
+
+    def _versi_cocok(self, versi) -> bool:
+        """
+        `versi` = (sebelum, sesudah) grup commit yang memuat tulisan ini (database.versi_tulis_terakhir).
+        Tulisan hanya boleh diterapkan jika snapshot tepat berada di versi `sebelum`: commit lain di antaranya
+        (instance lain, proses lain) tidak terlihat di snapshot -> ditandai belum siap. Dipanggil di bawah _lock.
+        """
+        if versi is None or self.versi_db != versi[0]:
+            self.siap = False
+            return False
+        return True
+
+    def tambah(self, daftar: list[tuple], versi):
+        """
+        Menerapkan transaksi yang baru disimpan: list (id, tanggal: date, jumlah, kategori).
+        Id harus lebih besar dari id terakhir (AUTOINCREMENT) dan versi harus cocok (lihat _versi_cocok);
+        jika tidak, snapshot ditandai belum siap dan akan dimuat ulang saat dibutuhkan.
+        """
+        with self._lock:
+            if not self.siap or not daftar or not self._versi_cocok(versi):
+                return
+            if int(daftar[0][0]) <= (int(self._id[self._n - 1]) if self._n else 0):
+                self.siap = False
+                return
+            self._pastikan_kapasitas(len(daftar))
+            for id_transaksi, tanggal, jumlah, kategori in daftar:
+                kode = self._kode_untuk(kategori)
+                ordinal = tanggal.toordinal()
+                baris = self._baris_matriks(ordinal)
+                self._total[baris, kode] += jumlah
+                self._cacah[baris, kode] += 1
+                i = self._n
+                self._id[i], self._tanggal[i], self._jumlah[i], self._kode[i], self._aktif[i] = \
+                    id_transaksi, ordinal, jumlah, kode, True
+                self._n += 1
+            self.versi_db = versi[1]
+
+    def _ubah_aktif(self, ids, aktif: bool, versi):
+        """
+        Menandai baris `ids` aktif/tidak aktif dan menyesuaikan matriks (np.add.at, tanpa loop Python).
+        Id yang tidak dikenal atau sudah berstatus sama berarti snapshot tidak sinkron -> ditandai belum siap.
+        """
+        with self._lock:
+            if not self.siap or not len(ids) or not self._versi_cocok(versi):
+                return
+            ids = np.asarray(ids, np.int64)
+            i = np.searchsorted(self._id[:self._n], ids)
+            i = np.minimum(i, max(self._n - 1, 0))
+            if not self._n or not (np.all(self._id[i] == ids) and np.all(self._aktif[i] != aktif)):
+                self.siap = False
+                return
+            self._aktif[i] = aktif
+            tanda = 1 if aktif else -1
+            baris = self._tanggal[i].astype(np.int64) - self._ordinal_awal
+            np.add.at(self._total, (baris, self._kode[i]), tanda * self._jumlah[i])
+            np.add.at(self._cacah, (baris, self._kode[i]), tanda)
+            self.versi_db = versi[1]
+
+    def hapus(self, ids, versi):
+        """Menerapkan (soft) delete: baris ditandai tidak aktif dan dikurangkan dari matriks."""
+        self._ubah_aktif(ids, False, versi)
+
+    def pulihkan(self, ids, versi):
+        """Kebalikan hapus (undo): baris aktif lagi dan ditambahkan kembali ke matriks."""
+        self._ubah_aktif(ids, True, versi)
+
+    # --- Query ---
+
+    def _potongan(self, tanggal_mulai: datetime.date | None, tanggal_akhir: datetime.date | None) -> slice:
+        awal = 0 if tanggal_mulai is None else max(0, tanggal_mulai.toordinal() - self._ordinal_awal)
+        akhir = self._total.shape[0] if tanggal_akhir is None else max(0, tanggal_akhir.toordinal() - self._ordinal_awal + 1)
+        return slice(awal, akhir)
+
+    def total(self, tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None) -> float:
+        with self._lock:
+            return float(self._total[self._potongan(tanggal_mulai, tanggal_akhir)].sum())
+
+    def per_kategori(self, tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None) -> dict:
+        """Total per kategori (> 0), urut dari yang terbesar, sama seperti versi SQL."""
+        with self._lock:
+            potongan = self._potongan(tanggal_mulai, tanggal_akhir)
+            totals = self._total[potongan].sum(axis=0)
+            ada = self._cacah[potongan].sum(axis=0) > 0  # Sisa pembulatan float setelah hapus tidak ikut tampil
+            kategori = list(self.kategori)
+        return {kategori[i]: float(totals[i]) for i in np.argsort(-totals, kind="stable") if ada[i] and totals[i] > 0}
+
+    def jumlah_transaksi(self) -> int:
+        with self._lock:
+            return int(self._cacah.sum())
+
+    def statistik(self) -> dict:
+        with self._lock:
+            kolom = sum(getattr(self, nama).nbytes for nama in ("_id", "_tanggal", "_jumlah", "_kode", "_aktif"))
+            matriks = self._total.nbytes + self._cacah.nbytes
+            return {
+                "siap": self.siap,
+                "baris": int(self._aktif[:self._n].sum()),
+                "hari": self._total.shape[0],
+                "kategori": len(self.kategori),
+                "memori_kolom_mb": kolom / 2**20,
+                "memori_matriks_mb": matriks / 2**20,
+                "memori_mb": (kolom + matriks) / 2**20,
+                "waktu_muat_ms": self.waktu_muat_ms,
+            }
@@ -0,0 +1,103 @@
+# test_database.py
+
+import sqlite3
+import threading
+import time
+import pytest
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "uji.db")
+    assert database.setup_database_initial(path)
+    yield path
+    database.tutup_database(path)
+
+
+def _di_thread(fungsi):
+    hasil = []
+    thread = threading.Thread(target=lambda: hasil.append(fungsi()))
+    thread.start()
+    thread.join()
+    return hasil[0]
+
+
+def test_pool_memakai_ulang_koneksi_antar_thread(db_path):
+    pool = database.get_pool(db_path)
+    awal = pool.statistik()
+
+    def pinjam():
+        with pool.koneksi() as conn:
+            conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()
+            return id(conn)
+
+    # Koneksi yang dikembalikan satu thread dipinjam lagi oleh thread lain, bukan dibuka ulang
+    koneksi = [_di_thread(pinjam) for _ in range(3)]
+    stat = pool.statistik()
+    assert awal["idle"] == 1  # Koneksi migrasi sudah kembali ke pool
+    assert len(set(koneksi)) == 1
+    assert (stat["hit"] - awal["hit"], stat["miss"] - awal["miss"]) == (3, 0)
+
+
+def test_penulis_group_commit_dan_savepoint(db_path):
+    penulis = database.get_penulis(db_path)
+    sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, 'Makanan', '2024-03-01')"
+    tahan, mulai = threading.Event(), threading.Event()
+
+    def kerja_penahan(conn):
+        mulai.set()
+        tahan.wait(5)  # Pekerjaan lain menumpuk di antrian selama ini
+        return conn.execute(sql, ("penahan", 1000)).lastrowid
+
+    def kerja(deskripsi, jumlah):
+        def fungsi(conn):
+            conn.execute(sql, (deskripsi, 1000))
+            conn.execute(sql, (deskripsi, jumlah))  # jumlah <= 0 melanggar CHECK -> seluruh pekerjaan ini batal
+            return deskripsi
+        return fungsi
+
+    hasil = {}
+
+    def kirim(nama, fungsi):
+        try:
+            hasil[nama] = penulis.kirim(fungsi)
+        except Exception as e:
+            hasil[nama] = e
+
+    thread = [threading.Thread(target=kirim, args=("penahan", kerja_penahan))]
+    thread[0].start()
+    assert mulai.wait(5)
+    for nama, jumlah in (("a", 2000), ("gagal", -1), ("b", 3000)):
+        thread.append(threading.Thread(target=kirim, args=(nama, kerja(nama, jumlah))))
+        thread[-1].start()
+    while penulis.statistik()["antri"] < 3:
+        time.sleep(0.01)
+    tahan.set()
+    for t in thread:
+        t.join(5)
+
+    # Tiga pekerjaan yang antre masuk SATU commit; yang gagal hanya membatalkan SAVEPOINT-nya sendiri
+    stat = penulis.statistik()
+    assert (stat["commit"], stat["pekerjaan"], stat["grup_terbesar"]) == (2, 4, 3)
+    assert (hasil["a"], hasil["b"]) == ("a", "b")
+    assert isinstance(hasil["gagal"], sqlite3.IntegrityError)
+    rows = database.fetch_query("SELECT deskripsi, COUNT(*) FROM transaksi GROUP BY deskripsi ORDER BY deskripsi",
+                                db_path=db_path)
+    assert [tuple(row) for row in rows] == [("a", 2), ("b", 2), ("penahan", 1)]
+
+
+def test_penulis_memberi_versi_grup_ke_pemanggil(db_path):
+    sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES ('x', 1000, 'Makanan', '2024-03-01')"
+    penulis = database.get_penulis(db_path)
+    awal = penulis.versi_data()
+    database.execute_query(sql, db_path=db_path)
+    sebelum, sesudah = database.versi_tulis_terakhir()
+    assert sebelum == awal and sesudah == penulis.versi_data() != awal
+
+    # Commit dari koneksi lain (mis. skrip impor) mengubah versi file tanpa lewat penulis
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+    assert penulis.versi_data() != sesudah
@@ -0,0 +1,46 @@
+# test_impor_csv_pengeluaran.py
+
+import datetime
+import pytest
+from impor_csv_pengeluaran import BarisDitolak, baca_csv, parse_jumlah
+
+
+@pytest.mark.parametrize("teks, jumlah", [
+    ("Rp 25.000", 25000.0),
+    ("25.000,50", 25000.5),
+    ("25,000.50", 25000.5),
+    ("+25000", 25000.0),
+    ("25.000 DB", 25000.0),
+])
+def test_nominal_pengeluaran_diterima(teks, jumlah):
+    assert parse_jumlah(teks) == jumlah
+
+
+@pytest.mark.parametrize("teks", ["-25000", "(25.000)", "500.000 CR", "", "-"])
+def test_nominal_negatif_atau_kredit_ditolak(teks):
+    with pytest.raises(BarisDitolak):
+        parse_jumlah(teks)
+
+
+def test_kolom_bertanda_negatif_adalah_pengeluaran():
+    assert parse_jumlah("-25.000", bertanda=True) == 25000.0
+    assert parse_jumlah("25.000-", bertanda=True) == 25000.0
+    assert parse_jumlah("25.000 DB", bertanda=True) == 25000.0
+    for kredit in ("+500000", "500000", "500.000 CR"):
+        with pytest.raises(BarisDitolak):
+            parse_jumlah(kredit, bertanda=True)
+
+
+def test_baca_csv_kolom_mutasi_menolak_uang_masuk(tmp_path):
+    path = tmp_path / "mutasi.csv"
+    path.write_text(
+        "tanggal,keterangan,mutasi\n"
+        "2024-03-01,Belanja bulanan,-250.000\n"
+        "2024-03-02,Gaji,+5.000.000\n"
+        "2024-03-03,Refund ongkir,25000\n",
+        encoding="utf-8",
+    )
+    ditolak = []
+    hasil = list(baca_csv(str(path), ditolak))
+    assert hasil == [("Belanja bulanan", 250000.0, "Lainnya", datetime.date(2024, 3, 1))]
+    assert [nomor for nomor, _ in ditolak] == [3, 4]
@@ -0,0 +1,76 @@
+# test_manager_anggaran.py
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import database
+from manager_anggaran import AnggaranHarian
+from model import Transaksi
+
+HARI = datetime.date(2024, 3, 1)
+
+
+@pytest.fixture
+def anggaran(tmp_path):
+    manajer = AnggaranHarian(str(tmp_path / "uji.db"))
+    yield manajer
+    manajer.tutup()
+
+
+def _jumlah_baris(manajer: AnggaranHarian, tabel: str) -> int:
+    return database.fetch_query(f"SELECT COUNT(*) FROM {tabel}", fetch_all=False, db_path=manajer.db_path)[0]
+
+
+def test_hapus_batch_undo_lalu_purge(anggaran):
+    ids = [anggaran.tambah_transaksi(Transaksi(f"tx {i}", 1000, "Makanan", HARI + datetime.timedelta(days=i)))
+           for i in range(5)]
+    assert anggaran.hitung_total_pengeluaran() == 5000  # Snapshot dimuat di sini, hapus/undo diterapkan ke snapshot
+
+    hapus = anggaran.hapus_transaksi_batch(tanggal_mulai=HARI + datetime.timedelta(days=1),
+                                           tanggal_akhir=HARI + datetime.timedelta(days=3))
+    assert hapus["dihapus"] == 3 and hapus["token"]
+    assert anggaran.hitung_total_pengeluaran() == 2000
+    assert (_jumlah_baris(anggaran, "transaksi_aktif"), _jumlah_baris(anggaran, "transaksi")) == (2, 5)
+    # Hapus ulang pada rentang yang sama tidak menyentuh tombstone
+    assert anggaran.hapus_transaksi_batch(tanggal_mulai=HARI, tanggal_akhir=HARI + datetime.timedelta(days=3))["dihapus"] == 1
+
+    assert anggaran.batalkan_hapus(hapus["token"]) == 3
+    assert anggaran.batalkan_hapus(hapus["token"]) == 0  # Undo hanya sekali
+    assert anggaran.hitung_total_pengeluaran() == 4000
+    assert sorted(anggaran.get_dataframe_transaksi()["id"]) == ids[1:]
+
+    # Tombstone yang lebih muda dari masa simpan tidak dibuang; setelah dibuang, undo tidak bisa lagi
+    assert anggaran.bersihkan_tombstone() == 0
+    assert anggaran.hapus_transaksi(ids[4])
+    assert anggaran.bersihkan_tombstone(simpan=datetime.timedelta(0), ukuran_chunk=1) == 2
+    assert (_jumlah_baris(anggaran, "transaksi_aktif"), _jumlah_baris(anggaran, "transaksi")) == (3, 3)
+    assert anggaran.hitung_total_pengeluaran() == 3000
+    assert anggaran.hitung_jumlah_transaksi() == 3
+
+
+def test_insert_dalam_anggaran_menolak_yang_melewati_batas(anggaran):
+    assert anggaran.set_batas_anggaran("Makanan", batas_harian=50000, batas_bulanan=120000)
+
+    def tambah(jumlah, hari=0, kategori="Makanan"):
+        return anggaran.tambah_transaksi(Transaksi("makan", jumlah, kategori, HARI + datetime.timedelta(days=hari)),
+                                         dalam_anggaran=True)
+
+    assert isinstance(tambah(30000), int)
+    assert tambah(30000) is False               # Harian: 60.000 > 50.000
+    assert isinstance(tambah(20000), int)       # Tepat di batas harian masih boleh
+    assert isinstance(tambah(40000, hari=1), int)
+    assert tambah(40000, hari=2) is False       # Bulanan: 130.000 > 120.000
+    assert isinstance(tambah(40000, hari=2, kategori="Hiburan"), int)  # Kategori tanpa batas
+    assert tambah(0) is None                    # Input tidak valid bukan penolakan anggaran
+    assert anggaran.hitung_total_pengeluaran_bulan(2024, 3) == 130000
+
+
+def test_insert_dalam_anggaran_benar_walau_bersamaan(anggaran):
+    anggaran.set_batas_anggaran("Makanan", batas_harian=50000)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        hasil = list(pool.map(
+            lambda _: anggaran.tambah_transaksi(Transaksi("jajan", 10000, "Makanan", HARI), dalam_anggaran=True),
+            range(20)))
+    assert sorted(h is False for h in hasil) == [False] * 5 + [True] * 15  # Tepat 5 x 10.000 masuk
+    assert None not in hasil
+    assert anggaran.hitung_total_pengeluaran(HARI) == 50000
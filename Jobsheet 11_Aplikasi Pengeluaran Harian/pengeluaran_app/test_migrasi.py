@@ -0,0 +1,44 @@
+# test_migrasi.py
+
+import sqlite3
+import database
+import migrasi
+import rekap
+
+
+def _buat_db_v1(path: str):
+    """Database seperti buatan versi lama aplikasi: hanya tabel transaksi, user_version = 1."""
+    conn = sqlite3.connect(path)
+    for langkah in migrasi.MIGRASI[0][2]:
+        conn.execute(langkah)
+    conn.executemany("INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)", [
+        ("Nasi goreng", 15000, "Makanan", "2024-03-01"),
+        ("Ojek", 12000, "Transportasi", "2024-03-01"),
+        ("Kopi", 8000, None, "2024-03-02"),
+    ])
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+
+def test_migrasi_v1_sampai_terbaru(tmp_path):
+    path = str(tmp_path / "lama.db")
+    _buat_db_v1(path)
+
+    assert database.setup_database_initial(path)
+    try:
+        with database.get_pool(path).koneksi() as conn:
+            assert migrasi.get_versi(conn) == migrasi.VERSI_TERBARU == 7
+            # Rekap diisi dari data lama (kategori NULL masuk kategori default) dan trigger langsung aktif
+            assert rekap.verifikasi_rekap(conn, path) == []
+            assert rekap.verifikasi_rekap_bulanan(conn) == []
+            assert conn.execute("SELECT SUM(jumlah_transaksi) FROM rekap_harian").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM transaksi_aktif").fetchone()[0] == 3
+            assert [row[0] for row in conn.execute("SELECT rowid FROM transaksi_fts WHERE transaksi_fts MATCH 'kopi'")] == [3]
+            for tabel in ("batch_impor", "batas_anggaran", "rekap_bulanan", "arsip_tahun"):
+                assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (tabel,)).fetchone(), tabel
+
+            # Migrasi kedua kali tidak menjalankan apa pun
+            assert migrasi.jalankan_migrasi(conn) == 7
+    finally:
+        database.tutup_database(path)
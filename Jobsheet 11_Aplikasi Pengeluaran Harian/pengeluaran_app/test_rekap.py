@@ -0,0 +1,65 @@
+# test_rekap.py
+
+import datetime
+import pytest
+import database
+import rekap
+from manager_anggaran import AnggaranHarian
+from model import Transaksi
+
+HARI = datetime.date(2024, 3, 1)
+
+
+@pytest.fixture
+def anggaran(tmp_path):
+    manajer = AnggaranHarian(str(tmp_path / "uji.db"))
+    yield manajer
+    manajer.tutup()
+
+
+def _rekap_sinkron(manajer: AnggaranHarian) -> bool:
+    conn = database.get_db_connection(manajer.db_path)
+    try:
+        return rekap.verifikasi_rekap(conn, manajer.db_path) == [] and rekap.verifikasi_rekap_bulanan(conn) == []
+    finally:
+        conn.close()
+
+
+def test_trigger_menjaga_rekap_di_semua_jalur_tulis(anggaran):
+    ids = [anggaran.tambah_transaksi(Transaksi(f"tx {i}", 1000 * (i + 1), kategori, HARI + datetime.timedelta(days=i % 3)))
+           for i, kategori in enumerate(["Makanan", "Transportasi", "Makanan", "Hiburan", "Makanan"])]
+    database.execute_query("INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES ('tanpa kategori', 500, NULL, ?)",
+                           (HARI.isoformat(),), db_path=anggaran.db_path)
+    assert _rekap_sinkron(anggaran)
+
+    # Pindah tanggal, kategori, dan jumlah sekaligus (termasuk ke bulan lain)
+    database.execute_query("UPDATE transaksi SET tanggal = '2024-04-02', kategori = 'Hiburan', jumlah = 7500 WHERE id = ?",
+                           (ids[0],), db_path=anggaran.db_path)
+    assert _rekap_sinkron(anggaran)
+
+    hapus = anggaran.hapus_transaksi_batch(ids=ids[1:3])
+    assert hapus["dihapus"] == 2 and _rekap_sinkron(anggaran)
+    # Tombstone yang diubah tidak ikut dihitung
+    database.execute_query("UPDATE transaksi SET jumlah = 99999 WHERE id = ?", (ids[1],), db_path=anggaran.db_path)
+    assert _rekap_sinkron(anggaran)
+
+    assert anggaran.batalkan_hapus(hapus["token"]) == 2 and _rekap_sinkron(anggaran)
+    assert anggaran.hapus_transaksi(ids[3]) and _rekap_sinkron(anggaran)
+    database.execute_query("DELETE FROM transaksi WHERE id = ?", (ids[4],), db_path=anggaran.db_path)
+    assert _rekap_sinkron(anggaran)
+
+    assert anggaran.hitung_total_pengeluaran() == 7500 + 99999 + 3000 + 500
+    assert anggaran.hitung_jumlah_transaksi() == 4
+
+
+def test_bangun_ulang_memperbaiki_drift(anggaran):
+    anggaran.tambah_transaksi(Transaksi("makan", 25000, "Makanan", HARI))
+    database.execute_query("UPDATE rekap_harian SET total = total + 1", db_path=anggaran.db_path)
+    assert not _rekap_sinkron(anggaran)
+
+    conn = database.get_db_connection(anggaran.db_path)
+    try:
+        rekap.bangun_ulang_rekap(conn, anggaran.db_path)
+    finally:
+        conn.close()
+    assert _rekap_sinkron(anggaran)
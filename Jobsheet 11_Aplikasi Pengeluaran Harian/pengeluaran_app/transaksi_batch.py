@@ -0,0 +1,123 @@
+# transaksi_batch.py
+
+import datetime
+import numpy as np
+from model import TransaksiRingan
+from konfigurasi import KATEGORI_DEFAULT
+
+# SQL yang menghasilkan kolom persis seperti yang dibutuhkan TransaksiBatch.dari_chunks:
+# tanggal langsung diubah ke ordinal (date.toordinal) di SQLite, jadi tidak ada parsing tanggal di Python.
+SQL_KOLOM_BATCH = """
+    SELECT id, CAST(julianday(tanggal) - 1721424.5 AS INTEGER) AS tanggal_ordinal, jumlah, kategori{deskripsi}
+    FROM transaksi_aktif
+"""
+
+
+class TransaksiBatch:
+    """
+    Kumpulan transaksi dalam bentuk kolom (columnar) untuk pembacaan massal:
+    - id, jumlah, tanggal_ordinal : numpy array
+    - kode_kategori               : numpy array int16, indeks ke list `kategori` (dictionary encoding)
+    - deskripsi                   : list str (opsional)
+    Objek per baris (TransaksiRingan) hanya dibuat saat diakses.
+    """
+
+    __slots__ = ("id", "jumlah", "tanggal_ordinal", "kode_kategori", "kategori", "deskripsi")
+
+    def __init__(self, id, jumlah, tanggal_ordinal, kode_kategori, kategori: list[str], deskripsi: list[str] | None = None):
+        self.id = id
+        self.jumlah = jumlah
+        self.tanggal_ordinal = tanggal_ordinal
+        self.kode_kategori = kode_kategori
+        self.kategori = kategori
+        self.deskripsi = deskripsi
+
+    @classmethod
+    def kosong(cls) -> "TransaksiBatch":
+        return cls(np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int32), np.empty(0, np.int16), [], [])
+
+    @classmethod
+    def dari_chunks(cls, chunks, dengan_deskripsi: bool = True) -> "TransaksiBatch":
+        """
+        Membangun batch dari potongan baris (id, tanggal_ordinal, jumlah, kategori[, deskripsi]),
+        misalnya hasil database.iter_query(SQL_KOLOM_BATCH...). Setiap potongan langsung
+        dipindah ke array, jadi tuple baris tidak menumpuk di memori.
+        """
+        kamus_kategori = {}  # nama kategori -> kode
+        bagian_id, bagian_jumlah, bagian_tanggal, bagian_kode = [], [], [], []
+        deskripsi = [] if dengan_deskripsi else None
+
+        for rows in chunks:
+            kolom = list(zip(*rows))
+            bagian_id.append(np.array(kolom[0], dtype=np.int64))
+            bagian_tanggal.append(np.array(kolom[1], dtype=np.int32))
+            bagian_jumlah.append(np.array(kolom[2], dtype=np.float64))
+            bagian_kode.append(np.array(
+                [kamus_kategori.setdefault(k or KATEGORI_DEFAULT, len(kamus_kategori)) for k in kolom[3]], dtype=np.int16))
+            if dengan_deskripsi:
+                deskripsi.extend(kolom[4])
+
+        if not bagian_id:
+            batch = cls.kosong()
+            batch.deskripsi = deskripsi
+            return batch
+
+        return cls(
+            np.concatenate(bagian_id),
+            np.concatenate(bagian_jumlah),
+            np.concatenate(bagian_tanggal),
+            np.concatenate(bagian_kode),
+            list(kamus_kategori),
+            deskripsi,
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, posisi):
+        """batch[i] -> TransaksiRingan (dibuat saat itu juga); batch[a:b] -> TransaksiBatch (view, tanpa salin)."""
+        if isinstance(posisi, slice):
+            return TransaksiBatch(self.id[posisi], self.jumlah[posisi], self.tanggal_ordinal[posisi],
+                                  self.kode_kategori[posisi], self.kategori,
+                                  self.deskripsi[posisi] if self.deskripsi is not None else None)
+        return TransaksiRingan(
+            deskripsi=self.deskripsi[posisi] if self.deskripsi is not None else None,
+            jumlah=float(self.jumlah[posisi]),
+            kategori=self.kategori[self.kode_kategori[posisi]],
+            tanggal=datetime.date.fromordinal(int(self.tanggal_ordinal[posisi])),
+            id_transaksi=int(self.id[posisi]),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"TransaksiBatch({len(self)} transaksi, {len(self.kategori)} kategori, {self.nbytes / 1024:.0f} KiB kolom numerik)"
+
+    @property
+    def nbytes(self) -> int:
+        """Ukuran kolom numerik (tanpa deskripsi) dalam byte."""
+        return self.id.nbytes + self.jumlah.nbytes + self.tanggal_ordinal.nbytes + self.kode_kategori.nbytes
+
+    def total(self) -> float:
+        return float(self.jumlah.sum())
+
+    def per_kategori(self) -> dict:
+        """Total per kategori dengan np.bincount (urut dari yang terbesar)."""
+        totals = np.bincount(self.kode_kategori, weights=self.jumlah, minlength=len(self.kategori))
+        hasil = {self.kategori[i]: float(totals[i]) for i in np.argsort(-totals) if totals[i] > 0}
+        return hasil
+
+    def to_dataframe(self):
+        """DataFrame dengan kolom kategori bertipe categorical (kode yang sama, tanpa salin string)."""
+        import pandas as pd
+        data = {
+            "id": self.id,
+            "tanggal": pd.to_datetime(self.tanggal_ordinal - 719163, unit="D"),  # 719163 = date(1970, 1, 1).toordinal()
+            "kategori": pd.Categorical.from_codes(self.kode_kategori, categories=self.kategori),
+            "jumlah": self.jumlah,
+        }
+        if self.deskripsi is not None:
+            data["deskripsi"] = self.deskripsi
+        return pd.DataFrame(data)
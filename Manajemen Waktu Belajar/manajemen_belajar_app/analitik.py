@@ -0,0 +1,232 @@
+# analitik.py
+
+import datetime
+import threading
+import numpy as np
+import database
+
+# Analitik tren belajar di memori: dua array 2D (hari x mata kuliah) berindeks ordinal tanggal
+# (baris = tanggal.toordinal() - ordinal awal) dan id tabel lookup mata_kuliah (kolom).
+# Dibangun sekali dari satu query GROUP BY, lalu diperbarui O(1) setiap sesi ditambah/dihapus
+# lewat ManajerBelajar. Jendela bergulir & streak dihitung dengan cumsum numpy, tanpa scan SQL.
+# Vektor `harian` (total menit per hari, semua mata kuliah) menjadi sumber heatmap kalender;
+# payload-nya di-cache per (versi_db, versi): `versi` naik setiap perubahan lewat instance ini,
+# `versi_db` adalah PRAGMA data_version koneksi tulis ManajerBelajar saat array dibangun. Tulisan
+# lewat koneksi itu tidak mengubah data_version, jadi ManajerBelajar membangun ulang analitik hanya
+# jika penulis lain (proses lain, CLI impor) meng-commit.
+
+# julianday('0001-01-01') = 1721425.5, sedangkan date(1, 1, 1).toordinal() = 1
+SQL_ORDINAL = "CAST(julianday(tanggal) - 1721424.5 AS INTEGER)"
+CADANGAN_HARI = 366  # Baris kosong yang disiapkan setiap kali array diperlebar
+
+
+class AnalitikBelajar:
+    """Total menit & jumlah sesi per hari per mata kuliah, dengan query streak dan jendela bergulir."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._awal = datetime.date.today().toordinal()
+        self.menit = np.zeros((CADANGAN_HARI, 1), dtype=np.float64)
+        self.sesi = np.zeros((CADANGAN_HARI, 1), dtype=np.int32)
+        self.harian = np.zeros(CADANGAN_HARI, dtype=np.float64)
+        self.versi = 0
+        self.versi_db = None  # PRAGMA data_version koneksi tulis ManajerBelajar saat array dibangun
+        self._cache_heatmap = None  # (kunci, payload) untuk versi data terakhir
+        self._id_matkul = {}  # nama -> id (kolom)
+        self._nama_matkul = {}  # id -> nama
+        self._cumsum = None  # Cache cumsum menit (dibuang setiap ada perubahan)
+
+    @classmethod
+    def dari_database(cls, versi_db=None) -> "AnalitikBelajar":
+        """Membangun array dari satu query GROUP BY tanggal, id_mata_kuliah (versi_db dibaca pemanggil SEBELUM query)."""
+        analitik = cls()
+        analitik.versi_db = versi_db
+        analitik._muat_lookup()
+        rows = database.fetch_query(
+            f"SELECT {SQL_ORDINAL} AS ordinal, id_mata_kuliah, SUM(durasi_menit), COUNT(*)"
+            " FROM sesi_belajar GROUP BY tanggal, id_mata_kuliah"
+        )
+        if rows:
+            data = np.array([tuple(row) for row in rows], dtype=np.float64)
+            ordinal = data[:, 0].astype(np.int64)
+            kolom = data[:, 1].astype(np.int64)
+            with analitik._lock:
+                analitik._pastikan_rentang(int(ordinal.min()), int(ordinal.max()), int(kolom.max()))
+                baris = ordinal - analitik._awal
+                analitik.menit[baris, kolom] = data[:, 2]
+                analitik.sesi[baris, kolom] = data[:, 3].astype(np.int32)
+                np.add.at(analitik.harian, baris, data[:, 2])
+        return analitik
+
+    def _muat_lookup(self):
+        rows = database.fetch_query("SELECT id, nama FROM mata_kuliah ORDER BY id") or []
+        with self._lock:
+            self._id_matkul = {row['nama']: row['id'] for row in rows}
+            self._nama_matkul = {row['id']: row['nama'] for row in rows}
+
+    def _kolom(self, mata_kuliah: str) -> int | None:
+        """Kolom untuk nama mata kuliah; lookup dimuat ulang sekali jika nama belum dikenal."""
+        if mata_kuliah not in self._id_matkul:
+            self._muat_lookup()
+        return self._id_matkul.get(mata_kuliah)
+
+    def _pastikan_rentang(self, ordinal_min: int, ordinal_maks: int, kolom_maks: int = 0):
+        """Memperlebar array (dengan cadangan) agar rentang tanggal & kolom muat. Jarang terjadi."""
+        kiri = max(0, self._awal - ordinal_min)
+        if kiri:
+            kiri += CADANGAN_HARI
+        kanan = max(0, ordinal_maks - (self._awal + len(self.menit) - 1))
+        if kanan:
+            kanan += CADANGAN_HARI
+        lebar = max(0, kolom_maks + 1 - self.menit.shape[1])
+        if kiri or kanan or lebar:
+            self.menit = np.pad(self.menit, ((kiri, kanan), (0, lebar)))
+            self.sesi = np.pad(self.sesi, ((kiri, kanan), (0, lebar)))
+            self.harian = np.pad(self.harian, (kiri, kanan))
+            self._awal -= kiri
+            self._cumsum = None
+
+    def _ubah(self, tanggal: datetime.date, kolom: int, durasi_menit: float, jumlah: int):
+        with self._lock:
+            ordinal = tanggal.toordinal()
+            self._pastikan_rentang(ordinal, ordinal, kolom)
+            baris = ordinal - self._awal
+            self.sesi[baris, kolom] += jumlah
+            if self.sesi[baris, kolom] <= 0:
+                # Hindari sisa pembulatan float saat semua sesi di sel itu sudah dihapus
+                self.sesi[baris, kolom] = 0
+                self.menit[baris, kolom] = 0.0
+            else:
+                self.menit[baris, kolom] += durasi_menit
+            self.harian[baris] = self.menit[baris].sum()
+            self._cumsum = None
+            self.versi += 1
+
+    def tambah(self, tanggal: datetime.date, mata_kuliah: str, durasi_menit: float):
+        """Mencatat satu sesi baru (O(1))."""
+        kolom = self._kolom(mata_kuliah)
+        if kolom is not None:
+            self._ubah(tanggal, kolom, durasi_menit, 1)
+
+    def hapus(self, tanggal: datetime.date, id_mata_kuliah: int, durasi_menit: float):
+        """Mengurangi satu sesi yang sudah dihapus dari database (O(1))."""
+        self._ubah(tanggal, id_mata_kuliah, -durasi_menit, -1)
+
+    def tambah_banyak(self, ordinal: np.ndarray, id_mata_kuliah: np.ndarray, durasi_menit: np.ndarray):
+        """Mencatat banyak sesi sekaligus (impor): satu np.add.at per array, bukan satu panggilan per sesi."""
+        if not len(ordinal):
+            return
+        if any(int(id_mk) not in self._nama_matkul for id_mk in np.unique(id_mata_kuliah)):
+            self._muat_lookup()  # Mata kuliah baru dari impor: tanpa ini kolomnya tak terlihat di menit_jendela
+        with self._lock:
+            self._pastikan_rentang(int(ordinal.min()), int(ordinal.max()), int(id_mata_kuliah.max()))
+            baris = ordinal - self._awal
+            np.add.at(self.menit, (baris, id_mata_kuliah), durasi_menit)
+            np.add.at(self.sesi, (baris, id_mata_kuliah), 1)
+            np.add.at(self.harian, baris, durasi_menit)
+            self._cumsum = None
+            self.versi += 1
+
+    def _baris(self, tanggal: datetime.date) -> int:
+        """Indeks baris untuk tanggal (array diperlebar dulu jika perlu)."""
+        ordinal = tanggal.toordinal()
+        self._pastikan_rentang(ordinal, ordinal)
+        return ordinal - self._awal
+
+    def _get_cumsum(self) -> np.ndarray:
+        """cumsum menit per kolom dengan baris nol di depan: jumlah baris [a, b) = cs[b] - cs[a]."""
+        if self._cumsum is None:
+            cs = np.zeros((len(self.menit) + 1, self.menit.shape[1]), dtype=np.float64)
+            np.cumsum(self.menit, axis=0, out=cs[1:])
+            self._cumsum = cs
+        return self._cumsum
+
+    def menit_jendela(self, hari: int, sampai: datetime.date | None = None) -> dict:
+        """Total menit per mata kuliah dalam `hari` hari terakhir sampai tanggal `sampai` (inklusif)."""
+        with self._lock:
+            akhir = self._baris(sampai or datetime.date.today()) + 1
+            cs = self._get_cumsum()
+            total = cs[akhir] - cs[max(0, akhir - hari)]
+            return {nama: float(total[id_mk]) for id_mk, nama in self._nama_matkul.items() if id_mk < len(total)}
+
+    def rolling_harian(self, hari: int, jumlah_hari: int, sampai: datetime.date | None = None) -> tuple[datetime.date, np.ndarray]:
+        """
+        Total menit bergulir `hari` hari (semua mata kuliah) untuk setiap tanggal dalam `jumlah_hari`
+        hari terakhir. Mengembalikan (tanggal pertama, array float panjang jumlah_hari).
+        """
+        with self._lock:
+            sampai = sampai or datetime.date.today()
+            self._baris(sampai - datetime.timedelta(days=jumlah_hari + hari))
+            akhir = self._baris(sampai) + 1
+            cs = self._get_cumsum().sum(axis=1)
+            ujung = np.arange(akhir - jumlah_hari + 1, akhir + 1)
+            return sampai - datetime.timedelta(days=jumlah_hari - 1), cs[ujung] - cs[ujung - hari]
+
+    def streak(self, sampai: datetime.date | None = None) -> dict:
+        """
+        Streak harian: 'saat_ini' = hari berturut-turut dengan minimal satu sesi yang berakhir di `sampai`
+        (atau sehari sebelumnya, agar streak tidak putus sebelum hari ini diisi), 'terpanjang' = rekor.
+        """
+        with self._lock:
+            akhir = self._baris(sampai or datetime.date.today())
+            aktif = self.sesi[:akhir + 1].sum(axis=1) > 0
+
+        # Panjang tiap run hari aktif dari titik awal/akhir run (np.diff pada array berbingkai nol)
+        tepi = np.diff(np.concatenate(([0], aktif.view(np.int8), [0])))
+        mulai_run = np.flatnonzero(tepi == 1)
+        akhir_run = np.flatnonzero(tepi == -1)
+        terpanjang = int((akhir_run - mulai_run).max()) if len(mulai_run) else 0
+
+        saat_ini = 0
+        if len(akhir_run) and akhir_run[-1] >= len(aktif) - 1:
+            saat_ini = int(akhir_run[-1] - mulai_run[-1])
+        return {"saat_ini": saat_ini, "terpanjang": terpanjang}
+
+    def delta_mingguan(self, sampai: datetime.date | None = None) -> list[dict]:
+        """Menit 7 hari terakhir vs 7 hari sebelumnya dan jendela 30 hari, per mata kuliah (yang pernah aktif)."""
+        sampai = sampai or datetime.date.today()
+        minggu_ini = self.menit_jendela(7, sampai)
+        minggu_lalu = self.menit_jendela(7, sampai - datetime.timedelta(days=7))
+        tiga_puluh = self.menit_jendela(30, sampai)
+        hasil = []
+        for nama in minggu_ini:
+            if minggu_ini[nama] or minggu_lalu[nama] or tiga_puluh[nama]:
+                hasil.append({
+                    "mata_kuliah": nama,
+                    "menit_7_hari": minggu_ini[nama],
+                    "menit_7_hari_lalu": minggu_lalu[nama],
+                    "delta": minggu_ini[nama] - minggu_lalu[nama],
+                    "menit_30_hari": tiga_puluh[nama],
+                })
+        return sorted(hasil, key=lambda h: h["menit_30_hari"], reverse=True)
+
+    def menit_harian(self, mulai: datetime.date, akhir: datetime.date) -> np.ndarray:
+        """Salinan vektor total menit per hari dari `mulai` sampai `akhir` (inklusif)."""
+        with self._lock:
+            return self.harian[self._baris(mulai):self._baris(akhir) + 1].copy()
+
+    def payload_heatmap(self, tahun_awal: int, tahun_akhir: int) -> dict:
+        """
+        Data heatmap kalender untuk 1 Jan tahun_awal s.d. 31 Des tahun_akhir dalam bentuk ringkas:
+        {'mulai': 'YYYY-MM-DD', 'menit': [int per hari], 'versi': n}. Di-cache sampai data berubah.
+        """
+        with self._lock:
+            kunci = (self.versi_db, self.versi, tahun_awal, tahun_akhir)
+            if self._cache_heatmap is None or self._cache_heatmap[0] != kunci:
+                menit = self.menit_harian(datetime.date(tahun_awal, 1, 1), datetime.date(tahun_akhir, 12, 31))
+                self._cache_heatmap = (kunci, {
+                    "mulai": f"{tahun_awal}-01-01",
+                    "menit": np.rint(menit).astype(np.int64).tolist(),
+                    "versi": self.versi,
+                })
+            return self._cache_heatmap[1]
+
+    def rentang_tahun(self) -> tuple[int, int]:
+        """Tahun pertama dan terakhir yang punya sesi (tahun berjalan jika belum ada data)."""
+        with self._lock:
+            aktif = np.flatnonzero(self.harian > 0)
+            if not len(aktif):
+                tahun = datetime.date.today().year
+                return tahun, tahun
+            return (datetime.date.fromordinal(self._awal + int(aktif[0])).year,
+                    datetime.date.fromordinal(self._awal + int(aktif[-1])).year)
@@ -2,13 +2,63 @@
 
 import sqlite3
 import pandas as pd
-from konfigurasi import DB_PATH
+from konfigurasi import DB_PATH, MATAKULIAH_PILIHAN
 
-def get_db_connection() -> sqlite3.Connection | None:
-    """Membuka dan mengembalikan koneksi baru ke database SQLite."""
+# Skema versi 1: nama mata kuliah & topik disimpan sekali di tabel lookup, sesi_belajar hanya
+# menyimpan id integernya (baris lebih kecil, GROUP BY membandingkan integer, bukan string).
+# Database lama (kolom teks mata_kuliah/topik) dimigrasi di tempat oleh migrasi_lookup().
+# Versi 2: kolom sidik_jari (hash sesi hasil impor kalender, NULL untuk input manual) dengan
+# indeks UNIQUE parsial, sehingga INSERT OR IGNORE melewati sesi yang sudah pernah diimpor.
+VERSI_SKEMA = 2
+
+SQL_SKEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS mata_kuliah (
+        id INTEGER PRIMARY KEY,
+        nama TEXT NOT NULL UNIQUE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS topik (
+        id INTEGER PRIMARY KEY,
+        nama TEXT NOT NULL UNIQUE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sesi_belajar (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_mata_kuliah INTEGER NOT NULL REFERENCES mata_kuliah(id),
+        id_topik INTEGER NOT NULL REFERENCES topik(id),
+        durasi_menit REAL NOT NULL CHECK(durasi_menit > 0),
+        tanggal DATE NOT NULL,
+        tingkat_pemahaman TEXT,
+        sidik_jari INTEGER
+    );
+    """,
+]
+
+# Indeks penutup untuk ringkasan distribusi pemahaman: GROUP BY id_topik, tingkat_pemahaman
+# dibaca langsung dari indeks (urutannya sudah sesuai), tanpa menyentuh tabel dan tanpa sort.
+# Versi berawalan tanggal dipakai saat ringkasan difilter per hari.
+SQL_INDEX_SESI = [
+    "CREATE INDEX IF NOT EXISTS idx_sesi_topik_pemahaman ON sesi_belajar (id_topik, tingkat_pemahaman)",
+    "CREATE INDEX IF NOT EXISTS idx_sesi_tanggal_topik_pemahaman ON sesi_belajar (tanggal, id_topik, tingkat_pemahaman)",
+    # Penutup untuk pembangunan array analitik (GROUP BY tanggal, id_mata_kuliah) dan total per tanggal
+    "CREATE INDEX IF NOT EXISTS idx_sesi_tanggal_matkul_durasi ON sesi_belajar (tanggal, id_mata_kuliah, durasi_menit)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_sesi_sidik_jari ON sesi_belajar (sidik_jari) WHERE sidik_jari IS NOT NULL",
+]
+
+def get_db_connection(lintas_thread: bool = False) -> sqlite3.Connection | None:
+    """
+    Membuka dan mengembalikan koneksi baru ke database SQLite.
+    lintas_thread=True untuk koneksi yang disimpan lama dan dipakai bergantian oleh beberapa thread
+    (pemanggil wajib menjaganya dengan lock sendiri).
+    """
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn = sqlite3.connect(DB_PATH, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=not lintas_thread)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
         return conn
     except sqlite3.Error as e:
         print(f"ERROR [database.py] Koneksi DB gagal: {e}")
@@ -64,6 +114,64 @@ def fetch_query(query: str, params: tuple = None, fetch_all: bool = True):
         if conn:
             conn.close()
 
+def execute_returning(query: str, params: tuple = None, conn: sqlite3.Connection | None = None) -> list | None:
+    """
+    Menjalankan query non-SELECT dengan klausa RETURNING lalu commit.
+    Mengembalikan baris yang dikembalikan (list kosong jika tidak ada yang berubah), None jika gagal.
+    Jika `conn` diberikan, koneksi itu dipakai dan tidak ditutup.
+    """
+    milik_sendiri = conn is None
+    conn = conn or get_db_connection()
+    if not conn:
+        return None
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params or ())
+        rows = cursor.fetchall()
+        conn.commit()
+        return rows
+    except sqlite3.Error as e:
+        print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:60]}...")
+        conn.rollback()
+        return None
+    finally:
+        if milik_sendiri:
+            conn.close()
+
+def execute_transaction(langkah: list[tuple[str, tuple | list | None]], ambil_hasil: bool = False,
+                        conn: sqlite3.Connection | None = None):
+    """
+    Menjalankan beberapa query non-SELECT dalam SATU transaksi (semua berhasil atau semua dibatalkan).
+    `langkah` berisi pasangan (query, params); params berupa list of tuple dijalankan dengan executemany.
+    Mengembalikan lastrowid query terakhir, atau (jika ambil_hasil=True) baris RETURNING query terakhir.
+    None jika gagal. Jika `conn` diberikan, koneksi itu dipakai dan tidak ditutup.
+    """
+    milik_sendiri = conn is None
+    conn = conn or get_db_connection()
+    if not conn:
+        return None
+
+    query = "BEGIN"  # Agar pesan error tetap punya query jika BEGIN sendiri yang gagal
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        for query, params in langkah:
+            if isinstance(params, list):
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params or ())
+        hasil = cursor.fetchall() if ambil_hasil else cursor.lastrowid
+        conn.commit()
+        return hasil
+    except sqlite3.Error as e:
+        print(f"ERROR [database.py] Transaksi gagal: {e} | Query: {query[:60]}...")
+        conn.rollback()
+        return None
+    finally:
+        if milik_sendiri:
+            conn.close()
+
 def get_dataframe(query: str, params: tuple = None) -> pd.DataFrame:
     """Menjalankan query SELECT dan mengembalikan hasil sebagai DataFrame Pandas."""
     conn = get_db_connection()
@@ -80,9 +188,70 @@ def get_dataframe(query: str, params: tuple = None) -> pd.DataFrame:
         if conn:
             conn.close()
 
+def seed_mata_kuliah(cursor: sqlite3.Cursor):
+    """Mengisi tabel lookup mata_kuliah dari konfigurasi (urutan id = urutan MATAKULIAH_PILIHAN)."""
+    cursor.executemany("INSERT OR IGNORE INTO mata_kuliah (nama) VALUES (?)", [(nama,) for nama in MATAKULIAH_PILIHAN])
+
+def migrasi_lookup(conn: sqlite3.Connection) -> bool:
+    """
+    Migrasi di tempat dari skema lama (mata_kuliah/topik TEXT di setiap baris) ke skema lookup.
+    Tidak melakukan apa pun jika tabel sesi_belajar sudah memakai id_mata_kuliah/id_topik.
+    ID sesi dan nilai AUTOINCREMENT dipertahankan. Mengembalikan True jika migrasi dijalankan.
+    """
+    kolom = [row[1] for row in conn.execute("PRAGMA table_info(sesi_belajar)").fetchall()]
+    if "mata_kuliah" not in kolom:
+        return False
+
+    print(" -> Migrasi 'sesi_belajar' ke tabel lookup mata_kuliah/topik...")
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        for sql in SQL_SKEMA[:2]:
+            cursor.execute(sql)
+        seed_mata_kuliah(cursor)
+        # Nama yang belum ada di lookup diberi id sesuai urutan kemunculan pertamanya
+        cursor.execute("INSERT OR IGNORE INTO mata_kuliah (nama) SELECT mata_kuliah FROM sesi_belajar GROUP BY mata_kuliah ORDER BY MIN(id)")
+        cursor.execute("INSERT OR IGNORE INTO topik (nama) SELECT topik FROM sesi_belajar GROUP BY topik ORDER BY MIN(id)")
+
+        row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sesi_belajar'").fetchone()
+        seq_lama = row[0] if row else 0
+
+        cursor.execute(SQL_SKEMA[2].replace("sesi_belajar", "sesi_belajar_baru", 1))
+        cursor.execute("""
+            INSERT INTO sesi_belajar_baru (id, id_mata_kuliah, id_topik, durasi_menit, tanggal, tingkat_pemahaman)
+            SELECT s.id, m.id, t.id, s.durasi_menit, s.tanggal, s.tingkat_pemahaman
+            FROM sesi_belajar s
+            JOIN mata_kuliah m ON m.nama = s.mata_kuliah
+            JOIN topik t ON t.nama = s.topik
+            ORDER BY s.id
+        """)
+        cursor.execute("DROP TABLE sesi_belajar")
+        cursor.execute("ALTER TABLE sesi_belajar_baru RENAME TO sesi_belajar")
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'sesi_belajar'", (seq_lama,))
+        cursor.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    # Halaman bekas kolom teks baru dikembalikan ke sistem file setelah VACUUM
+    conn.execute("VACUUM")
+    print(" -> Migrasi selesai.")
+    return True
+
+def migrasi_sidik_jari(conn: sqlite3.Connection) -> bool:
+    """Menambahkan kolom sidik_jari (skema versi 2) ke tabel sesi_belajar yang belum memilikinya."""
+    kolom = [row[1] for row in conn.execute("PRAGMA table_info(sesi_belajar)").fetchall()]
+    if not kolom or "sidik_jari" in kolom:
+        return False
+    conn.execute("ALTER TABLE sesi_belajar ADD COLUMN sidik_jari INTEGER")
+    conn.commit()
+    print(" -> Kolom 'sidik_jari' ditambahkan ke 'sesi_belajar'.")
+    return True
+
 def setup_database_initial():
     """
-    Memastikan tabel 'sesi_belajar' ada.
+    Memastikan tabel 'sesi_belajar' beserta tabel lookup-nya ada (dan memigrasi skema lama).
     Dipanggil oleh ManajerBelajar jika perlu (opsional setup awal).
     """
     print(f"Memeriksa/membuat tabel di database (via database.py): {DB_PATH}")
@@ -91,18 +260,13 @@ def setup_database_initial():
         return False
 
     try:
+        migrasi_lookup(conn)
+        migrasi_sidik_jari(conn)
         cursor = conn.cursor()
-        sql_create_table = """
-            CREATE TABLE IF NOT EXISTS sesi_belajar (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                mata_kuliah TEXT NOT NULL,
-                topik TEXT NOT NULL,
-                durasi_menit REAL NOT NULL CHECK(durasi_menit > 0),
-                tanggal DATE NOT NULL,
-                tingkat_pemahaman TEXT
-            );
-        """
-        cursor.execute(sql_create_table)
+        for sql in SQL_SKEMA + SQL_INDEX_SESI:
+            cursor.execute(sql)
+        seed_mata_kuliah(cursor)
+        cursor.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
         conn.commit()
         print(" -> Tabel 'sesi_belajar' siap.")
         return True
@@ -0,0 +1,372 @@
+# impor_kalender.py
+
+import argparse
+import csv
+import datetime
+import os
+import re
+import sys
+import time
+from model import SesiBelajar
+from manager_belajar import ManajerBelajar
+from konfigurasi import MATAKULIAH_PILIHAN, MATAKULIAH_DEFAULT, TINGKAT_PEMAHAMAN_PILIHAN, BATCH_UKURAN_CHUNK
+
+# Impor sesi belajar dari ekspor kalender (.ics) atau CSV.
+# File dibaca baris per baris (tidak dimuat seluruhnya ke memori); setiap acara diubah menjadi
+# SesiBelajar lalu diteruskan ke ManajerBelajar.tambah_sesi_batch. Sesi yang sama (mata kuliah,
+# topik, tanggal, durasi) yang sudah pernah diimpor dilewati oleh indeks UNIQUE sidik_jari.
+#
+# Mata kuliah & topik diambil dari CATEGORIES/kolom mata kuliah jika ada, jika tidak dari judul
+# acara berbentuk "Mata Kuliah: Topik" atau "Mata Kuliah - Topik".
+
+# Nama kolom CSV yang dikenali (huruf kecil). Kolom pertama yang cocok dipakai.
+ALIAS_KOLOM = {
+    "tanggal": ["tanggal", "tgl", "date", "start date", "tanggal mulai"],
+    "mata_kuliah": ["mata kuliah", "mata_kuliah", "matkul", "course", "categories", "kategori"],
+    "topik": ["topik", "topic", "judul", "subject", "summary", "title"],
+    "durasi": ["durasi", "durasi (menit)", "durasi_menit", "menit", "duration", "minutes"],
+    "jam_mulai": ["jam mulai", "mulai", "start time", "start"],
+    "jam_selesai": ["jam selesai", "selesai", "end time", "end"],
+    "pemahaman": ["pemahaman", "tingkat pemahaman", "tingkat_pemahaman"],
+}
+FORMAT_TANGGAL = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%y", "%Y/%m/%d"]
+FORMAT_JAM = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p", "%H.%M"]
+POLA_DURASI_ICS = re.compile(r"^([+-]?)P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+_MATKUL_KECIL = {nama.casefold(): nama for nama in MATAKULIAH_PILIHAN}
+_PEMAHAMAN_KECIL = {nama.casefold(): nama for nama in TINGKAT_PEMAHAMAN_PILIHAN}
+
+
+class BarisDitolak(ValueError):
+    """Acara/baris yang tidak bisa diubah menjadi sesi belajar."""
+
+
+def nama_mata_kuliah(teks: str) -> str:
+    """Menyamakan penulisan dengan MATAKULIAH_PILIHAN jika cocok (tanpa memperhatikan huruf besar/kecil)."""
+    teks = " ".join((teks or "").split())
+    return _MATKUL_KECIL.get(teks.casefold(), teks)
+
+
+def pecah_judul(judul: str) -> tuple[str, str]:
+    """'Statistika: Regresi' / 'Statistika - Regresi' -> ('Statistika', 'Regresi'); tanpa pemisah -> (default, judul)."""
+    judul = " ".join((judul or "").split())
+    if not judul:
+        raise BarisDitolak("judul acara kosong")
+    for pemisah in (":", " - ", " – ", " | "):
+        if pemisah in judul:
+            matkul, topik = (bagian.strip() for bagian in judul.split(pemisah, 1))
+            if matkul and topik:
+                return nama_mata_kuliah(matkul), topik
+    # Judul yang diawali nama mata kuliah yang dikenal, misal "Statistika regresi linear"
+    for kecil, nama in _MATKUL_KECIL.items():
+        if judul.casefold().startswith(kecil + " "):
+            return nama, judul[len(kecil):].strip()
+    return MATAKULIAH_DEFAULT, judul
+
+
+def buat_sesi(mata_kuliah: str, topik: str, durasi_menit: float, tanggal: datetime.date, pemahaman: str | None = None) -> SesiBelajar:
+    if durasi_menit is None or durasi_menit <= 0:
+        raise BarisDitolak("durasi tidak positif")
+    if not topik:
+        raise BarisDitolak("topik kosong")
+    pemahaman = _PEMAHAMAN_KECIL.get((pemahaman or "").strip().casefold())
+    return SesiBelajar(mata_kuliah or MATAKULIAH_DEFAULT, topik, round(durasi_menit, 2), tanggal, pemahaman)
+
+
+# --- ICS ---
+
+def _unescape_ics(teks: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), teks)
+
+
+def _baris_ics(f):
+    """Generator baris logis ICS: baris lanjutan (diawali spasi/tab) digabung ke baris sebelumnya."""
+    sebelumnya = None
+    for baris in f:
+        baris = baris.rstrip("\r\n")
+        if baris[:1] in (" ", "\t") and sebelumnya is not None:
+            sebelumnya += baris[1:]
+            continue
+        if sebelumnya is not None:
+            yield sebelumnya
+        sebelumnya = baris
+    if sebelumnya:
+        yield sebelumnya
+
+
+def parse_waktu_ics(nilai: str, param: dict) -> datetime.datetime | datetime.date:
+    """DTSTART/DTEND: 20250301 (seharian), 20250301T090000 (lokal/TZID), 20250301T020000Z (UTC -> lokal)."""
+    nilai = nilai.strip()
+    utc = nilai.endswith("Z")
+    angka = nilai[:-1] if utc else nilai
+    try:
+        # Dipotong manual (format dasar ISO 8601 selalu berposisi tetap): jauh lebih cepat dari strptime
+        if len(angka) == 8 and angka.isdigit():
+            return datetime.date(int(angka[:4]), int(angka[4:6]), int(angka[6:8]))
+        if len(angka) == 15 and angka[8] == "T" and angka[:8].isdigit() and angka[9:].isdigit():
+            waktu = datetime.datetime(int(angka[:4]), int(angka[4:6]), int(angka[6:8]),
+                                      int(angka[9:11]), int(angka[11:13]), int(angka[13:15]))
+            if utc:
+                return waktu.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+            return waktu  # TZID diperlakukan sebagai waktu lokal
+    except ValueError:
+        pass
+    raise BarisDitolak(f"format waktu '{nilai}' tidak dikenali")
+
+
+def parse_durasi_ics(nilai: str) -> float:
+    """DURATION ISO 8601 (PT1H30M, P1DT2H, PT45M) -> menit."""
+    cocok = POLA_DURASI_ICS.match(nilai.strip())
+    if not cocok:
+        raise BarisDitolak(f"DURATION '{nilai}' tidak dikenali")
+    tanda, minggu, hari, jam, menit, detik = cocok.groups()
+    total = (int(minggu or 0) * 7 * 1440 + int(hari or 0) * 1440 + int(jam or 0) * 60
+             + int(menit or 0) + int(detik or 0) / 60)
+    return -total if tanda == "-" else total
+
+
+def _acara_ke_sesi(acara: dict, batas_ulang: datetime.date):
+    """Satu VEVENT -> list SesiBelajar (lebih dari satu jika acara berulang/RRULE)."""
+    if acara.get("STATUS", ("", {}))[0].upper() == "CANCELLED":
+        raise BarisDitolak("acara dibatalkan")
+    if "DTSTART" not in acara:
+        raise BarisDitolak("acara tanpa DTSTART")
+    mulai = parse_waktu_ics(*acara["DTSTART"])
+    if not isinstance(mulai, datetime.datetime):
+        raise BarisDitolak("acara seharian tidak punya durasi")
+
+    if "DTEND" in acara:
+        selesai = parse_waktu_ics(*acara["DTEND"])
+        if not isinstance(selesai, datetime.datetime):
+            raise BarisDitolak("DTEND tanpa jam")
+        durasi = (selesai - mulai).total_seconds() / 60
+    elif "DURATION" in acara:
+        durasi = parse_durasi_ics(acara["DURATION"][0])
+    else:
+        raise BarisDitolak("acara tanpa DTEND/DURATION")
+
+    judul = _unescape_ics(acara.get("SUMMARY", ("", {}))[0])
+    if "CATEGORIES" in acara:
+        mata_kuliah = nama_mata_kuliah(_unescape_ics(acara["CATEGORIES"][0]).split(",")[0])
+        topik = " ".join(judul.split())
+        if topik.casefold().startswith(mata_kuliah.casefold()):
+            topik = topik[len(mata_kuliah):].lstrip(" :-–|") or topik
+    else:
+        mata_kuliah, topik = pecah_judul(judul)
+
+    daftar_mulai = [mulai]
+    if "RRULE" in acara:
+        # dateutil ikut terpasang bersama pandas. Kemunculan dibatasi sampai `batas_ulang`
+        # (default hari ini): acara berulang tanpa UNTIL/COUNT tidak ada ujungnya.
+        from dateutil.rrule import rrulestr, rruleset
+        aturan = re.sub(r"(UNTIL=\d{8}(?:T\d{6})?)Z", r"\1", acara["RRULE"][0])
+        himpunan = rruleset()
+        himpunan.rrule(rrulestr(aturan, dtstart=mulai))
+        for nilai, param in acara.get("EXDATE", []):
+            for satu in nilai.split(","):
+                kecuali = parse_waktu_ics(satu, param)
+                if not isinstance(kecuali, datetime.datetime):
+                    kecuali = datetime.datetime.combine(kecuali, mulai.time())
+                himpunan.exdate(kecuali)
+        daftar_mulai = list(himpunan.between(mulai, datetime.datetime.combine(batas_ulang, datetime.time.max), inc=True))
+
+    return [buat_sesi(mata_kuliah, topik, durasi, waktu.date()) for waktu in daftar_mulai]
+
+
+def baca_ics(path: str, ditolak: list, batas_ulang: datetime.date | None = None, encoding: str = "utf-8-sig"):
+    """
+    Generator: membaca file .ics secara lazy dan menghasilkan SesiBelajar per VEVENT.
+    Acara yang gagal diubah dicatat ke list `ditolak` sebagai (nomor_baris, alasan).
+    """
+    batas_ulang = batas_ulang or datetime.date.today()
+    acara, nomor_acara = None, 0
+    with open(path, encoding=encoding, errors="replace") as f:
+        for nomor, baris in enumerate(_baris_ics(f), start=1):
+            if baris == "BEGIN:VEVENT":
+                acara, nomor_acara = {}, nomor
+            elif baris == "END:VEVENT" and acara is not None:
+                try:
+                    yield from _acara_ke_sesi(acara, batas_ulang)
+                except ValueError as e:  # BarisDitolak atau RRULE yang tidak valid
+                    ditolak.append((nomor_acara, str(e)))
+                acara = None
+            elif acara is not None and ":" in baris:
+                kepala, nilai = baris.split(":", 1)
+                nama, *param = kepala.split(";")
+                param = dict(p.split("=", 1) for p in param if "=" in p)
+                if nama.upper() == "EXDATE":
+                    acara.setdefault("EXDATE", []).append((nilai, param))
+                elif nama.upper() not in acara:  # Properti pertama yang dipakai
+                    acara[nama.upper()] = (nilai, param)
+
+
+# --- CSV ---
+
+def _strptime_urut(teks: str, daftar_format: list[str]) -> datetime.datetime | None:
+    """
+    Mencoba format satu per satu; format yang berhasil dipindah ke depan `daftar_format`, sehingga
+    baris berikutnya di file yang sama (biasanya berformat sama) cukup sekali strptime.
+    """
+    for i, fmt in enumerate(daftar_format):
+        try:
+            hasil = datetime.datetime.strptime(teks, fmt)
+        except ValueError:
+            continue
+        if i:
+            daftar_format.insert(0, daftar_format.pop(i))
+        return hasil
+    return None
+
+
+def parse_tanggal(teks: str, daftar_format: list[str] = FORMAT_TANGGAL) -> datetime.date:
+    teks = (teks or "").strip()
+    hasil = _strptime_urut(teks, daftar_format) if teks else None
+    if hasil is None:
+        raise BarisDitolak(f"format tanggal '{teks}' tidak dikenali")
+    return hasil.date()
+
+
+def parse_jam(teks: str, daftar_format: list[str] = FORMAT_JAM) -> datetime.time:
+    teks = (teks or "").strip().upper()
+    if not teks:
+        raise BarisDitolak("jam kosong")
+    hasil = _strptime_urut(teks, daftar_format)
+    if hasil is None:
+        raise BarisDitolak(f"format jam '{teks}' tidak dikenali")
+    return hasil.time()
+
+
+def parse_durasi(teks: str) -> float:
+    """'90', '90,5', '1:30' (jam:menit) -> menit."""
+    teks = (teks or "").strip()
+    if re.fullmatch(r"\d+:\d{1,2}", teks):
+        jam, menit = teks.split(":")
+        return int(jam) * 60 + int(menit)
+    try:
+        return float(teks.replace(",", "."))
+    except ValueError:
+        raise BarisDitolak(f"durasi '{teks}' tidak valid")
+
+
+def _petakan_kolom(header: list[str]) -> dict:
+    header_kecil = {nama.strip().lower(): nama for nama in header if nama}
+    peta = {}
+    for kunci, alias_list in ALIAS_KOLOM.items():
+        for alias in alias_list:
+            if alias in header_kecil and header_kecil[alias] not in peta.values():
+                peta[kunci] = header_kecil[alias]
+                break
+    hilang = [k for k in ("tanggal", "topik") if k not in peta]
+    if "durasi" not in peta and not ("jam_mulai" in peta and "jam_selesai" in peta):
+        hilang.append("durasi (atau jam mulai & jam selesai)")
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ditemukan di header CSV: {', '.join(hilang)}")
+    return peta
+
+
+def baca_csv(path: str, ditolak: list, pemisah: str | None = None, encoding: str = "utf-8-sig"):
+    """
+    Generator: membaca CSV secara lazy dan menghasilkan SesiBelajar per baris.
+    Baris yang gagal di-parse dicatat ke list `ditolak` sebagai (nomor_baris, alasan).
+    """
+    with open(path, newline="", encoding=encoding) as f:
+        if pemisah is None:
+            contoh = f.read(4096)
+            f.seek(0)
+            try:
+                pemisah = csv.Sniffer().sniff(contoh, delimiters=",;\t|").delimiter
+            except csv.Error:
+                pemisah = ","
+
+        reader = csv.DictReader(f, delimiter=pemisah)
+        peta = _petakan_kolom(reader.fieldnames or [])
+        format_tanggal, format_jam = list(FORMAT_TANGGAL), list(FORMAT_JAM)  # Urutan dipelajari per file
+
+        for row in reader:
+            nomor = reader.line_num
+            try:
+                tanggal = parse_tanggal(row.get(peta["tanggal"]), format_tanggal)
+                if "durasi" in peta and (row.get(peta["durasi"]) or "").strip():
+                    durasi = parse_durasi(row.get(peta["durasi"]))
+                elif "jam_mulai" in peta and "jam_selesai" in peta:
+                    mulai = datetime.datetime.combine(tanggal, parse_jam(row.get(peta["jam_mulai"]), format_jam))
+                    selesai = datetime.datetime.combine(tanggal, parse_jam(row.get(peta["jam_selesai"]), format_jam))
+                    if selesai <= mulai:
+                        selesai += datetime.timedelta(days=1)  # Melewati tengah malam
+                    durasi = (selesai - mulai).total_seconds() / 60
+                else:
+                    raise BarisDitolak("durasi kosong")
+
+                judul = (row.get(peta["topik"]) or "").strip()
+                if "mata_kuliah" in peta and (row.get(peta["mata_kuliah"]) or "").strip():
+                    mata_kuliah, topik = nama_mata_kuliah(row.get(peta["mata_kuliah"])), " ".join(judul.split())
+                else:
+                    mata_kuliah, topik = pecah_judul(judul)
+                pemahaman = row.get(peta["pemahaman"]) if "pemahaman" in peta else None
+                yield buat_sesi(mata_kuliah, topik, durasi, tanggal, pemahaman)
+            except BarisDitolak as e:
+                ditolak.append((nomor, str(e)))
+
+
+def cek_encoding(path: str, encoding: str):
+    """
+    Membaca seluruh file sekali (per potongan 1 MB) hanya untuk memastikan bisa di-decode dengan `encoding`.
+    Tanpa cek ini, byte yang salah di tengah file baru ketahuan setelah potongan-potongan sebelumnya
+    ter-commit, sehingga impor berhenti di tengah jalan.
+    """
+    with open(path, encoding=encoding) as f:
+        try:
+            while f.read(1 << 20):
+                pass
+        except UnicodeDecodeError as e:
+            raise ValueError(f"File bukan teks {encoding} yang valid ({e.reason} di byte {e.start:,}); "
+                             "coba simpan ulang sebagai UTF-8 atau pilih encoding lain.") from e
+
+
+def impor_file(path: str, manajer: ManajerBelajar | None = None, ukuran_chunk: int = BATCH_UKURAN_CHUNK,
+               batas_ulang: datetime.date | None = None, encoding: str = "utf-8-sig") -> dict:
+    """Mengimpor satu file .ics atau .csv (ditentukan dari ekstensi). Mengembalikan ringkasan hasil impor."""
+    manajer = manajer or ManajerBelajar()
+    ditolak_parse = []
+    if path.lower().endswith((".ics", ".ical", ".ifb")):
+        sumber = baca_ics(path, ditolak_parse, batas_ulang, encoding)
+    else:
+        cek_encoding(path, encoding)  # Sebelum potongan pertama di-commit (baca_ics memakai errors="replace")
+        sumber = baca_csv(path, ditolak_parse, encoding=encoding)
+
+    mulai = time.perf_counter()
+    hasil = manajer.tambah_sesi_batch(sumber, ukuran_chunk=ukuran_chunk)
+    durasi = time.perf_counter() - mulai
+
+    hasil["ditolak"] = ditolak_parse + [(f"sesi #{nomor}", alasan) for nomor, alasan in hasil["ditolak"]]
+    hasil["durasi_detik"] = durasi
+    diproses = hasil["disimpan"] + hasil["duplikat"] + len(hasil["ditolak"])
+    hasil["baris_per_detik"] = diproses / durasi if durasi > 0 else 0.0
+    return hasil
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Impor sesi belajar dari file kalender (.ics) atau CSV.")
+    parser.add_argument("file", help="Path file .ics / .csv yang akan diimpor")
+    parser.add_argument("--chunk", type=int, default=BATCH_UKURAN_CHUNK, help="Jumlah sesi per transaksi")
+    parser.add_argument("--sampai", type=datetime.date.fromisoformat, default=None,
+                        help="Batas kemunculan acara berulang (YYYY-MM-DD, default: hari ini)")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    args = parser.parse_args()
+
+    print(f"--- Memulai Impor: {os.path.basename(args.file)} ---")
+    try:
+        hasil = impor_file(args.file, ukuran_chunk=args.chunk, batas_ulang=args.sampai, encoding=args.encoding)
+    except (ValueError, OSError) as e:  # Header CSV tidak lengkap, encoding salah, file tidak bisa dibuka
+        print(f"ERROR: Impor dibatalkan: {e}")
+        sys.exit(1)
+
+    print(f"Disimpan      : {hasil['disimpan']} sesi")
+    print(f"Duplikat      : {hasil['duplikat']} sesi (sudah pernah diimpor, dilewati)")
+    print(f"Ditolak       : {len(hasil['ditolak'])} baris/acara")
+    for nomor, alasan in hasil["ditolak"][:20]:
+        print(f"   - baris {nomor}: {alasan}")
+    if len(hasil["ditolak"]) > 20:
+        print(f"   ... dan {len(hasil['ditolak']) - 20} lainnya")
+    print(f"Kecepatan     : {hasil['baris_per_detik']:,.0f} sesi/detik ({hasil['durasi_detik']:.2f} detik)")
+    print("--- Impor Selesai ---")
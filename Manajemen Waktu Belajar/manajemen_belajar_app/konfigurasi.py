@@ -21,4 +21,7 @@ MATAKULIAH_PILIHAN = [
 ]
 MATAKULIAH_DEFAULT = "Lainnya"
 TINGKAT_PEMAHAMAN_PILIHAN = ["Rendah", "Sedang", "Tinggi", "Sangat Tinggi"]
-TINGKAT_PEMAHAMAN_DEFAULT = "Sedang"
\ No newline at end of file
+TINGKAT_PEMAHAMAN_DEFAULT = "Sedang"
+
+# Impor kalender (.ics / .csv): jumlah sesi per transaksi database
+BATCH_UKURAN_CHUNK = 5000
\ No newline at end of file
@@ -2,6 +2,8 @@
 
 import streamlit as st
 import datetime
+import os
+import tempfile
 import pandas as pd
 import locale
 
@@ -34,6 +36,7 @@ def format_durasi(menit_total):
 try:
     from model import SesiBelajar
     from manager_belajar import ManajerBelajar
+    from impor_kalender import impor_file
     from konfigurasi import MATAKULIAH_PILIHAN, TINGKAT_PEMAHAMAN_PILIHAN
 except ImportError as e:
     st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada di direktori yang benar.")
@@ -85,6 +88,43 @@ def halaman_input(manajer: ManajerBelajar):
                     else:
                         st.error("Gagal menyimpan sesi belajar.", icon="❌")
 
+    bagian_impor(manajer)
+
+
+# --- Impor dari Kalender (.ics / .csv) ---
+def bagian_impor(manajer: ManajerBelajar):
+    with st.expander("📥 Impor dari Kalender (.ics / .csv)"):
+        st.caption(
+            "Judul acara dibaca sebagai \"Mata Kuliah: Topik\" (atau kolom/CATEGORIES mata kuliah jika ada). "
+            "Sesi yang sudah pernah diimpor (mata kuliah, topik, tanggal, dan durasi sama) otomatis dilewati."
+        )
+        berkas = st.file_uploader("Pilih file:", type=["ics", "csv"], key="impor_kalender_file")
+        if berkas is not None and st.button("Impor Sesi", key="impor_kalender_button"):
+            akhiran = os.path.splitext(berkas.name)[1].lower()
+            # File disalin ke disk lalu dibaca baris per baris oleh importer (tidak dimuat utuh)
+            with tempfile.NamedTemporaryFile(suffix=akhiran, delete=False) as tmp:
+                for potongan in iter(lambda: berkas.read(1 << 20), b""):
+                    tmp.write(potongan)
+            try:
+                with st.spinner("Mengimpor..."):
+                    hasil = impor_file(tmp.name, manajer)
+            except ValueError as e:
+                st.error(f"Gagal mengimpor: {e}", icon="❌")
+                return
+            finally:
+                os.remove(tmp.name)
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Disimpan", f"{hasil['disimpan']:,}")
+            col2.metric("Duplikat (dilewati)", f"{hasil['duplikat']:,}")
+            col3.metric("Ditolak", f"{len(hasil['ditolak']):,}")
+            col4.metric("Kecepatan", f"{hasil['baris_per_detik']:,.0f} sesi/dtk")
+            if hasil["ditolak"]:
+                st.dataframe(pd.DataFrame(hasil["ditolak"][:200], columns=["Baris", "Alasan"]).astype(str),
+                             hide_index=True, use_container_width=True)
+            if hasil["disimpan"]:
+                st.cache_data.clear()
+
 
 # --- Halaman Riwayat ---
 def halaman_riwayat(manajer: ManajerBelajar):
@@ -211,50 +251,145 @@ def halaman_ringkasan(manajer: ManajerBelajar):
     st.subheader(f"Distribusi Tingkat Pemahaman per Topik {label_periode}")
 
     @st.cache_data(ttl=300)
-    def get_pemahaman_distribusi_cached(tgl_filter):
-        return manajer.get_distribusi_pemahaman_per_topik(tanggal=tgl_filter)
+    def get_pivot_pemahaman_cached(tgl_filter, top_n=None):
+        return manajer.get_pivot_pemahaman_per_topik(tanggal=tgl_filter, top_n=top_n)
 
     with st.spinner(f"Memuat distribusi pemahaman..."):
-        dict_distribusi_pemahaman = get_pemahaman_distribusi_cached(tanggal_filter)
+        df_distribusi = get_pivot_pemahaman_cached(tanggal_filter)
 
-    if not dict_distribusi_pemahaman:
+    if df_distribusi is None or df_distribusi.empty:
         st.info(f"Tidak ada data distribusi pemahaman untuk periode ini.")
     else:
         try:
-            data_distribusi = []
-            for topik, distribusi in dict_distribusi_pemahaman.items():
-                row = {"Topik": topik}
-                for level in TINGKAT_PEMAHAMAN_PILIHAN:
-                    row[level] = distribusi.get(level, 0)
-                data_distribusi.append(row)
-            df_distribusi = pd.DataFrame(data_distribusi)
-
-            if not df_distribusi.empty:
-                st.write("Jumlah Sesi berdasarkan Tingkat Pemahaman per Topik:")
-                st.dataframe(df_distribusi, hide_index=True, use_container_width=True)
-
-                st.write("Grafik Distribusi Tingkat Pemahaman (Top 5 Topik dengan Sesi Terbanyak):")
-                
-                df_distribusi['Total Sesi'] = df_distribusi[TINGKAT_PEMAHAMAN_PILIHAN].sum(axis=1)
-                df_plot = df_distribusi.sort_values(by='Total Sesi', ascending=False).head(5)
-                
-                if not df_plot.empty:
-                    df_melted = df_plot.melt(id_vars=['Topik'], value_vars=TINGKAT_PEMAHAMAN_PILIHAN,
-                                             var_name='Tingkat Pemahaman', value_name='Jumlah Sesi')
-                    
-                    chart = st.bar_chart(
-                        df_melted,
-                        x='Topik',
-                        y='Jumlah Sesi',
-                        color='Tingkat Pemahaman',
-                        use_container_width=True
-                    )
-                else:
-                    st.info("Tidak cukup data untuk menampilkan grafik distribusi pemahaman.")
+            st.write("Jumlah Sesi berdasarkan Tingkat Pemahaman per Topik:")
+            kolom_tingkat = TINGKAT_PEMAHAMAN_PILIHAN + ['Tidak Diketahui']
+            st.dataframe(df_distribusi[['Topik'] + kolom_tingkat], hide_index=True, use_container_width=True)
+
+            st.write("Grafik Distribusi Tingkat Pemahaman (Top 5 Topik dengan Sesi Terbanyak):")
+            df_plot = get_pivot_pemahaman_cached(tanggal_filter, top_n=5)
+
+            if not df_plot.empty:
+                # Frame lebar (satu kolom per tingkat) langsung jadi batang bertumpuk, tanpa melt
+                st.bar_chart(
+                    df_plot.set_index('Topik')[kolom_tingkat],
+                    x_label='Topik',
+                    y_label='Jumlah Sesi',
+                    use_container_width=True
+                )
+            else:
+                st.info("Tidak cukup data untuk menampilkan grafik distribusi pemahaman.")
 
         except Exception as e:
             st.error(f"Gagal tampilkan distribusi pemahaman: {e}")
 
+    st.divider()
+    bagian_tren(manajer)
+
+    st.divider()
+    bagian_heatmap(manajer)
+
+
+# --- Tren & Streak (dari analitik di memori, tidak membaca ulang sesi_belajar) ---
+def bagian_tren(manajer: ManajerBelajar):
+    st.subheader("🔥 Tren & Streak Belajar (relatif hari ini)")
+    try:
+        analitik = manajer.get_analitik()
+        streak = analitik.streak()
+        tren = analitik.delta_mingguan()
+        total_7 = sum(t["menit_7_hari"] for t in tren)
+        total_7_lalu = sum(t["menit_7_hari_lalu"] for t in tren)
+        total_30 = sum(t["menit_30_hari"] for t in tren)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Streak Saat Ini", f"{streak['saat_ini']} hari")
+        col2.metric("Streak Terpanjang", f"{streak['terpanjang']} hari")
+        col3.metric("7 Hari Terakhir", format_durasi(total_7), delta=f"{total_7 - total_7_lalu:+.0f} menit vs minggu lalu")
+        col4.metric("30 Hari Terakhir", format_durasi(total_30))
+
+        if not tren:
+            st.info("Belum ada sesi dalam 30 hari terakhir.")
+            return
+
+        col_tren1, col_tren2 = st.columns(2)
+        with col_tren1:
+            st.write("Menit per Mata Kuliah:")
+            df_tren = pd.DataFrame(tren).rename(columns={
+                "mata_kuliah": "Mata Kuliah",
+                "menit_7_hari": "7 Hari",
+                "menit_7_hari_lalu": "7 Hari Sebelumnya",
+                "delta": "Δ Minggu",
+                "menit_30_hari": "30 Hari",
+            })
+            st.dataframe(df_tren, hide_index=True, use_container_width=True)
+        with col_tren2:
+            st.write("Total Menit Bergulir 7 Hari (90 hari terakhir):")
+            tanggal_awal, rolling_7 = analitik.rolling_harian(7, 90)
+            st.line_chart(pd.Series(rolling_7, index=pd.date_range(tanggal_awal, periods=len(rolling_7)), name="Menit 7 Hari"))
+    except Exception as e:
+        st.error(f"Gagal tampilkan tren belajar: {e}")
+
+
+# --- Heatmap Kalender (vektor menit harian di memori, dikirim sebagai array ringkas) ---
+def spec_heatmap(payload: dict) -> dict:
+    """
+    Spesifikasi Vega-Lite heatmap ala GitHub. Data yang dikirim hanya array menit per hari mulai
+    payload['mulai']; tanggal, minggu, dan hari dihitung di browser lewat transform.
+    """
+    tahun, bulan, hari = (int(x) for x in payload["mulai"].split("-"))
+    return {
+        "data": {"values": payload["menit"]},  # Nilai primitif -> field 'data'
+        "transform": [
+            {"window": [{"op": "row_number", "as": "urutan"}]},
+            {"calculate": f"utc({tahun}, {bulan - 1}, {hari - 1} + datum.urutan)", "as": "tanggal"},
+            {"calculate": "utcyear(datum.tanggal)", "as": "tahun"},
+            {"calculate": "utcday(datum.tanggal)", "as": "hari"},
+            {"calculate": "floor((utcdayofyear(datum.tanggal) - 1 + utcday(utc(datum.tahun, 0, 1))) / 7)", "as": "minggu"},
+        ],
+        "mark": {"type": "rect", "cornerRadius": 2, "stroke": "white", "strokeWidth": 1},
+        "width": {"step": 12},
+        "height": {"step": 12},
+        "encoding": {
+            "x": {"field": "minggu", "type": "ordinal", "axis": None},
+            "y": {
+                "field": "hari", "type": "ordinal", "title": None,
+                "axis": {"labelExpr": "['Min', 'Sen', 'Sel', 'Rab', 'Kam', 'Jum', 'Sab'][datum.value]"},
+            },
+            "row": {"field": "tahun", "type": "ordinal", "title": None, "sort": "descending"},
+            "color": {
+                "condition": {"test": "datum.data == 0", "value": "#ebedf0"},
+                "field": "data", "type": "quantitative", "title": "Menit",
+                "scale": {"scheme": "greens", "domainMin": 0},
+            },
+            "tooltip": [
+                {"field": "tanggal", "type": "temporal", "title": "Tanggal", "format": "%d %b %Y", "scale": {"type": "utc"}},
+                {"field": "data", "type": "quantitative", "title": "Menit"},
+            ],
+        },
+    }
+
+
+def bagian_heatmap(manajer: ManajerBelajar):
+    st.subheader("🗓️ Kalender Menit Belajar")
+    try:
+        analitik = manajer.get_analitik()
+        tahun_data_awal, _ = analitik.rentang_tahun()
+        tahun_ini = datetime.date.today().year
+        tahun_data_awal = min(tahun_data_awal, tahun_ini)
+
+        if tahun_data_awal < tahun_ini:
+            tahun_awal, tahun_akhir = st.slider(
+                "Rentang Tahun:", min_value=tahun_data_awal, max_value=tahun_ini,
+                value=(max(tahun_data_awal, tahun_ini - 2), tahun_ini), key="heatmap_tahun"
+            )
+        else:
+            tahun_awal = tahun_akhir = tahun_ini
+
+        payload = analitik.payload_heatmap(tahun_awal, tahun_akhir)
+        st.vega_lite_chart(spec_heatmap(payload), use_container_width=False)
+        st.caption(f"{len(payload['menit'])} hari, total {format_durasi(sum(payload['menit']))}.")
+    except Exception as e:
+        st.error(f"Gagal tampilkan kalender belajar: {e}")
+
 
 # --- Fungsi Utama Aplikasi Streamlit ---
 def main():
@@ -1,10 +1,15 @@
 # manager_belajar.py
 
 import datetime
+import itertools
+import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 from model import SesiBelajar
 import database
-from konfigurasi import MATAKULIAH_DEFAULT, TINGKAT_PEMAHAMAN_PILIHAN
+from analitik import AnalitikBelajar, SQL_ORDINAL
+from konfigurasi import MATAKULIAH_DEFAULT, TINGKAT_PEMAHAMAN_PILIHAN, BATCH_UKURAN_CHUNK
 
 class ManajerBelajar:
     """Mengelola logika bisnis sesi belajar (Repository Pattern)."""
@@ -12,6 +17,12 @@ class ManajerBelajar:
     _db_setup_done = False
 
     def __init__(self):
+        self._analitik = None  # Dibangun saat pertama dipakai (get_analitik)
+        # Satu koneksi (lintas thread, dijaga _lock) untuk semua tulisan instance ini DAN PRAGMA data_version.
+        # Commit lewat koneksi yang sama tidak mengubah data_version-nya, jadi nilai itu berubah HANYA jika
+        # penulis lain (CLI impor_kalender, worker/proses lain) meng-commit, termasuk di sela tulisan kita.
+        self._koneksi = None
+        self._lock = threading.RLock()
         if not ManajerBelajar._db_setup_done:
             print("[ManajerBelajar] Melakukan pengecekan/setup database awal...")
             if database.setup_database_initial():
@@ -20,25 +31,114 @@ class ManajerBelajar:
             else:
                 print("[ManajerBelajar] KRITIKAL: Setup database awal GAGAL!")
 
+    def _ambil_koneksi(self) -> sqlite3.Connection | None:
+        """Koneksi tulis bersama (dibuka saat pertama dipakai). Pemanggil memegang self._lock."""
+        if self._koneksi is None:
+            self._koneksi = database.get_db_connection(lintas_thread=True)
+            self._analitik = None  # data_version koneksi baru tidak sebanding dengan cap analitik lama
+        return self._koneksi
+
+    @property
+    def versi_db(self) -> int | None:
+        """PRAGMA data_version koneksi tulis bersama: berubah hanya jika penulis LAIN meng-commit."""
+        with self._lock:
+            try:
+                conn = self._ambil_koneksi()
+                if conn is not None:
+                    return conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Peringatan: Gagal membaca data_version: {e}")
+                self._koneksi = None
+            return None
+
     def tambah_sesi_belajar(self, sesi: SesiBelajar) -> bool:
         """Menambahkan sesi belajar baru ke database."""
         if not isinstance(sesi, SesiBelajar) or sesi.durasi_menit <= 0:
             return False
 
-        sql = "INSERT INTO sesi_belajar (mata_kuliah, topik, durasi_menit, tanggal, tingkat_pemahaman) VALUES (?, ?, ?, ?, ?)"
+        # Nama baru didaftarkan dulu ke tabel lookup, lalu sesi disimpan dengan id-nya (satu transaksi)
+        sql = (
+            "INSERT INTO sesi_belajar (id_mata_kuliah, id_topik, durasi_menit, tanggal, tingkat_pemahaman)"
+            " SELECT m.id, t.id, ?, ?, ? FROM mata_kuliah m, topik t WHERE m.nama = ? AND t.nama = ?"
+        )
         params = (
-            sesi.mata_kuliah,
-            sesi.topik,
             sesi.durasi_menit,
             sesi.tanggal.strftime("%Y-%m-%d"),
-            sesi.tingkat_pemahaman
+            sesi.tingkat_pemahaman,
+            sesi.mata_kuliah,
+            sesi.topik
         )
 
-        last_id = database.execute_query(sql, params)
-        if last_id is not None:
+        # Tulis & perbarui analitik di bawah lock yang sama: bangun ulang tidak bisa menyelip di antaranya
+        with self._lock:
+            last_id = database.execute_transaction([
+                ("INSERT OR IGNORE INTO mata_kuliah (nama) VALUES (?)", (sesi.mata_kuliah,)),
+                ("INSERT OR IGNORE INTO topik (nama) VALUES (?)", (sesi.topik,)),
+                (sql, params),
+            ], conn=self._ambil_koneksi())
+            if last_id is None:
+                return False
             sesi.id = last_id
-            return True
-        return False
+            if self._analitik is not None:
+                self._analitik.tambah(sesi.tanggal, sesi.mata_kuliah, sesi.durasi_menit)
+        return True
+
+    def tambah_sesi_batch(self, daftar_sesi, ukuran_chunk: int = BATCH_UKURAN_CHUNK) -> dict:
+        """
+        Menyimpan banyak sesi (iterable/generator SesiBelajar, dibaca per chunk) untuk impor kalender.
+        Setiap chunk = satu transaksi: sesi ditampung di tabel TEMP, nama baru didaftarkan ke lookup,
+        lalu INSERT OR IGNORE ke sesi_belajar; sesi yang sidik_jari-nya sudah ada dilewati oleh indeks UNIQUE.
+        Mengembalikan {'disimpan', 'duplikat', 'ditolak': [(nomor urut, alasan)], 'id_baru'}.
+        """
+        hasil = {"disimpan": 0, "duplikat": 0, "ditolak": [], "id_baru": []}
+        # Koneksi tulis dipakai ulang antar chunk, jadi tabel TEMP dikosongkan di awal setiap chunk
+        sql_langkah = [
+            ("CREATE TEMP TABLE IF NOT EXISTS impor_sesi (mata_kuliah TEXT, topik TEXT, durasi_menit REAL,"
+             " tanggal DATE, tingkat_pemahaman TEXT, sidik_jari INTEGER)", None),
+            ("DELETE FROM impor_sesi", None),
+            None,  # Diisi per chunk: INSERT INTO impor_sesi (executemany)
+            ("INSERT OR IGNORE INTO mata_kuliah (nama) SELECT DISTINCT mata_kuliah FROM impor_sesi", None),
+            ("INSERT OR IGNORE INTO topik (nama) SELECT DISTINCT topik FROM impor_sesi", None),
+            ("INSERT OR IGNORE INTO sesi_belajar (id_mata_kuliah, id_topik, durasi_menit, tanggal, tingkat_pemahaman, sidik_jari)"
+             " SELECT m.id, t.id, i.durasi_menit, i.tanggal, i.tingkat_pemahaman, i.sidik_jari FROM impor_sesi i"
+             " JOIN mata_kuliah m ON m.nama = i.mata_kuliah JOIN topik t ON t.nama = i.topik ORDER BY i.rowid"
+             f" RETURNING id, {SQL_ORDINAL}, id_mata_kuliah, durasi_menit", None),
+        ]
+
+        iterator = enumerate(daftar_sesi, start=1)
+        while True:
+            chunk = list(itertools.islice(iterator, ukuran_chunk))
+            if not chunk:
+                break
+            baris, nomor_baris = [], []
+            for nomor, sesi in chunk:
+                if not isinstance(sesi, SesiBelajar) or sesi.durasi_menit <= 0:
+                    hasil["ditolak"].append((nomor, "bukan sesi valid atau durasi tidak positif"))
+                    continue
+                baris.append((sesi.mata_kuliah, sesi.topik, sesi.durasi_menit, sesi.tanggal.isoformat(),
+                              sesi.tingkat_pemahaman, sesi.sidik_jari()))
+                nomor_baris.append(nomor)
+            if not baris:
+                continue
+
+            sql_langkah[2] = ("INSERT INTO impor_sesi VALUES (?, ?, ?, ?, ?, ?)", baris)
+            with self._lock:
+                rows = database.execute_transaction(sql_langkah, ambil_hasil=True, conn=self._ambil_koneksi())
+                if rows is None:
+                    hasil["ditolak"].extend((nomor, "chunk gagal disimpan (lihat log)") for nomor in nomor_baris)
+                    continue
+
+                hasil["disimpan"] += len(rows)
+                hasil["duplikat"] += len(baris) - len(rows)
+                if rows:
+                    data = np.array([tuple(row) for row in rows], dtype=np.float64)
+                    hasil["id_baru"].extend(data[:, 0].astype(np.int64).tolist())
+                    if self._analitik is not None:
+                        self._analitik.tambah_banyak(data[:, 1].astype(np.int64), data[:, 2].astype(np.int64), data[:, 3])
+
+        with self._lock:
+            database.execute_transaction([("DROP TABLE IF EXISTS temp.impor_sesi", None)], conn=self._ambil_koneksi())
+        return hasil
 
     def hapus_sesi_belajar(self, id_sesi: int) -> bool:
         """
@@ -49,14 +149,40 @@ class ManajerBelajar:
             print(f"Peringatan: ID sesi '{id_sesi}' tidak valid untuk dihapus.")
             return False
 
-        sql = "DELETE FROM sesi_belajar WHERE id = ?"
+        # RETURNING memberi data sesi yang terhapus untuk memperbarui analitik tanpa query tambahan
+        sql = "DELETE FROM sesi_belajar WHERE id = ? RETURNING tanggal, id_mata_kuliah, durasi_menit"
         params = (id_sesi,)
 
-        return database.execute_query(sql, params)
+        with self._lock:
+            rows = database.execute_returning(sql, params, conn=self._ambil_koneksi())
+            if not rows:
+                return False
+            if self._analitik is not None:
+                tanggal = rows[0]['tanggal']
+                if isinstance(tanggal, str):
+                    tanggal = datetime.datetime.strptime(tanggal, "%Y-%m-%d").date()
+                self._analitik.hapus(tanggal, rows[0]['id_mata_kuliah'], rows[0]['durasi_menit'])
+        return True
+
+    def get_analitik(self) -> AnalitikBelajar:
+        """
+        Analitik streak & jendela bergulir di memori. Tulisan lewat instance ini langsung diterapkan;
+        analitik dibangun ulang hanya jika data_version berubah karena penulis lain (CLI impor, proses lain).
+        """
+        with self._lock:
+            versi_db = self.versi_db
+            if self._analitik is None or versi_db is None or self._analitik.versi_db != versi_db:
+                # versi_db dibaca SEBELUM data: tulisan lain yang masuk selama membangun memicu bangun ulang berikutnya
+                self._analitik = AnalitikBelajar.dari_database(versi_db)
+            return self._analitik
 
     def get_semua_sesi_belajar_obj(self) -> list[SesiBelajar]:
         """Mengambil semua sesi belajar dari database dalam bentuk list SesiBelajar."""
-        sql = "SELECT id, mata_kuliah, topik, durasi_menit, tanggal, tingkat_pemahaman FROM sesi_belajar ORDER BY tanggal DESC, id DESC"
+        sql = (
+            "SELECT s.id, m.nama AS mata_kuliah, t.nama AS topik, s.durasi_menit, s.tanggal, s.tingkat_pemahaman"
+            " FROM sesi_belajar s JOIN mata_kuliah m ON m.id = s.id_mata_kuliah JOIN topik t ON t.id = s.id_topik"
+            " ORDER BY s.tanggal DESC, s.id DESC"
+        )
         rows = database.fetch_query(sql, fetch_all=True)
 
         sesi_list = []
@@ -73,9 +199,25 @@ class ManajerBelajar:
                 sesi_list.append(sesi)
         return sesi_list
 
+    def _get_lookup(self, tabel: str) -> pd.Series:
+        """Isi tabel lookup (mata_kuliah/topik) sebagai Series nama berindeks id."""
+        df = database.get_dataframe(f"SELECT id, nama FROM {tabel} ORDER BY id")
+        if df.empty:
+            return pd.Series(dtype=object)
+        return df.set_index('id')['nama']
+
+    def _kategorikal(self, kode: pd.Series, tabel: str) -> pd.Categorical:
+        """Mengubah kolom id lookup menjadi pandas Categorical (kategori = nama, urutan = id) tanpa membuat string per baris."""
+        lookup = self._get_lookup(tabel)
+        posisi = pd.Series(range(len(lookup)), index=lookup.index)
+        return pd.Categorical.from_codes(kode.map(posisi).fillna(-1).astype(int), categories=lookup.values)
+
     def get_dataframe_sesi_belajar(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        """Mengambil sesi belajar dalam bentuk DataFrame Pandas, bisa difilter berdasarkan tanggal."""
-        query = "SELECT id, tanggal, mata_kuliah, topik, durasi_menit, tingkat_pemahaman FROM sesi_belajar"
+        """
+        Mengambil sesi belajar dalam bentuk DataFrame Pandas, bisa difilter berdasarkan tanggal.
+        Kolom 'Mata Kuliah', 'Topik', dan 'Pemahaman' bertipe category (kode integer + daftar nama).
+        """
+        query = "SELECT id, tanggal, id_mata_kuliah, id_topik, durasi_menit, tingkat_pemahaman FROM sesi_belajar"
         params = None
 
         if filter_tanggal:
@@ -88,12 +230,18 @@ class ManajerBelajar:
         if not df.empty:
             df.rename(columns={
                 'id': 'ID',
-                'mata_kuliah': 'Mata Kuliah',
-                'topik': 'Topik',
                 'durasi_menit': 'Durasi (Menit)',
-                'tingkat_pemahaman': 'Pemahaman'
             }, inplace=True)
             df['Tanggal'] = pd.to_datetime(df['tanggal']).dt.strftime('%Y-%m-%d')
+            df['Mata Kuliah'] = self._kategorikal(df['id_mata_kuliah'], "mata_kuliah")
+            df['Topik'] = self._kategorikal(df['id_topik'], "topik")
+            # Sama dengan pivot pemahaman: tingkat kosong atau di luar pilihan dihitung 'Tidak Diketahui'
+            pemahaman = df['tingkat_pemahaman']
+            df['Pemahaman'] = pd.Categorical(
+                pemahaman.where(pemahaman.isin(TINGKAT_PEMAHAMAN_PILIHAN), "Tidak Diketahui"),
+                categories=TINGKAT_PEMAHAMAN_PILIHAN + ["Tidak Diketahui"],
+                ordered=True
+            )
             df = df[['ID', 'Tanggal', 'Mata Kuliah', 'Topik', 'Durasi (Menit)', 'Pemahaman']]
         return df
 
@@ -114,14 +262,19 @@ class ManajerBelajar:
     def get_durasi_per_mata_kuliah(self, tanggal: datetime.date | None = None) -> dict:
         """Mengelompokkan durasi belajar berdasarkan mata kuliah (opsional filter tanggal)."""
         hasil = {}
-        sql = "SELECT mata_kuliah, SUM(durasi_menit) FROM sesi_belajar"
+        # Pengelompokan berjalan di atas id integer; nama baru digabung ke hasil yang sudah kecil
+        sql_dalam = "SELECT id_mata_kuliah, SUM(durasi_menit) AS total FROM sesi_belajar"
         params = []
 
         if tanggal:
-            sql += " WHERE tanggal = ?"
+            sql_dalam += " WHERE tanggal = ?"
             params.append(tanggal.strftime("%Y-%m-%d"))
 
-        sql += " GROUP BY mata_kuliah HAVING SUM(durasi_menit) > 0 ORDER BY SUM(durasi_menit) DESC"
+        sql_dalam += " GROUP BY id_mata_kuliah HAVING SUM(durasi_menit) > 0"
+        sql = (
+            f"SELECT m.nama AS mata_kuliah, g.total FROM ({sql_dalam}) g"
+            " JOIN mata_kuliah m ON m.id = g.id_mata_kuliah ORDER BY g.total DESC"
+        )
 
         rows = database.fetch_query(sql, params=tuple(params) if params else None, fetch_all=True)
         if rows:
@@ -136,15 +289,19 @@ class ManajerBelajar:
         Menghitung distribusi tingkat pemahaman untuk setiap topik.
         Mengembalikan dictionary dengan topik sebagai kunci dan dictionary distribusi
         tingkat pemahaman sebagai nilai (e.g., {'Topik A': {'Rendah': 2, 'Sedang': 5}}).
+        Penghitungan dilakukan oleh SQLite (GROUP BY di atas indeks id_topik, tingkat_pemahaman).
         """
         hasil = {}
-        sql = "SELECT topik, tingkat_pemahaman FROM sesi_belajar"
+        sql_dalam = "SELECT id_topik, tingkat_pemahaman, COUNT(*) AS jumlah FROM sesi_belajar"
         params = []
 
         if tanggal:
-            sql += " WHERE tanggal = ?"
+            sql_dalam += " WHERE tanggal = ?"
             params.append(tanggal.strftime("%Y-%m-%d"))
 
+        sql_dalam += " GROUP BY id_topik, tingkat_pemahaman"
+        sql = f"SELECT t.nama AS topik, g.tingkat_pemahaman, g.jumlah FROM ({sql_dalam}) g JOIN topik t ON t.id = g.id_topik"
+
         rows = database.fetch_query(sql, params=tuple(params) if params else None, fetch_all=True)
 
         if rows:
@@ -154,5 +311,42 @@ class ManajerBelajar:
 
                 if topik not in hasil:
                     hasil[topik] = {level: 0 for level in TINGKAT_PEMAHAMAN_PILIHAN + ["Tidak Diketahui"]}
-                hasil[topik][pemahaman] += 1
-        return hasil
\ No newline at end of file
+                hasil[topik][pemahaman] = hasil[topik].get(pemahaman, 0) + row['jumlah']
+        return hasil
+
+    def get_pivot_pemahaman_per_topik(self, tanggal: datetime.date | None = None, top_n: int | None = None) -> pd.DataFrame:
+        """
+        Distribusi tingkat pemahaman per topik dalam bentuk tabel siap tampil:
+        kolom 'Topik', satu kolom per tingkat di TINGKAT_PEMAHAMAN_PILIHAN, 'Tidak Diketahui'
+        (tingkat kosong atau di luar pilihan), lalu 'Total Sesi' = jumlah semua kolom tingkat.
+        Hitungan, pivot, pengurutan, dan batas top_n semuanya dikerjakan di SQL.
+        """
+        # Tahap dalam menghitung per (topik, tingkat) dari indeks; tahap luar hanya memutar hasil kecil itu
+        kolom_level = ", ".join(
+            f"SUM(CASE WHEN tingkat_pemahaman = ? THEN jumlah ELSE 0 END) AS level_{i}"
+            for i in range(len(TINGKAT_PEMAHAMAN_PILIHAN))
+        )
+        penanda = ", ".join("?" * len(TINGKAT_PEMAHAMAN_PILIHAN))
+        # NULL IN (...) bernilai NULL, jadi tingkat kosong juga jatuh ke ELSE
+        kolom_level += f", SUM(CASE WHEN tingkat_pemahaman IN ({penanda}) THEN 0 ELSE jumlah END) AS level_lain"
+        sql_dalam = "SELECT id_topik, tingkat_pemahaman, COUNT(*) AS jumlah FROM sesi_belajar"
+        params = list(TINGKAT_PEMAHAMAN_PILIHAN) * 2
+
+        if tanggal:
+            sql_dalam += " WHERE tanggal = ?"
+            params.append(tanggal.strftime("%Y-%m-%d"))
+
+        sql_dalam += " GROUP BY id_topik, tingkat_pemahaman"
+        sql = (
+            f"SELECT COALESCE(NULLIF(t.nama, ''), 'Tidak Diketahui') AS nama_topik, {kolom_level}, SUM(g.jumlah) AS total"
+            f" FROM ({sql_dalam}) g JOIN topik t ON t.id = g.id_topik"
+            " GROUP BY g.id_topik ORDER BY total DESC, nama_topik"
+        )
+        if top_n:
+            sql += " LIMIT ?"
+            params.append(int(top_n))
+
+        df = database.get_dataframe(sql, params=tuple(params))
+        if not df.empty:
+            df.columns = ['Topik'] + TINGKAT_PEMAHAMAN_PILIHAN + ['Tidak Diketahui', 'Total Sesi']
+        return df
@@ -1,6 +1,7 @@
 # model.py
 
 import datetime
+import hashlib
 import locale
 
 class SesiBelajar:
@@ -43,6 +44,20 @@ class SesiBelajar:
             f"Durasi:{self.durasi_menit:.0f} menit, Pemahaman:'{self.tingkat_pemahaman}')"
         )
 
+    def sidik_jari(self) -> int:
+        """
+        Hash 64-bit (bertanda, muat di INTEGER SQLite) dari mata kuliah, topik, tanggal, dan durasi.
+        Dipakai impor kalender untuk melewati sesi yang sudah pernah diimpor (indeks UNIQUE).
+        Huruf besar/kecil dan spasi berlebih diabaikan agar ekspor ulang kalender tetap dikenali.
+        """
+        kunci = "\x1f".join([
+            " ".join(self.mata_kuliah.casefold().split()),
+            " ".join(self.topik.casefold().split()),
+            self.tanggal.isoformat(),
+            f"{self.durasi_menit:.2f}",
+        ])
+        return int.from_bytes(hashlib.blake2b(kunci.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
     def to_dict(self) -> dict:
         """Mengonversi objek SesiBelajar ke format dictionary (untuk penyimpanan)."""
         return {
@@ -1,6 +1,7 @@
 import sqlite3
 import os
 from konfigurasi import DB_PATH
+from database import SQL_SKEMA, SQL_INDEX_SESI, VERSI_SKEMA, migrasi_lookup, migrasi_sidik_jari, seed_mata_kuliah
 
 def setup_database():
     print(f"Memeriksa/membuat database di: {DB_PATH}")
@@ -9,18 +10,17 @@ def setup_database():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS sesi_belajar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            mata_kuliah TEXT NOT NULL,
-            topik TEXT NOT NULL,
-            durasi_menit REAL NOT NULL CHECK(durasi_menit > 0),
-            tanggal DATE NOT NULL,
-            tingkat_pemahaman TEXT
-        );
-        """
-        print("Membuat tabel 'sesi_belajar' (jika belum ada)...")
-        cursor.execute(sql_create_table)
+        migrasi_lookup(conn)
+        migrasi_sidik_jari(conn)
+
+        print("Membuat tabel 'mata_kuliah', 'topik', dan 'sesi_belajar' (jika belum ada)...")
+        for sql in SQL_SKEMA:
+            cursor.execute(sql)
+        seed_mata_kuliah(cursor)
+        print("Membuat indeks ringkasan (jika belum ada)...")
+        for sql_index in SQL_INDEX_SESI:
+            cursor.execute(sql_index)
+        cursor.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
         conn.commit()
         print(" -> Tabel 'sesi_belajar' siap.")
         return True
@@ -0,0 +1,45 @@
+# test_impor_kalender.py
+
+import datetime
+import database
+from manager_belajar import ManajerBelajar
+from impor_kalender import impor_file
+
+ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:1@uji
+DTSTART:20240304T090000
+DURATION:PT1H
+RRULE:FREQ=DAILY;COUNT=2
+SUMMARY:Kriptografi: Cipher klasik
+END:VEVENT
+BEGIN:VEVENT
+UID:2@uji
+DTSTART:20240306T130000
+DTEND:20240306T133000
+CATEGORIES:Statistika
+SUMMARY:Regresi linear
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_impor_ics_dua_kali_hanya_menyimpan_sekali(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "uji.db"))
+    monkeypatch.setattr(ManajerBelajar, "_db_setup_done", False)
+    path = tmp_path / "kalender.ics"
+    path.write_text(ICS, encoding="utf-8")
+
+    manajer = ManajerBelajar()
+    manajer.get_analitik()  # Analitik sudah ada sebelum impor, jadi diperbarui lewat tambah_banyak
+
+    pertama = impor_file(str(path), manajer, batas_ulang=datetime.date(2024, 3, 31))
+    assert (pertama["disimpan"], pertama["duplikat"], pertama["ditolak"]) == (3, 0, [])
+
+    # Mata kuliah baru dari impor harus langsung terlihat di tren, bukan hanya di heatmap
+    tren = {t["mata_kuliah"]: t["menit_7_hari"] for t in manajer.get_analitik().delta_mingguan(datetime.date(2024, 3, 7))}
+    assert tren == {"Kriptografi": 120.0, "Statistika": 30.0}
+
+    kedua = impor_file(str(path), manajer, batas_ulang=datetime.date(2024, 3, 31))
+    assert (kedua["disimpan"], kedua["duplikat"], kedua["ditolak"]) == (0, 3, [])